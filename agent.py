@@ -1,3 +1,5 @@
+import copy
+import math
 import random
 from dataclasses import dataclass
 from typing import Tuple, Optional
@@ -11,30 +13,30 @@ def clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-def _random_alive_colour() -> Colour:
+def _random_alive_colour(rng) -> Colour:
     """Generate bright neon-like colors with greater variation."""
-    mode = random.randint(0, 2)
+    mode = rng.randint(0, 2)
 
     if mode == 0:  # Single bright channel (red, green, blue)
         channels = [
-            random.randint(180, 255),
-            random.randint(0, 60),
-            random.randint(0, 60)
+            rng.randint(180, 255),
+            rng.randint(0, 60),
+            rng.randint(0, 60)
         ]
     elif mode == 1:  # Two bright channels (cyan, magenta, yellow)
         channels = [
-            random.randint(140, 255),
-            random.randint(140, 255),
-            random.randint(0, 60)
+            rng.randint(140, 255),
+            rng.randint(140, 255),
+            rng.randint(0, 60)
         ]
     else:  # Mix with variable intensity
         channels = [
-            random.randint(120, 255),
-            random.randint(0, 140),
-            random.randint(0, 140)
+            rng.randint(120, 255),
+            rng.randint(0, 140),
+            rng.randint(0, 140)
         ]
 
-    random.shuffle(channels)
+    rng.shuffle(channels)
     return tuple(channels)  # type: ignore
 
 
@@ -63,6 +65,25 @@ class Agent:
 
     interact_cooldown: float = 0.0
 
+    # crowding: resource slot held (DRINK / eating) or waited for (QUEUE)
+    occupying: Optional[object] = None
+    queue_for: Optional[object] = None
+    queue_timer: float = 0.0
+
+    # update scheduling (see lod.py / wake.py)
+    lod_idle: bool = False
+    lod_dt: float = 0.0     # time skipped since the last full update
+    asleep: bool = False    # parked in the wake queue
+    slept_at: float = 0.0   # world time when it went to sleep
+
+    # reproduction
+    mate_cooldown: float = 0.0
+    generation: int = 0
+
+    # lifetime tallies (fitness.py)
+    food_eaten: int = 0     # food items picked
+    water_sips: int = 0     # DRINK_AMOUNT sips taken
+
     # traits (multipliers applied to base config values)
     traits: Optional[tr.Traits] = None
 
@@ -85,32 +106,90 @@ class Agent:
     waypoint_timer: float = 0.0
 
 
-def create_agent(agent_id: int, width: int, height: int, radius: int) -> Agent:
+def create_agent(agent_id: int, width: int, height: int, radius: int,
+                 rng=None) -> Agent:
+    if rng is None:
+        rng = random
     a = Agent(
         id=agent_id,
-        x=float(random.randint(radius, width - radius)),
-        y=float(random.randint(radius, height - radius)),
-        velocityX=float(random.choice([-2, -1, 1, 2])),
-        velocityY=float(random.choice([-2, -1, 1, 2])),
-        colour=_random_alive_colour(),
+        x=float(rng.randint(radius, width - radius)),
+        y=float(rng.randint(radius, height - radius)),
+        velocityX=float(rng.choice([-2, -1, 1, 2])),
+        velocityY=float(rng.choice([-2, -1, 1, 2])),
+        colour=_random_alive_colour(rng),
         food_memory=[],
-        traits=tr.random_traits()  # Randomize traits at spawn
+        traits=tr.random_traits(rng)  # Randomize traits at spawn
     )
 
     a.vision_radius = cfg.SENSING["VISION_RADIUS"]
     a.steer_strength = cfg.SENSING["STEER_STRENGTH"]
-    a.wander_angle = random.uniform(0, 6.28318)
+    a.wander_angle = rng.uniform(0, 6.28318)
 
     m = cfg.SENSING["WAYPOINT_MARGIN"]
     a.waypoint = (
-        random.uniform(m, width - m),
-        random.uniform(m, height - m)
+        rng.uniform(m, width - m),
+        rng.uniform(m, height - m)
     )
-    a.waypoint_timer = random.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
+    a.waypoint_timer = rng.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
 
     return a
 
 
+def create_offspring(agent_id: int, parent_a: Agent, parent_b: Agent,
+                     rng=None) -> Agent:
+    """Spawn a child between two parents with inherited traits."""
+    if rng is None:
+        rng = random
+    rep = cfg.REPRODUCTION
+    child_colour = tuple(
+        int(clamp((ca + cb) / 2 + rng.randint(-20, 20), 0, 255))
+        for ca, cb in zip(parent_a.colour, parent_b.colour)
+    )
+
+    c = Agent(
+        id=agent_id,
+        x=(parent_a.x + parent_b.x) / 2.0,
+        y=(parent_a.y + parent_b.y) / 2.0,
+        velocityX=float(rng.choice([-2, -1, 1, 2])),
+        velocityY=float(rng.choice([-2, -1, 1, 2])),
+        colour=child_colour,  # type: ignore
+        food_memory=[],
+        traits=tr.inherit_traits(
+            parent_a.traits or tr.Traits(),
+            parent_b.traits or tr.Traits(),
+            rep["MUTATION_SD"],
+            rng
+        ),
+        generation=max(parent_a.generation, parent_b.generation) + 1,
+    )
+
+    c.vision_radius = cfg.SENSING["VISION_RADIUS"]
+    c.steer_strength = cfg.SENSING["STEER_STRENGTH"]
+    c.wander_angle = rng.uniform(0, 6.28318)
+    c.waypoint = (c.x, c.y)  # picks a real waypoint on its first wander
+    c.waypoint_timer = cfg.SENSING["WAYPOINT_TIMEOUT"]
+    c.mate_cooldown = rep["COOLDOWN"]
+
+    return c
+
+
+def can_mate(a: Agent) -> bool:
+    """Needs satisfied, old enough, healthy and off cooldown."""
+    rep = cfg.REPRODUCTION
+    return (
+        a.alive
+        and a.mate_cooldown <= 0.0
+        and a.age >= rep["MIN_AGE"]
+        and a.health >= rep["MIN_HEALTH"]
+        and a.hunger < cfg.THRESHOLDS["HUNGER_SEEK"]
+        and a.thirst < cfg.THRESHOLDS["THIRST_SEEK"]
+        and a.energy > cfg.THRESHOLDS["ENERGY_SLOW"]
+        and a.action == "WANDER"
+        and a.eat_pause <= 0.0
+        and a.occupying is None
+    )
+
+
 def update_internal_state(a: Agent, dt: float) -> None:
     """
     Updates stats using dt (seconds).
@@ -173,6 +252,173 @@ def update_internal_state(a: Agent, dt: float) -> None:
         a.alive = False
 
 
+def death_cause(a: Agent) -> str:
+    """Why a dead agent died: old_age, dehydration, starvation or exhaustion."""
+    th = cfg.THRESHOLDS
+    if a.age >= cfg.MAX_AGE:
+        return "old_age"
+    if a.thirst >= th["THIRST_CRIT"]:
+        return "dehydration"
+    if a.hunger >= th["HUNGER_CRIT"]:
+        return "starvation"
+    if a.energy <= th["ENERGY_CRIT"]:
+        return "exhaustion"
+    return "other"
+
+
+def seconds_until(value: float, limit: float, rate: float) -> float:
+    """
+    Time for value to reach limit moving at rate (per second);
+    inf if it never does or is already there.
+    """
+    if rate == 0.0:
+        return math.inf
+    t = (limit - value) / rate
+    return t if t > 0.0 else math.inf
+
+
+def time_to_next_threshold(a: Agent) -> float:
+    """Seconds until any stat crosses a THRESHOLDS value or the agent dies."""
+    th = cfg.THRESHOLDS
+    traits_obj = a.traits or tr.Traits()
+    hunger_rate = tr.effective_drain(cfg.RATES["HUNGER_UP"], traits_obj)
+    thirst_rate = tr.effective_drain(cfg.RATES["THIRST_UP"], traits_obj)
+    energy_rate = -tr.effective_drain(cfg.RATES["ENERGY_DOWN"], traits_obj)
+
+    t = cfg.MAX_AGE - a.age
+    for limit in (th["HUNGER_SEEK"], th["HUNGER_CRIT"], 100.0):
+        t = min(t, seconds_until(a.hunger, limit, hunger_rate))
+    for limit in (th["THIRST_SEEK"], th["THIRST_CRIT"], 100.0):
+        t = min(t, seconds_until(a.thirst, limit, thirst_rate))
+    for limit in (th["ENERGY_SLOW"], th["ENERGY_CRIT"], 0.0):
+        t = min(t, seconds_until(a.energy, limit, energy_rate))
+
+    # health is linear until one of the above changes its rate
+    net = health_rate(a)
+    if net < 0.0:
+        t = min(t, a.health / -net)
+    return t
+
+
+def health_rate(a: Agent) -> float:
+    """Current net health change per second (regen - drain)."""
+    th = cfg.THRESHOLDS
+    rates = cfg.RATES
+    drain = rates["HEALTH_DRAIN_BASE"]
+    if a.thirst >= th["THIRST_SEEK"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.hunger >= th["HUNGER_SEEK"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.energy <= th["ENERGY_SLOW"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.thirst >= th["THIRST_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+    if a.hunger >= th["HUNGER_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+    if a.energy <= th["ENERGY_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+
+    regen = 0.0
+    if (
+        a.hunger < th["HUNGER_SEEK"]
+        and a.thirst < th["THIRST_SEEK"]
+        and a.energy > th["ENERGY_SLOW"]
+    ):
+        regen = rates["HEALTH_REGEN"]
+    return regen - drain
+
+
+# =========================================================
+# Analytic integration
+# =========================================================
+# Between events every stat is linear in time; the rates only change when a
+# stat reaches a THRESHOLDS value, a clamp (0 / 100), or the agent dies.
+# advance_internal_state() steps from breakpoint to breakpoint, so any
+# interval is integrated exactly (the dt -> 0 limit of update_internal_state).
+
+def _stat_rates(a: Agent) -> Tuple[float, float, float, float]:
+    """Current (hunger, thirst, energy, health) rates per second, clamps applied."""
+    traits_obj = getattr(a, "traits", None) or tr.Traits()
+    hunger_rate = tr.effective_drain(cfg.RATES["HUNGER_UP"], traits_obj)
+    thirst_rate = tr.effective_drain(cfg.RATES["THIRST_UP"], traits_obj)
+    energy_rate = -tr.effective_drain(cfg.RATES["ENERGY_DOWN"], traits_obj)
+    health = health_rate(a)
+
+    if a.hunger >= 100.0:
+        hunger_rate = 0.0
+    if a.thirst >= 100.0:
+        thirst_rate = 0.0
+    if a.energy <= 0.0:
+        energy_rate = 0.0
+    if a.health >= 100.0 and health > 0.0:
+        health = 0.0
+    return hunger_rate, thirst_rate, energy_rate, health
+
+
+def _next_breakpoint(a: Agent, rates) -> Tuple[float, str, float]:
+    """(seconds, attribute, value at breakpoint) of the nearest rate change."""
+    th = cfg.THRESHOLDS
+    hunger_rate, thirst_rate, energy_rate, health = rates
+
+    best = (cfg.MAX_AGE - a.age, "age", cfg.MAX_AGE)
+    candidates = [
+        ("hunger", hunger_rate, (th["HUNGER_SEEK"], th["HUNGER_CRIT"], 100.0)),
+        ("thirst", thirst_rate, (th["THIRST_SEEK"], th["THIRST_CRIT"], 100.0)),
+        ("energy", energy_rate, (th["ENERGY_SLOW"], th["ENERGY_CRIT"], 0.0)),
+        ("health", health, (0.0, 100.0)),
+    ]
+    for attr, rate, limits in candidates:
+        value = getattr(a, attr)
+        for limit in limits:
+            t = seconds_until(value, limit, rate)
+            if t < best[0]:
+                best = (t, attr, limit)
+    return best
+
+
+def advance_internal_state(a: Agent, duration: float) -> float:
+    """
+    Advance hunger/thirst/energy/health/age exactly over duration seconds
+    (no eating or drinking in between).
+    Sets a.alive=False on death and returns the time actually advanced.
+    """
+    if not a.alive:
+        return 0.0
+
+    elapsed = 0.0
+    while a.alive and elapsed < duration:
+        rates = _stat_rates(a)
+        t, attr, value = _next_breakpoint(a, rates)
+        seg = min(duration - elapsed, max(0.0, t))
+
+        hunger_rate, thirst_rate, energy_rate, health = rates
+        a.age += seg
+        a.hunger = clamp(a.hunger + hunger_rate * seg, 0.0, 100.0)
+        a.thirst = clamp(a.thirst + thirst_rate * seg, 0.0, 100.0)
+        a.energy = clamp(a.energy + energy_rate * seg, 0.0, 100.0)
+        a.health = clamp(a.health + health * seg, 0.0, 100.0)
+        elapsed += seg
+
+        if seg == t:
+            # land exactly on the breakpoint so the next zone is picked up
+            setattr(a, attr, value)
+
+        if a.health <= 0.0 or a.age >= cfg.MAX_AGE:
+            a.alive = False
+
+    return elapsed
+
+
+def time_to_death(a: Agent) -> float:
+    """
+    Seconds until the agent dies if it never eats or drinks again
+    (starvation/dehydration or MAX_AGE, whichever comes first).
+    """
+    if not a.alive:
+        return 0.0
+    return advance_internal_state(copy.copy(a), math.inf)
+
+
 def movement_multiplier(a: Agent) -> float:
     """
     Simplified energy:
@@ -0,0 +1,247 @@
+"""
+Opt-in allocation profiling (tracemalloc).
+
+    world.profiler = AllocProfiler()
+    ... step_world(world, dt) ...
+    print(world.profiler.format_report())
+
+While a profiler is attached, step_world runs the scalar path and marks
+flat phases: world-level (resources, grid, mating) and per agent
+(separation, plan, move, resolve, schedule; plan/move/resolve are the
+three halves of simulation.update_agent). For each phase and tick we keep
+the net change in traced memory and the peak above the phase start, which
+is where short-lived churn shows up.
+
+tracemalloc only lists blocks that are still alive, so snapshots cannot
+show garbage made and freed within a tick. Instead, every
+ALLOC_SITES_EVERY-th tick runs under a line tracer that resets the peak at
+each line: the peak above the line's start is what that line allocated
+(freed or not), summed per source line over the sampled ticks.
+Tracing slows the simulation several times over; never leave it on.
+"""
+import linecache
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import config as cfg
+import simulation as sim
+
+
+# the profiler's own bookkeeping is not what we are looking for
+_IGNORE = {tracemalloc.__file__, __file__}
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    net_bytes: int = 0          # summed change in traced memory
+    transient_bytes: int = 0    # summed peak above phase start
+    max_peak: int = 0           # largest single peak above phase start
+
+
+class AllocProfiler:
+    def __init__(self, frames: Optional[int] = None,
+                 sites_every: Optional[int] = None):
+        prof_cfg = cfg.PROFILE
+        self.frames = frames or prof_cfg["ALLOC_FRAMES"]
+        self.sites_every = sites_every or prof_cfg["ALLOC_SITES_EVERY"]
+        self.phases: Dict[str, PhaseStats] = {}
+        self.ticks = 0
+        self.tick_net: List[int] = []
+        self.tick_peak: List[int] = []
+        self.site_ticks = 0                     # ticks traced line by line
+        self.site_bytes: Dict[tuple, int] = {}  # (file, line) -> bytes allocated
+        self.site_count: Dict[tuple, int] = {}  # (file, line) -> allocating runs
+
+        self._phase: Optional[str] = None
+        self._phase_start = 0
+        self._tick_start = 0
+        self._tick_peak = 0
+        self._line: Optional[tuple] = None  # line being charged
+        self._line_base = 0                 # traced memory when it started
+        self._line_peak = 0                 # highest peak seen since begin()
+        self._line_tracing = False
+
+        # plain functions: C calls a bound-method tracer through a temporary
+        # argument array, which would be charged to every traced line
+        def trace_call(frame, event, arg):
+            return self._trace_call(frame)
+
+        def trace_line(frame, event, arg):
+            return self._trace_line(frame, event)
+
+        self._tracers = (trace_call, trace_line)
+        self._started_tracing = False
+
+    # -----------------------------------------------------
+    # lifecycle
+    # -----------------------------------------------------
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        self.end()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    # -----------------------------------------------------
+    # ticks and phases (called from world.step_world)
+    # -----------------------------------------------------
+    def start_tick(self) -> None:
+        self.start()
+        self._tick_start, _peak = tracemalloc.get_traced_memory()
+        self._tick_peak = self._tick_start
+        if self.ticks % self.sites_every == 0:
+            self._line = None
+            self._line_base = self._tick_start
+            self.site_ticks += 1
+            self._line_tracing = True
+            sys.settrace(self._tracers[0])
+
+    def end_tick(self) -> None:
+        self.end()
+        if self._line_tracing:
+            sys.settrace(None)
+            self._line_tracing = False
+            self._charge(tracemalloc.get_traced_memory()[1], None)
+        current, _peak = tracemalloc.get_traced_memory()
+        self.tick_net.append(current - self._tick_start)
+        self.tick_peak.append(max(self._tick_peak, current) - self._tick_start)
+        self.ticks += 1
+
+    # -----------------------------------------------------
+    # per-line attribution (sampled ticks)
+    # -----------------------------------------------------
+    def _charge(self, peak: int, line: Optional[tuple]) -> None:
+        """Charge peak above the open line's start to it; open `line`."""
+        above = peak - self._line_base
+        if above > 0 and self._line is not None:
+            self.site_bytes[self._line] = self.site_bytes.get(self._line, 0) + above
+            self.site_count[self._line] = self.site_count.get(self._line, 0) + 1
+        if peak > self._line_peak:
+            self._line_peak = peak
+        self._line = line
+        # measure last, so the bookkeeping above is not charged to `line`;
+        # the second reset drops the result tuple of the measurement itself
+        tracemalloc.reset_peak()
+        self._line_base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def _trace_call(self, frame):
+        if frame.f_code.co_filename in _IGNORE:
+            return None
+        return self._tracers[1]
+
+    def _trace_line(self, frame, event: str):
+        _current, peak = tracemalloc.get_traced_memory()  # before we allocate
+        if event == "line":
+            self._charge(peak, (frame.f_code.co_filename, frame.f_lineno))
+        elif event == "return":
+            # back in the caller: what follows belongs to its current line
+            caller = frame.f_back
+            self._charge(peak, None if caller is None else
+                         (caller.f_code.co_filename, caller.f_lineno))
+        return self._tracers[1]
+
+    def begin(self, phase: str) -> None:
+        """Start phase (ends the open one; phases never nest)."""
+        self.end()
+        self._phase = phase
+        tracemalloc.reset_peak()
+        self._phase_start, _peak = tracemalloc.get_traced_memory()
+        self._line_peak = self._phase_start
+        self._line_base = self._phase_start
+
+    def end(self) -> None:
+        if self._phase is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._line_peak)  # the line tracer resets the peak
+        stats = self.phases.get(self._phase)
+        if stats is None:
+            stats = self.phases[self._phase] = PhaseStats()
+        above = peak - self._phase_start
+        stats.calls += 1
+        stats.net_bytes += current - self._phase_start
+        stats.transient_bytes += above
+        stats.max_peak = max(stats.max_peak, above)
+        self._tick_peak = max(self._tick_peak, peak)
+        self._phase = None
+
+    def update_agent(self, a, dt, water, bushes) -> bool:
+        """simulation.update_agent with its three halves as phases."""
+        self.begin("plan")
+        status = sim.plan_agent(a, dt, water, bushes)
+        if status is not None:
+            self.end()
+            return status
+        self.begin("move")
+        nx, ny = sim.propose_move(a, dt)
+        self.begin("resolve")
+        alive = sim.resolve_move(a, nx, ny, water, bushes)
+        self.end()
+        return alive
+
+    # -----------------------------------------------------
+    # reporting
+    # -----------------------------------------------------
+    def report(self, top: Optional[int] = None) -> dict:
+        top = top or cfg.PROFILE["ALLOC_TOP"]
+        ticks = max(1, self.ticks)
+        sites = sorted(self.site_bytes, key=self.site_bytes.get, reverse=True)[:top]
+        sampled = max(1, self.site_ticks)
+        return {
+            "ticks": self.ticks,
+            "tick": {
+                "mean_net_bytes": sum(self.tick_net) / ticks,
+                "mean_peak_bytes": sum(self.tick_peak) / ticks,
+                "max_peak_bytes": max(self.tick_peak, default=0),
+            },
+            "phases": {
+                name: {
+                    "calls": s.calls,
+                    "net_bytes_per_tick": s.net_bytes / ticks,
+                    "transient_bytes_per_tick": s.transient_bytes / ticks,
+                    "transient_bytes_per_call": s.transient_bytes / max(1, s.calls),
+                    "max_peak_bytes": s.max_peak,
+                }
+                for name, s in sorted(self.phases.items(),
+                                      key=lambda kv: kv[1].transient_bytes,
+                                      reverse=True)
+            },
+            "site_ticks": self.site_ticks,
+            "top_sites": [
+                {"site": f"{filename}:{lineno}",
+                 "bytes_per_tick": self.site_bytes[(filename, lineno)] / sampled,
+                 "runs_per_tick": self.site_count[(filename, lineno)] / sampled}
+                for filename, lineno in sites
+            ],
+        }
+
+    def format_report(self, top: Optional[int] = None) -> str:
+        rep = self.report(top)
+        t = rep["tick"]
+        lines = [
+            f"allocations over {rep['ticks']} ticks: "
+            f"net {t['mean_net_bytes']:.0f} B/tick, "
+            f"peak {t['mean_peak_bytes']:.0f} B/tick (max {t['max_peak_bytes']} B)",
+            f"{'phase':<12}{'calls':>10}{'transient B/tick':>18}"
+            f"{'B/call':>10}{'net B/tick':>12}",
+        ]
+        for name, p in rep["phases"].items():
+            lines.append(
+                f"{name:<12}{p['calls']:>10}{p['transient_bytes_per_tick']:>18.0f}"
+                f"{p['transient_bytes_per_call']:>10.0f}{p['net_bytes_per_tick']:>12.0f}")
+        lines.append(f"top allocating lines ({rep['site_ticks']} traced ticks; "
+                     f"bytes and allocating runs per tick):")
+        for s in rep["top_sites"]:
+            filename, _sep, lineno = s["site"].rpartition(":")
+            code = linecache.getline(filename, int(lineno)).strip()
+            lines.append(f"  {s['bytes_per_tick']:>9.0f} B {s['runs_per_tick']:>7.1f}x  "
+                         f"{s['site']}  {code}")
+        return "\n".join(lines)
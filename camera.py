@@ -0,0 +1,78 @@
+"""
+Camera / viewport into the world.
+The world can be much larger than the window; the camera maps world
+coordinates to screen pixels and tells renderers what is visible.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+import config as cfg
+
+
+@dataclass
+class Camera:
+    # world position of the top-left corner of the viewport
+    x: float = 0.0
+    y: float = 0.0
+    zoom: float = 1.0
+    screen_w: int = cfg.WIDTH
+    screen_h: int = cfg.HEIGHT
+
+    def world_to_screen(self, wx: float, wy: float) -> Tuple[int, int]:
+        return (int((wx - self.x) * self.zoom), int((wy - self.y) * self.zoom))
+
+    def screen_to_world(self, sx: float, sy: float) -> Tuple[float, float]:
+        return (self.x + sx / self.zoom, self.y + sy / self.zoom)
+
+    def scale(self, length: float) -> int:
+        """World length -> screen pixels (at least 1 so tiny things stay visible)."""
+        return max(1, int(length * self.zoom))
+
+    def view_rect(self) -> Tuple[float, float, float, float]:
+        """Visible world rectangle as (x0, y0, x1, y1)."""
+        return (
+            self.x,
+            self.y,
+            self.x + self.screen_w / self.zoom,
+            self.y + self.screen_h / self.zoom,
+        )
+
+    def is_visible(self, wx: float, wy: float, radius: float = 0.0) -> bool:
+        """True if a circle at (wx, wy) overlaps the viewport."""
+        x0, y0, x1, y1 = self.view_rect()
+        return (x0 - radius <= wx <= x1 + radius) and (y0 - radius <= wy <= y1 + radius)
+
+    def pan(self, dx_screen: float, dy_screen: float) -> None:
+        """Move the viewport by a screen-space offset."""
+        self.x += dx_screen / self.zoom
+        self.y += dy_screen / self.zoom
+        self.clamp_to_world()
+
+    def zoom_at(self, factor: float, sx: float, sy: float) -> None:
+        """Zoom by factor, keeping the world point under (sx, sy) fixed."""
+        wx, wy = self.screen_to_world(sx, sy)
+        self.zoom = max(cfg.CAMERA["ZOOM_MIN"],
+                        min(cfg.CAMERA["ZOOM_MAX"], self.zoom * factor))
+        self.x = wx - sx / self.zoom
+        self.y = wy - sy / self.zoom
+        self.clamp_to_world()
+
+    def center_on(self, wx: float, wy: float) -> None:
+        self.x = wx - (self.screen_w / self.zoom) / 2.0
+        self.y = wy - (self.screen_h / self.zoom) / 2.0
+        self.clamp_to_world()
+
+    def clamp_to_world(self) -> None:
+        view_w = self.screen_w / self.zoom
+        view_h = self.screen_h / self.zoom
+
+        # if the whole world fits, centre it; otherwise keep the view inside
+        if view_w >= cfg.WORLD_WIDTH:
+            self.x = (cfg.WORLD_WIDTH - view_w) / 2.0
+        else:
+            self.x = max(0.0, min(cfg.WORLD_WIDTH - view_w, self.x))
+
+        if view_h >= cfg.WORLD_HEIGHT:
+            self.y = (cfg.WORLD_HEIGHT - view_h) / 2.0
+        else:
+            self.y = max(0.0, min(cfg.WORLD_HEIGHT - view_h, self.y))
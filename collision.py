@@ -0,0 +1,158 @@
+"""
+Batched collision queries against the static world (pond + bush circles).
+All agents' proposed positions are tested against one concatenated array
+of blob circles with NumPy broadcasting, replacing the per-agent loops in
+touch_circle / _closest_collision_circle. Geometry is exact (same circles,
+same contact and overlap rules), only the loops move into NumPy.
+NumPy is optional (and only imported once a batch query is built): without
+it the scalar path in simulation is used.
+"""
+import importlib.util
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import config as cfg
+import resources as res
+
+np = None  # imported on first use, so startup never pays for numpy
+_has_numpy: Optional[bool] = None  # find_spec result, looked up once
+
+
+@dataclass
+class Contact:
+    """Collision results for one proposed position (see simulation.resolve_move)."""
+    pond_touch: Optional[Tuple[res.Pond, Tuple[float, float, float, float]]] = None
+    pond_hit: Optional[Tuple[float, float, float, float, float]] = None
+    bush: Optional[res.FoodBush] = None
+    bush_index: int = -1
+    bush_touch: Optional[Tuple[float, float, float, float]] = None
+    bush_hit: Optional[Tuple[float, float, float, float, float]] = None
+
+
+NO_CONTACT = Contact()
+
+
+def available() -> bool:
+    global _has_numpy
+    if _has_numpy is None:
+        _has_numpy = np is not None or importlib.util.find_spec("numpy") is not None
+    return _has_numpy
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+class StaticCircles:
+    """
+    Every pond and bush blob circle in flat arrays.
+    owner[i] is the pond index (ponds) or bush index (bushes) of circle i,
+    is_pond[i] tells which list it refers to.
+    """
+
+    def __init__(self, water: res.WaterIndex, bushes: List[res.FoodBush]):
+        if not available():
+            raise RuntimeError("StaticCircles needs numpy")
+        _load_numpy()
+        self.ponds = list(water.ponds)
+        self.bushes = list(bushes)
+
+        rows = []
+        for i, p in enumerate(self.ponds):
+            rows.extend((cx, cy, cr, 1, i) for (cx, cy, cr) in p.circles)
+        for i, b in enumerate(self.bushes):
+            rows.extend((cx, cy, cr, 0, i) for (cx, cy, cr) in b.blob_circles)
+
+        data = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        self.cx = data[:, 0].copy()
+        self.cy = data[:, 1].copy()
+        self.cr = data[:, 2].copy()
+        self.is_pond = data[:, 3] > 0.5
+        self.owner = data[:, 4].astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.cr)
+
+    def query(self, xs, ys, agent_r: float = cfg.AGENT_RADIUS,
+              pond_eps: float = 6.0, bush_eps: float = 4.0,
+              chunk: Optional[int] = None) -> List[Contact]:
+        """
+        One Contact per (xs[i], ys[i]):
+          pond_touch  closest pond circle within agent_r + cr + pond_eps
+          pond_hit    deepest overlapping pond circle
+          bush        first bush (list order) with a circle in touch range,
+                      with its closest touch and deepest overlap
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        n = len(xs)
+        if n == 0 or len(self) == 0:
+            return [NO_CONTACT] * n
+
+        chunk = chunk or cfg.COLLISION["CHUNK"]
+        out: List[Contact] = []
+        for start in range(0, n, chunk):
+            out.extend(self._query_chunk(xs[start:start + chunk],
+                                         ys[start:start + chunk],
+                                         agent_r, pond_eps, bush_eps))
+        return out
+
+    def _query_chunk(self, xs, ys, agent_r, pond_eps, bush_eps) -> List[Contact]:
+        cx, cy, cr = self.cx, self.cy, self.cr
+        is_pond = self.is_pond
+        owner = self.owner
+
+        dist = np.hypot(xs[:, None] - cx[None, :], ys[:, None] - cy[None, :])
+        reach = agent_r + cr[None, :]
+        overlap = reach - dist
+
+        pond_touch = is_pond & (dist <= reach + pond_eps)
+        bush_touch = ~is_pond & (dist <= reach + bush_eps)
+        pond_over = is_pond & (overlap > 0.0)
+
+        any_pond_touch = pond_touch.any(axis=1)
+        any_pond_over = pond_over.any(axis=1)
+        any_bush = bush_touch.any(axis=1)
+
+        inf = np.inf
+        pt_idx = np.where(pond_touch, dist, inf).argmin(axis=1)
+        ph_idx = np.where(pond_over, overlap, -inf).argmax(axis=1)
+
+        # first touched bush in list order, then its closest / deepest circle
+        big = np.iinfo(np.int64).max
+        first_bush = np.where(bush_touch, owner[None, :], big).min(axis=1)
+        same = ~is_pond[None, :] & (owner[None, :] == first_bush[:, None])
+        bt_idx = np.where(same & bush_touch, dist, inf).argmin(axis=1)
+        bush_over = same & (overlap > 0.0)
+        any_bush_over = bush_over.any(axis=1)
+        bh_idx = np.where(bush_over, overlap, -inf).argmax(axis=1)
+
+        hits = np.flatnonzero(any_pond_touch | any_pond_over | any_bush)
+        out = [NO_CONTACT] * len(xs)
+        for i in hits.tolist():
+            c = Contact()
+            if any_pond_touch[i]:
+                j = pt_idx[i]
+                c.pond_touch = (self.ponds[owner[j]],
+                                (float(cx[j]), float(cy[j]), float(cr[j]),
+                                 float(dist[i, j])))
+            if any_pond_over[i]:
+                j = ph_idx[i]
+                c.pond_hit = (float(cx[j]), float(cy[j]), float(cr[j]),
+                              float(dist[i, j]), float(overlap[i, j]))
+            if any_bush[i]:
+                j = bt_idx[i]
+                c.bush_index = int(first_bush[i])
+                c.bush = self.bushes[c.bush_index]
+                c.bush_touch = (float(cx[j]), float(cy[j]), float(cr[j]),
+                                float(dist[i, j]))
+                if any_bush_over[i]:
+                    j = bh_idx[i]
+                    c.bush_hit = (float(cx[j]), float(cy[j]), float(cr[j]),
+                                  float(dist[i, j]), float(overlap[i, j]))
+            out[i] = c
+        return out
@@ -17,6 +17,10 @@ COLOURS = {
     # Chatbox colors (state indicators)
     "CHATBOX_BASE": (186, 186, 177),    # Light grey (default)
     "CHATBOX_CRITICAL": (255, 150, 150),  # Red
+
+    # Trajectory trails (trails.py)
+    "TRAIL": (250, 235, 120),
+    "TRAIL_ALL": (90, 140, 85),
 }
 
 # ICONS for UI
@@ -30,6 +34,57 @@ ICONS = {
 WIDTH, HEIGHT = 1280, 720
 FPS = 60
 
+# Simulation stepping
+SIM = {
+    "THREADED": False,   # step the world on a worker thread (main.py)
+    "HZ": 60,            # fixed simulation rate (step dt = 1 / HZ)
+    "FLAT_OUT": False,   # threaded: step as fast as possible instead of HZ
+    "ANALYTIC_STATS": False,  # integrate stats exactly (allows large dt)
+
+    # sub-stepping (unthreaded main loop)
+    "MAX_STEPS_PER_FRAME": 4,    # normal cap on fixed steps per frame
+    "MAX_CATCHUP_STEPS": 30,     # cap on a frame whose drawing is skipped
+    "MAX_SKIPPED_RENDERS": 3,    # skipped frames in a row before dropping time
+
+    # viewer time scale (keys 1-4; space pauses, "." single-steps)
+    "SPEEDS": (1, 10, 100, None),  # None = as fast as the frame budget allows
+    "FAST_FORWARD_BUDGET": 0.8,    # share of a display frame spent stepping
+}
+
+# World (simulation space; may be larger than the screen)
+WORLD_WIDTH, WORLD_HEIGHT = WIDTH, HEIGHT
+
+# Camera (viewport into the world)
+CAMERA = {
+    "PAN_SPEED": 900.0,        # screen px per second (keyboard pan)
+    "ZOOM_MIN": 0.05,
+    "ZOOM_MAX": 4.0,
+    "ZOOM_STEP": 1.15,         # per mouse-wheel notch
+}
+
+# Viewer drawing (render.py)
+RENDER = {
+    # redraw and push only the areas that changed (agents, eaten / regrown
+    # food, overlays) over a cached background, instead of a full flip;
+    # any camera move still redraws the whole frame
+    "DIRTY_RECTS": False,
+}
+
+# Trajectory trails (trails.py; "T" in the viewer exports them as CSV)
+TRAIL = {
+    "ENABLED": True,       # trail behind the followed agent
+    "LENGTH": 600,         # samples kept (ring buffer)
+    "INTERVAL": 0.1,       # sim seconds between samples
+    "WIDTH": 2,
+
+    "ALL_AGENTS": False,   # also a coarse trail for every agent
+    "ALL_SLOTS": 1024,     # agents tracked at once
+    "ALL_LENGTH": 32,
+    "ALL_INTERVAL": 1.0,
+
+    "EXPORT_DIR": ".",
+}
+
 # Agents
 NUM_AGENTS = 20
 AGENT_RADIUS = 8
@@ -74,7 +129,11 @@ RATES = {
 }
 
 RESOURCES = {
-    # pond blob
+    # pond blobs
+    "NUM_PONDS": 1,
+    "POND_MIN_DIST": 450,       # between pond centres
+    "POND_SPAWN_ATTEMPTS": 50,
+    "WATER_INDEX_CELL": 256,    # px; grid cell size of the water index
     "POND_MARGIN": 100,
     "POND_CIRCLES": 8,
     "POND_RADIUS_MIN": 35,
@@ -124,6 +183,90 @@ SENSING = {
     "WAYPOINT_TIMEOUT": 4.0,       # seconds before forcing a new waypoint
 }
 
+CROWDING = {
+    "SEPARATION_RADIUS": 22.0,     # px; neighbours closer than this push apart
+    "SEPARATION_STRENGTH": 0.9,    # velocity added per unit of crowding
+    "POND_MAX_DRINKERS": 6,        # agents drinking at one pond at once
+    "BUSH_MAX_EATERS": 2,          # agents eating at one bush at once
+    "QUEUE_TIMEOUT": 6.0,          # seconds an agent waits at a full resource
+    "GRID_CELL": 64.0,             # px; per-tick agent neighbour grid cell size
+}
+
+# Level-of-detail scheduling for idle agents
+LOD = {
+    "ENABLED": True,
+    "INTERVAL": 4,             # idle agents update every N ticks
+    "PROMOTE_MARGIN": 2.0,     # seconds of headroom before a threshold
+}
+
+# Wake-time queue for agents frozen eating / drinking
+WAKE_QUEUE = {
+    "ENABLED": True,
+    "MIN_SLEEP_TICKS": 2,      # don't bother parking for shorter waits
+}
+
+# Flow fields toward ponds/bushes (flowfield.py, needs numpy)
+# Built with the world; without numpy agents steer straight at targets.
+FLOW = {
+    "ENABLED": False,
+    "CELL": 16,                # grid resolution (px)
+    "RADIUS": 400,             # px past a blob that its field covers
+    "CLEARANCE": 12,           # extra margin around blobs (about half a cell diagonal)
+    "GOAL_PAD": 4,             # cells this close to the target blob count as arrived
+    "BLOCKED_COST": 10.0,      # step cost multiplier through blob cells
+    "LOOKAHEAD": 4,            # cells ahead along the path to aim at
+}
+
+# Opt-in allocation profiling (allocprof.py, tracemalloc)
+PROFILE = {
+    "ALLOC_FRAMES": 1,          # traceback depth kept per allocation
+    "ALLOC_SITES_EVERY": 10,    # every Nth tick is traced line by line
+    "ALLOC_TOP": 15,            # lines listed in the report
+}
+
+# Metrics endpoint (metrics.py): Prometheus text on localhost
+METRICS = {
+    "ENABLED": False,          # main.py serves while the window is open
+    "HOST": "127.0.0.1",
+    "PORT": 9108,
+    "WINDOW": 600,             # recent ticks kept for rate / percentiles
+}
+
+# Batched collision (collision.py, needs numpy)
+# All moving agents plan first, one broadcasted query tests every proposed
+# position against every pond/bush circle, then agents resolve in order.
+COLLISION = {
+    "BATCH": False,
+    "CHUNK": 4096,             # agents per broadcast (bounds N x circles memory)
+}
+
+# World cache (worldcache.py): seeded layouts and their flow fields on disk,
+# so runs over the same seeds skip world generation.
+WORLD_CACHE = {
+    "DIR": None,               # cache directory; None = off
+    "FLOW": True,              # store flow fields with the layout (when built)
+}
+
+# Partitioned worlds (partition.py): one world tiled into regions, each
+# stepped by its own process; food and border traffic in shared memory.
+PARTITION = {
+    "HALO": None,              # px of border shared with neighbours (None: widest vision)
+    "HALO_CAPACITY": 65536,    # border agents one region can publish per tick
+    "OUTBOX_BYTES": 1 << 22,   # pickled migrants one region can send per tick
+    "FALLBACK": True,          # headless: one process when cores < regions
+}
+
+REPRODUCTION = {
+    "MATE_RADIUS": 28.0,         # px; partner must be this close
+    "MIN_AGE": 20.0,             # seconds before an agent can mate
+    "COOLDOWN": 30.0,            # seconds between matings
+    "MIN_HEALTH": 60.0,
+    "ENERGY_COST": 20.0,         # paid by each parent
+    "HUNGER_COST": 10.0,         # parents get hungrier
+    "MUTATION_SD": 0.05,         # gaussian noise on each trait multiplier
+    "MAX_AGENTS": 50000,         # population cap
+}
+
 MEMORY = {
     "TIMEOUT": 20.0,  # seconds before memory expires
 }
@@ -0,0 +1,400 @@
+"""
+Differential testing: the frozen reference step vs an optimized engine.
+
+The reference is reference.py, a frozen copy of the plain scalar tick
+that shares none of the code the optimizations rewrite. A candidate
+engine is the live world.step_world with some optimizations (LOD, wake
+queue, analytic stats, batched collision, flow fields) switched on, or
+any other step function. Both worlds are built from the same seed and
+stepped with the same fixed dt, each with its own random stream
+(world.rng).
+
+Exact engines ("scalar", "wake") must follow the reference agent by
+agent: after every tick living agents are compared field by field, and
+the first divergent tick, agent and field is reported. Agents the
+candidate has deliberately deferred this tick (asleep in the wake queue)
+are not compared until they are brought up to date.
+
+The others change the arithmetic (analytic integration), the motion (an
+LOD catch-up moves an idle agent over the whole lumped dt in one step),
+the update order (batch plans every agent before any moves) or the
+steering itself (flow), so single runs part ways within ticks. They are
+run over several seeds and the end-of-run population statistics compared
+instead, with the candidate's deferred agent-ticks reported so a run that
+never exercised the optimization shows up as such:
+
+    python -m differential --engine wake --ticks 4000 --agents 60 --seed 3
+    python -m differential --engine batch --runs 12
+    python -m differential --engine lod --scenario settled --ticks 1000
+
+A scenario prepares both worlds after creation. In the default one
+agents only settle (eat, drink and get a home) late in a run, so LOD
+rarely has an idle agent to defer; "settled" starts every agent settled.
+"""
+import argparse
+import math
+import statistics
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import config as cfg
+import reference
+import world as wd
+from headless import apply_overrides, config_overlay
+
+# every optimization off: the live engines' baseline
+REFERENCE = {
+    "LOD.ENABLED": False,
+    "WAKE_QUEUE.ENABLED": False,
+    "SIM.ANALYTIC_STATS": False,
+    "COLLISION.BATCH": False,
+    "FLOW.ENABLED": False,
+}
+
+# candidates, as changes on top of REFERENCE
+ENGINES = {
+    "scalar": {},
+    "lod": {"LOD.ENABLED": True},
+    "wake": {"WAKE_QUEUE.ENABLED": True},
+    "analytic": {"SIM.ANALYTIC_STATS": True},
+    "batch": {"COLLISION.BATCH": True},
+    "flow": {"FLOW.ENABLED": True},
+    "all": {"LOD.ENABLED": True, "WAKE_QUEUE.ENABLED": True,
+            "SIM.ANALYTIC_STATS": True, "COLLISION.BATCH": True,
+            "FLOW.ENABLED": True},
+}
+
+# engines that are not step-for-step equivalent: compared statistically
+STATISTICAL = {"lod", "analytic", "batch", "flow", "all"}
+
+FLOAT_FIELDS = ("x", "y", "velocityX", "velocityY",
+                "hunger", "thirst", "energy", "health", "age")
+EXACT_FIELDS = ("action", "alive")
+
+# end-of-run statistics compared across seeds
+METRICS = ("population", "births", "deaths", "food_left",
+           "mean_health", "mean_age")
+
+
+def settle(world: wd.World) -> None:
+    """
+    Every agent starts fed and watered, with a home where it stands and
+    the nearest pond and bush remembered: comfortable wanderers away from
+    resources are LOD-idle from the first tick.
+    """
+    now = int(world.time * 1000)
+    for a in world.agents:
+        pond = min(world.water.ponds, key=lambda p: math.hypot(p.cx - a.x, p.cy - a.y))
+        bush = min(world.bushes, key=lambda b: math.hypot(b.x - a.x, b.y - a.y))
+        a.home_pos = (a.x, a.y)
+        a.has_eaten = a.has_drunk = True
+        a.last_water_pos = (pond.cx, pond.cy)
+        a.last_water_time_ms = now
+        a.food_memory = [(bush.x, bush.y, now)]
+
+
+SCENARIOS: Dict[str, Optional[Callable[[wd.World], None]]] = {
+    "default": None,
+    "settled": settle,
+}
+
+
+@dataclass
+class Engine:
+    name: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    step: Callable[[wd.World, float], None] = wd.step_world
+    create: Callable[..., wd.World] = wd.create_world
+    exact: bool = True      # compared agent by agent (else statistically)
+
+
+def reference_engine() -> Engine:
+    return Engine("reference", step=reference.step_world,
+                  create=reference.create_world)
+
+
+@dataclass
+class Divergence:
+    tick: int
+    agent_id: Optional[int]
+    field: str
+    reference: Any
+    candidate: Any
+
+
+@dataclass
+class DiffResult:
+    engine: str
+    ticks: int                          # ticks compared
+    compared: int = 0                   # agent states compared
+    deferred: int = 0                   # agent states skipped (deferred)
+    max_error: Dict[str, float] = field(default_factory=dict)
+    divergence: Optional[Divergence] = None
+
+
+@dataclass
+class StatResult:
+    engine: str
+    runs: int
+    ticks: int
+    reference: Dict[str, List[float]]   # metric -> one value per run
+    candidate: Dict[str, List[float]]   # (+ "deferred" agent-ticks per run)
+    z: Dict[str, float] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+
+
+def engine_named(name: str) -> Engine:
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r} (one of {', '.join(ENGINES)})")
+    return Engine(name, dict(ENGINES[name]), exact=name not in STATISTICAL)
+
+
+def _deferred(a) -> bool:
+    return a.asleep or a.lod_dt > 0.0
+
+
+def _create(engine: Engine, num_agents: int, seed: int,
+            scenario: Optional[Callable[[wd.World], None]]) -> wd.World:
+    world = engine.create(num_agents, seed=seed)
+    if scenario is not None:
+        scenario(world)
+    return world
+
+
+def compare_worlds(ref: wd.World, cand: wd.World, tol: float,
+                   result: DiffResult) -> Optional[Divergence]:
+    """Compare one tick; update result counters, return the first divergence."""
+    tick = ref.tick
+    ref_agents = {a.id: a for a in ref.agents}
+    cand_agents = {a.id: a for a in cand.agents}
+
+    if ref_agents.keys() != cand_agents.keys():
+        missing = sorted(ref_agents.keys() - cand_agents.keys())
+        extra = sorted(cand_agents.keys() - ref_agents.keys())
+        return Divergence(tick, (missing or extra)[0], "population",
+                          f"{len(ref_agents)} (has {missing[:5]})",
+                          f"{len(cand_agents)} (has {extra[:5]})")
+
+    for i, (rb, cb) in enumerate(zip(ref.bushes, cand.bushes)):
+        if rb.food_count != cb.food_count:
+            return Divergence(tick, None, f"bush[{i}].food", rb.food_count, cb.food_count)
+
+    max_error = result.max_error
+    for agent_id, ra in ref_agents.items():
+        ca = cand_agents[agent_id]
+        if _deferred(ca):
+            result.deferred += 1
+            continue
+        result.compared += 1
+        for name in EXACT_FIELDS:
+            rv, cv = getattr(ra, name), getattr(ca, name)
+            if rv != cv:
+                return Divergence(tick, agent_id, name, rv, cv)
+        for name in FLOAT_FIELDS:
+            rv, cv = getattr(ra, name), getattr(ca, name)
+            err = abs(rv - cv)
+            if not err <= tol:  # also catches NaN
+                return Divergence(tick, agent_id, name, rv, cv)
+            if err > max_error.get(name, 0.0):
+                max_error[name] = err
+    return None
+
+
+def run_differential(candidate: Engine, ticks: int, num_agents: int,
+                     seed: int = 0, dt: Optional[float] = None,
+                     tol: float = 1e-6,
+                     reference: Optional[Engine] = None,
+                     scenario: Optional[Callable[[wd.World], None]] = None) -> DiffResult:
+    """Step reference and candidate side by side; stop at the first divergence."""
+    dt = dt if dt is not None else 1.0 / cfg.SIM["HZ"]
+    reference = reference or reference_engine()
+    engines = (reference, candidate)
+
+    worlds: List[wd.World] = []
+    for engine in engines:
+        with config_overlay({**REFERENCE, **engine.overrides}):
+            worlds.append(_create(engine, num_agents, seed, scenario))
+
+    result = DiffResult(engine=candidate.name, ticks=0)
+    for _tick in range(ticks):
+        for k, engine in enumerate(engines):
+            with config_overlay({**REFERENCE, **engine.overrides}):
+                engine.step(worlds[k], dt)
+
+        result.ticks += 1
+        divergence = compare_worlds(worlds[0], worlds[1], tol, result)
+        if divergence is not None:
+            result.divergence = divergence
+            break
+        if not worlds[0].agents:
+            break
+    return result
+
+
+def world_metrics(world: wd.World) -> Dict[str, float]:
+    """The METRICS of one world."""
+    agents = world.agents
+    n = len(agents)
+    return {
+        "population": n,
+        "births": world.births,
+        "deaths": sum(world.deaths.values()),
+        "food_left": sum(b.food_count for b in world.bushes),
+        "mean_health": sum(a.health for a in agents) / n if n else 0.0,
+        # an LOD-idle agent's age lags by its pending catch-up time
+        "mean_age": sum(a.age + a.lod_dt for a in agents) / n if n else 0.0,
+    }
+
+
+def sample_metrics(engine: Engine, ticks: int, num_agents: int,
+                   seeds: Sequence[int], dt: Optional[float] = None,
+                   scenario: Optional[Callable[[wd.World], None]] = None) -> Dict[str, List[float]]:
+    """
+    Run engine once per seed; metric -> end-of-run value per seed, plus
+    "deferred": agent-ticks the engine held back (asleep or LOD-idle).
+    """
+    dt = dt if dt is not None else 1.0 / cfg.SIM["HZ"]
+    samples: Dict[str, List[float]] = {name: [] for name in (*METRICS, "deferred")}
+    with config_overlay({**REFERENCE, **engine.overrides}):
+        for seed in seeds:
+            world = _create(engine, num_agents, seed, scenario)
+            deferred = 0
+            for _tick in range(ticks):
+                engine.step(world, dt)
+                deferred += sum(1 for a in world.agents if _deferred(a))
+            for name, value in world_metrics(world).items():
+                samples[name].append(value)
+            samples["deferred"].append(deferred)
+    return samples
+
+
+def _welch_z(ref: Sequence[float], cand: Sequence[float]) -> float:
+    """Difference of means over its standard error (0 / inf when both are constant)."""
+    diff = statistics.fmean(cand) - statistics.fmean(ref)
+    var = 0.0
+    if len(ref) > 1:
+        var = statistics.variance(ref) / len(ref) + statistics.variance(cand) / len(cand)
+    if var == 0.0:
+        return 0.0 if diff == 0.0 else math.copysign(math.inf, diff)
+    return diff / math.sqrt(var)
+
+
+def run_statistical(candidate: Engine, ticks: int, num_agents: int,
+                    seeds: Sequence[int], dt: Optional[float] = None,
+                    z_max: float = 4.0,
+                    reference: Optional[Engine] = None,
+                    reference_samples: Optional[Dict[str, List[float]]] = None,
+                    scenario: Optional[Callable[[wd.World], None]] = None) -> StatResult:
+    """
+    Run reference and candidate over the same seeds and flag every metric
+    whose means differ by more than z_max standard errors. Pass
+    reference_samples (from sample_metrics) to reuse reference runs.
+    """
+    if reference_samples is None:
+        reference_samples = sample_metrics(reference or reference_engine(),
+                                           ticks, num_agents, seeds, dt, scenario)
+    cand = sample_metrics(candidate, ticks, num_agents, seeds, dt, scenario)
+    result = StatResult(candidate.name, len(seeds), ticks, reference_samples, cand)
+    for name in METRICS:
+        z = _welch_z(reference_samples[name], cand[name])
+        result.z[name] = z
+        if not abs(z) <= z_max:
+            result.failed.append(name)
+    return result
+
+
+def _mean_sd(values: Sequence[float]) -> Tuple[float, float]:
+    sd = statistics.stdev(values) if len(values) > 1 else 0.0
+    return statistics.fmean(values), sd
+
+
+def format_stat_result(result: StatResult) -> str:
+    deferred = int(sum(result.candidate.get("deferred", ())))
+    lines = [f"engine {result.engine}: {result.runs} runs x {result.ticks} ticks, "
+             f"compared statistically, {deferred} agent-ticks deferred"]
+    for name in METRICS:
+        rm, rs = _mean_sd(result.reference[name])
+        cm, cs = _mean_sd(result.candidate[name])
+        lines.append(f"  {name:<12} reference {rm:9.2f} ±{rs:7.2f}   "
+                     f"candidate {cm:9.2f} ±{cs:7.2f}   z {result.z[name]:+.2f}")
+    if result.failed:
+        lines.append(f"DIFFERS in {', '.join(result.failed)}")
+    else:
+        lines.append("no significant difference")
+    return "\n".join(lines)
+
+
+def format_result(result: DiffResult) -> str:
+    lines = [f"engine {result.engine}: {result.ticks} ticks, "
+             f"{result.compared} agent states compared, {result.deferred} deferred"]
+    if result.max_error:
+        worst = ", ".join(f"{k} {v:.3g}" for k, v in
+                          sorted(result.max_error.items(), key=lambda kv: -kv[1]))
+        lines.append(f"max abs error: {worst}")
+    d = result.divergence
+    if d is None:
+        lines.append("no divergence")
+    else:
+        who = "" if d.agent_id is None else f" agent {d.agent_id}"
+        lines.append(f"DIVERGED at tick {d.tick}{who} field {d.field}: "
+                     f"reference {d.reference!r} vs candidate {d.candidate!r}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m differential",
+        description="Compare an optimized engine against the frozen scalar reference.")
+    p.add_argument("--engine", action="append", default=None,
+                   help=f"candidate engine ({', '.join(ENGINES)}); repeatable")
+    p.add_argument("--ticks", type=int, default=2000)
+    p.add_argument("--agents", type=int, default=60)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--dt", type=float, default=None)
+    p.add_argument("--tol", type=float, default=1e-6,
+                   help="absolute tolerance for float fields (exact engines)")
+    p.add_argument("--runs", type=int, default=8,
+                   help="seeds per statistical engine (seed, seed+1, ...)")
+    p.add_argument("--z", dest="z_max", type=float, default=4.0,
+                   help="allowed |difference of means| in standard errors")
+    p.add_argument("--scenario", choices=sorted(SCENARIOS), default="default",
+                   help="how both worlds are prepared after creation")
+    p.add_argument("--set", dest="overrides", action="append", default=[],
+                   metavar="NAME=VALUE", help="config override for both engines")
+    args = p.parse_args(argv)
+
+    try:
+        apply_overrides(args.overrides)
+        engines = [engine_named(n) for n in (args.engine or ["all"])]
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    scenario = SCENARIOS[args.scenario]
+    status = 0
+    seeds = range(args.seed, args.seed + args.runs)
+    ref_samples = None   # shared by every statistical engine
+    for engine in engines:
+        if engine.exact:
+            result = run_differential(engine, args.ticks, args.agents,
+                                      seed=args.seed, dt=args.dt, tol=args.tol,
+                                      scenario=scenario)
+            print(format_result(result))
+            failed = result.divergence is not None
+        else:
+            if ref_samples is None:
+                ref_samples = sample_metrics(reference_engine(), args.ticks,
+                                             args.agents, seeds, args.dt, scenario)
+            stat = run_statistical(engine, args.ticks, args.agents, seeds,
+                                   dt=args.dt, z_max=args.z_max,
+                                   reference_samples=ref_samples, scenario=scenario)
+            print(format_stat_result(stat))
+            failed = bool(stat.failed)
+        if failed:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Trait fitness: score candidate Traits on a fixed set of worlds.
+
+    python -m fitness --worlds 8 --agents 40 --seconds 120 --workers 4 \\
+        --candidate 1.2,1.0,0.9,1.0 --random 32 --seed 5
+
+K worlds (seeds seed .. seed+K-1) are built once, flow fields included,
+and cached as pickles; each worker process unpickles the set once and then
+copies a world per episode. Every candidate is scored on every world by a
+short headless episode in which all starting agents carry the candidate's
+traits and nobody is born, so the founders are the whole population. The
+world's random stream is reseeded per world, so all candidates meet the
+same food regrowth and the same coin flips. Per episode, averaged over the
+founders:
+
+- survival_time: seconds alive, capped at the episode length;
+- food_eaten / water_sips: items picked and sips taken;
+- resources: hunger + thirst relieved (food x EAT_AMOUNT + sips x DRINK_AMOUNT).
+
+A candidate's fitness is the mean over the K worlds.
+"""
+import argparse
+import json
+import pickle
+import random
+import sys
+from dataclasses import asdict, dataclass, fields
+from typing import List, Optional, Sequence, Tuple
+
+import config as cfg
+import traits as tr
+import world as wd
+from headless import apply_overrides, config_overlay, parse_overrides
+from metrics import EngineStats
+from randstream import RandomStream
+
+TRAIT_NAMES = tuple(f.name for f in fields(tr.Traits))
+
+
+@dataclass
+class Fitness:
+    survival_time: float = 0.0
+    food_eaten: float = 0.0
+    water_sips: float = 0.0
+    resources: float = 0.0
+
+
+def build_worlds(count: int, num_agents: int, seed: int = 0) -> List[bytes]:
+    """count fresh worlds (seeds seed ..), pickled with their flow fields."""
+    blobs = []
+    for k in range(count):
+        world = wd.create_world(num_agents, seed=seed + k)
+        blobs.append(pickle.dumps(world, pickle.HIGHEST_PROTOCOL))
+    return blobs
+
+
+def run_episode(blob: bytes, traits: tr.Traits, seconds: float, dt: float,
+                seed: int) -> Fitness:
+    """One candidate on one cached world."""
+    world = pickle.loads(blob)
+    traits = tr.clamp_traits(traits)
+    founders = list(world.agents)
+    for a in founders:
+        a.traits = traits
+    world.stats = EngineStats()
+    world.stats.on_spawn(founders)
+
+    world.rng = RandomStream(seed)  # same regrowth / tie-breaks for every candidate
+    ticks = max(1, int(round(seconds / dt)))
+    alive_ticks = 0
+    with config_overlay({"REPRODUCTION.MAX_AGENTS": 0}):
+        while world.tick < ticks and world.agents:
+            wd.step_world(world, dt)
+            alive_ticks += len(world.agents)
+
+    n = max(1, len(founders))
+    food = sum(a.food_eaten for a in founders)
+    sips = sum(a.water_sips for a in founders)
+    res = cfg.RESOURCES
+    return Fitness(
+        survival_time=alive_ticks * dt / n,
+        food_eaten=food / n,
+        water_sips=sips / n,
+        resources=(food * res["EAT_AMOUNT"] + sips * res["DRINK_AMOUNT"]) / n,
+    )
+
+
+def mean_fitness(scores: Sequence[Fitness]) -> Fitness:
+    k = max(1, len(scores))
+    return Fitness(**{f.name: sum(getattr(s, f.name) for s in scores) / k
+                      for f in fields(Fitness)})
+
+
+# worker-process state: the cached worlds, unpickled once per process
+_worlds: List[bytes] = []
+_episode: dict = {}
+
+
+def _init_worker(blobs: List[bytes], episode: dict, overrides: Sequence[str]) -> None:
+    apply_overrides(overrides)
+    _worlds[:] = blobs
+    _episode.update(episode)
+
+
+def _score(job: Tuple[int, tr.Traits]) -> Fitness:
+    k, traits = job
+    return run_episode(_worlds[k], traits, _episode["seconds"], _episode["dt"],
+                       _episode["seed"] + k)
+
+
+class FitnessEvaluator:
+    """
+    Scores batches of trait vectors on K cached worlds.
+
+        with FitnessEvaluator(worlds=8, agents=40, seconds=120, workers=4) as ev:
+            scores = ev.evaluate([tr.Traits(1.2, 1.0, 0.9, 1.0), ...])
+
+    The worlds are built in the constructor; the worker pool starts on the
+    first evaluate() and is reused for later batches. overrides
+    (NAME=VALUE, as --set) apply to building the worlds and to every
+    episode, serial or in workers, without touching this process's config.
+    """
+
+    def __init__(self, worlds: int = 8, agents: int = 40, seconds: float = 120.0,
+                 seed: int = 0, dt: Optional[float] = None, workers: int = 1,
+                 overrides: Sequence[str] = ()):
+        self.episode = {"seconds": seconds, "seed": seed,
+                        "dt": dt if dt is not None else 1.0 / cfg.SIM["HZ"]}
+        self.workers = workers
+        self.overrides = list(overrides)
+        self.overlay = parse_overrides(self.overrides)
+        with config_overlay(self.overlay):
+            self.blobs = build_worlds(worlds, agents, seed)
+        self._pool = None
+
+    def evaluate(self, candidates: Sequence[tr.Traits]) -> List[Fitness]:
+        """Mean fitness over the worlds for each candidate, in order."""
+        jobs = [(k, t) for t in candidates for k in range(len(self.blobs))]
+        if self.workers > 1:
+            if self._pool is None:
+                from multiprocessing import Pool  # only parallel runs pay for it
+                self._pool = Pool(self.workers, _init_worker,
+                                  (self.blobs, self.episode, self.overrides))
+            scores = self._pool.map(_score, jobs, chunksize=max(1, len(self.blobs) // 2))
+        else:
+            with config_overlay(self.overlay):
+                _init_worker(self.blobs, self.episode, ())
+                scores = [_score(job) for job in jobs]
+        k = len(self.blobs)
+        return [mean_fitness(scores[i:i + k]) for i in range(0, len(scores), k)]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "FitnessEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def parse_traits(text: str) -> tr.Traits:
+    """"vision,speed,metabolism,memory" multipliers -> Traits."""
+    try:
+        values = [float(v) for v in text.split(",")]
+    except ValueError:
+        values = []
+    if len(values) != len(TRAIT_NAMES):
+        raise ValueError(f"candidate {text!r} is not {','.join(TRAIT_NAMES)}")
+    return tr.Traits(*values)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m fitness",
+        description="Score trait vectors by short headless episodes on fixed worlds.")
+    p.add_argument("--candidate", action="append", default=[],
+                   metavar="V,S,M,MEM", help="trait multipliers to score (repeatable)")
+    p.add_argument("--random", type=int, default=0,
+                   help="also score this many random first-generation trait vectors")
+    p.add_argument("--worlds", type=int, default=8, help="cached worlds (K)")
+    p.add_argument("--agents", type=int, default=40, help="founders per world")
+    p.add_argument("--seconds", type=float, default=120.0, help="episode length (sim)")
+    p.add_argument("--dt", type=float, default=None)
+    p.add_argument("--seed", type=int, default=0,
+                   help="seed of the first world; also seeds --random")
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--set", dest="overrides", action="append", default=[],
+                   metavar="NAME=VALUE", help="config override")
+    args = p.parse_args(argv)
+
+    try:
+        apply_overrides(args.overrides)
+        candidates = [parse_traits(c) for c in args.candidate]
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    rng = random.Random(args.seed)
+    candidates += [tr.random_traits(rng) for _ in range(args.random)]
+    if not candidates:
+        candidates = [tr.Traits()]
+
+    with FitnessEvaluator(args.worlds, args.agents, args.seconds, seed=args.seed,
+                          dt=args.dt, workers=args.workers,
+                          overrides=args.overrides) as ev:
+        scores = ev.evaluate(candidates)
+
+    ranked = sorted(zip(candidates, scores),
+                    key=lambda cs: (cs[1].survival_time, cs[1].resources), reverse=True)
+    print(json.dumps([{"traits": asdict(c), "fitness": asdict(s)} for c, s in ranked],
+                     indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
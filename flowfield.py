@@ -0,0 +1,242 @@
+"""
+Flow fields toward static resources (needs numpy).
+The world is rasterised once into a grid of cells blocked by pond and bush
+blobs (inflated by the agent radius plus a clearance margin). Each pond or
+bush gets a field over a window reaching FLOW.RADIUS past its blob: a
+geodesic distance transform from the cells touching it (8-neighbour steps,
+blocked cells at BLOCKED_COST), computed by whole-array relaxation sweeps,
+then a unit heading per cell toward the cell LOOKAHEAD steps down the path.
+Steering toward a resource is a dictionary lookup plus a cell index and
+routes around blobs in the way instead of walking into them and bouncing;
+outside the window there is no heading and agents steer straight.
+Every field is built when the world is created and kept as flat arrays,
+so nothing is built mid-tick.
+"""
+import math
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config as cfg
+import resources as res
+
+np = None  # imported when fields are built, so startup never pays for numpy
+
+_DIAG = math.sqrt(2.0)
+_NEIGHBOURS = (
+    (1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+    (1, 1, _DIAG), (1, -1, _DIAG), (-1, 1, _DIAG), (-1, -1, _DIAG),
+)
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+class FlowField:
+    """
+    Next-step directions toward one resource over a window of the grid
+    (cells x0 .. x0+cols, y0 .. y0+rows); NaN = goal, unreachable or
+    outside the window.
+    """
+
+    def __init__(self, x0: int, y0: int, cols: int, rows: int, cell: float, dx, dy):
+        self.x0 = x0
+        self.y0 = y0
+        self.cols = cols
+        self.rows = rows
+        self.cell = cell
+        self.dx = dx
+        self.dy = dy
+
+    @property
+    def window(self) -> Tuple[int, int, int, int]:
+        return (self.x0, self.y0, self.cols, self.rows)
+
+    def direction(self, x: float, y: float) -> Optional[Tuple[float, float]]:
+        cx = int(x // self.cell) - self.x0
+        cy = int(y // self.cell) - self.y0
+        if 0 <= cx < self.cols and 0 <= cy < self.rows:
+            i = cy * self.cols + cx
+            u = self.dx[i]
+            if u == u:
+                return (u, self.dy[i])
+        return None
+
+    def __getstate__(self) -> dict:
+        # dx / dy may be views of a mapped worldcache file
+        state = self.__dict__.copy()
+        state["dx"] = array("d", self.dx)
+        state["dy"] = array("d", self.dy)
+        return state
+
+
+class FlowFields:
+    """All ponds' and bushes' flow fields for one world."""
+
+    def __init__(self, water: res.WaterIndex, bushes: List[res.FoodBush],
+                 bush_grid, cell: Optional[float] = None,
+                 blocked: Optional[bytes] = None,
+                 fields: Optional[Sequence[FlowField]] = None):
+        """Build the fields, or adopt blocked + fields (ponds then bushes) from worldcache."""
+        self.water = water
+        self.bushes = bushes
+        self.bush_grid = bush_grid
+        self.cell = float(cell or cfg.FLOW["CELL"])
+        self.cols = max(1, math.ceil(cfg.WORLD_WIDTH / self.cell))
+        self.rows = max(1, math.ceil(cfg.WORLD_HEIGHT / self.cell))
+
+        if fields is not None:
+            self.blocked = blocked
+            self.fields = list(fields)
+        else:
+            np = _numpy()
+            grid = np.zeros((self.rows, self.cols), dtype=bool)
+            circles = [c for p in water.ponds for c in p.circles]
+            circles += [c for b in bushes for c in b.blob_circles]
+            self._mark(grid, circles, cfg.AGENT_RADIUS + cfg.FLOW["CLEARANCE"])
+            self.blocked = grid.tobytes()
+            self.fields = [self._build(grid, r) for r in self.resources()]
+        self._index()
+
+    def resources(self) -> list:
+        """Ponds then bushes, the order of self.fields."""
+        return [*self.water.ponds, *self.bushes]
+
+    def _index(self) -> None:
+        self._by_id: Dict[int, FlowField] = {
+            id(r): f for r, f in zip(self.resources(), self.fields)}
+
+    def __getstate__(self) -> dict:
+        # keyed by id(resource), which does not survive pickling; blocked
+        # may be a view of a mapped worldcache file
+        state = self.__dict__.copy()
+        del state["_by_id"]
+        state["blocked"] = bytes(self.blocked)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._index()
+
+    # -----------------------------------------------------
+    # lookups
+    # -----------------------------------------------------
+    def resource_at(self, tx: float, ty: float):
+        """
+        The pond or bush a steering target belongs to (pond centre, bush
+        centre or a food item on a bush), else None.
+        """
+        pond = self.water.nearest(tx, ty, 1.0)
+        if pond is not None:
+            return pond
+        for b in self.bush_grid.at(tx, ty):
+            for (cx, cy, cr) in b.blob_circles:
+                if math.hypot(tx - cx, ty - cy) <= cr:
+                    return b
+        return None
+
+    def field_for(self, resource) -> FlowField:
+        return self._by_id[id(resource)]
+
+    def direction_to(self, tx: float, ty: float,
+                     x: float, y: float) -> Optional[Tuple[float, float]]:
+        """Unit step from (x, y) toward the resource at (tx, ty), if routed."""
+        resource = self.resource_at(tx, ty)
+        if resource is None:
+            return None
+        return self._by_id[id(resource)].direction(x, y)
+
+    # -----------------------------------------------------
+    # building
+    # -----------------------------------------------------
+    def _mark(self, grid, circles, pad: float, x0: int = 0, y0: int = 0) -> None:
+        """Set cells of grid (window at x0, y0) whose centre is within r + pad of a circle."""
+        cell = self.cell
+        rows, cols = grid.shape
+        for (x, y, r) in circles:
+            reach = r + pad
+            cx0 = max(0, int((x - reach) // cell) - x0)
+            cx1 = min(cols - 1, int((x + reach) // cell) - x0)
+            cy0 = max(0, int((y - reach) // cell) - y0)
+            cy1 = min(rows - 1, int((y + reach) // cell) - y0)
+            if cx0 > cx1 or cy0 > cy1:
+                continue
+            px = (np.arange(cx0 + x0, cx1 + x0 + 1) + 0.5) * cell - x
+            py = (np.arange(cy0 + y0, cy1 + y0 + 1) + 0.5) * cell - y
+            grid[cy0:cy1 + 1, cx0:cx1 + 1] |= np.hypot(px[None, :], py[:, None]) <= reach
+
+    def _window(self, circles) -> Tuple[int, int, int, int]:
+        """Cells (x0, y0, x1, y1) reaching FLOW.RADIUS past the circles' bounds."""
+        cell, reach = self.cell, cfg.FLOW["RADIUS"]
+        x0 = max(0, int((min(c[0] - c[2] for c in circles) - reach) // cell))
+        y0 = max(0, int((min(c[1] - c[2] for c in circles) - reach) // cell))
+        x1 = min(self.cols, int((max(c[0] + c[2] for c in circles) + reach) // cell) + 1)
+        y1 = min(self.rows, int((max(c[1] + c[2] for c in circles) + reach) // cell) + 1)
+        return x0, y0, x1, y1
+
+    def _build(self, blocked_grid, resource) -> FlowField:
+        circles = resource.circles if isinstance(resource, res.Pond) else resource.blob_circles
+        x0, y0, x1, y1 = self._window(circles)
+        rows, cols = y1 - y0, x1 - x0
+        blocked = blocked_grid[y0:y1, x0:x1]
+        goal = np.zeros((rows, cols), dtype=bool)
+        self._mark(goal, circles,
+                   cfg.AGENT_RADIUS + cfg.FLOW["CLEARANCE"] + cfg.FLOW["GOAL_PAD"], x0, y0)
+
+        # Cost of stepping into each cell from its neighbour at -(dx, dy).
+        # Blob cells (and corners cut past them) are passable at a steep
+        # price: paths go around, but agents already inside the clearance
+        # margin still get a way out.
+        penalty = cfg.FLOW["BLOCKED_COST"]
+        steps = []
+        for dx, dy, cost in _NEIGHBOURS:
+            into = (slice(max(0, dy), rows + min(0, dy)), slice(max(0, dx), cols + min(0, dx)))
+            src = (slice(max(0, -dy), rows + min(0, -dy)), slice(max(0, -dx), cols + min(0, -dx)))
+            hit = blocked[into]
+            if dx and dy:
+                # blocked[src row, dest col] or blocked[dest row, src col]
+                hit = hit | blocked[src[0], into[1]] | blocked[into[0], src[1]]
+            steps.append((into, src, np.where(hit, cost * penalty, cost)))
+
+        # Bellman-Ford sweeps over the whole window until nothing improves
+        dist = np.where(goal, 0.0, np.inf)
+        while True:
+            new = dist.copy()
+            for into, src, cost in steps:
+                np.minimum(new[into], dist[src] + cost, out=new[into])
+            if np.array_equal(new, dist):
+                break
+            dist = new
+
+        # next cell downhill: the first neighbour (in _NEIGHBOURS order)
+        # strictly closer than the cell itself
+        n = rows * cols
+        flat = np.arange(n).reshape(rows, cols)
+        best = dist.copy()
+        step = flat.copy()
+        for dx, dy, _cost in _NEIGHBOURS:
+            into = (slice(max(0, -dy), rows + min(0, -dy)), slice(max(0, -dx), cols + min(0, -dx)))
+            src = (slice(max(0, dy), rows + min(0, dy)), slice(max(0, dx), cols + min(0, dx)))
+            closer = dist[src] < best[into]
+            best[into] = np.where(closer, dist[src], best[into])
+            step[into] = np.where(closer, flat[src], step[into])
+        step[(dist == 0.0) | np.isinf(dist)] = flat[(dist == 0.0) | np.isinf(dist)]
+
+        # aim a few cells down the path rather than at the next cell, so
+        # open ground gives near-straight headings instead of 8-way zigzags
+        step = step.ravel()
+        target = np.arange(n)
+        for _ in range(cfg.FLOW["LOOKAHEAD"]):
+            target = step[target]
+        ox = (target % cols) - (np.arange(n) % cols)
+        oy = (target // cols) - (np.arange(n) // cols)
+        norm = np.hypot(ox, oy)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ux = np.where(norm > 0, ox / norm, np.nan)
+            uy = np.where(norm > 0, oy / norm, np.nan)
+        return FlowField(x0, y0, cols, rows, self.cell,
+                         array("d", ux.tobytes()), array("d", uy.tobytes()))
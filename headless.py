@@ -0,0 +1,371 @@
+"""
+Headless runner for batch jobs (no window).
+
+    python -m headless --agents 200 --bushes 6 --seed 1 --ticks 36000 \\
+        --runs 8 --workers 4 --set RATES.HUNGER_UP=0.5 --out summary.json
+
+Each run steps one world for --ticks ticks or until extinction and reports
+a JSON summary: survival curve, causes of death, trait statistics and
+ticks/sec. Several runs (seeds seed, seed+1, ...) can go to a process pool.
+With --regions one big world is split over processes instead (partition.py).
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import fields
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import config as cfg
+import traits as tr
+import world as wd
+from resultchannel import ResultChannel, ResultRef
+
+
+def parse_overrides(overrides: Sequence[str]) -> Dict[str, Any]:
+    """
+    NAME=VALUE or SECTION.KEY=VALUE overrides -> {name: value}, checked
+    against config. Values are Python literals (numbers, tuples,
+    True/False); anything else is kept as a string.
+    """
+    parsed = {}
+    for item in overrides:
+        name, sep, raw = item.partition("=")
+        if not sep:
+            raise ValueError(f"override {item!r} is not NAME=VALUE")
+        try:
+            value = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            value = raw
+
+        section, _dot, key = name.partition(".")
+        if not hasattr(cfg, section):
+            raise ValueError(f"unknown config name {section!r}")
+        if key and key not in getattr(cfg, section):
+            raise ValueError(f"unknown config key {name!r}")
+        parsed[name] = value
+    return parsed
+
+
+def apply_overrides(overrides: Sequence[str]) -> None:
+    """Apply NAME=VALUE or SECTION.KEY=VALUE overrides to config (parse_overrides)."""
+    for name, value in parse_overrides(overrides).items():
+        section, _dot, key = name.partition(".")
+        if key:
+            getattr(cfg, section)[key] = value
+        else:
+            setattr(cfg, section, value)
+
+
+@contextmanager
+def config_overlay(overrides: Dict[str, Any]):
+    """Temporarily set SECTION.KEY (or NAME) config values."""
+    saved = []
+    for name, value in overrides.items():
+        section, _dot, key = name.partition(".")
+        if key:
+            table = getattr(cfg, section)
+            saved.append((table, key, table[key]))
+            table[key] = value
+        else:
+            saved.append((cfg, section, getattr(cfg, section)))
+            setattr(cfg, section, value)
+    try:
+        yield
+    finally:
+        for target, key, value in reversed(saved):
+            if target is cfg:
+                setattr(cfg, key, value)
+            else:
+                target[key] = value
+
+
+def trait_stats(agents) -> Dict[str, Dict[str, float]]:
+    """mean / sd / min / max of every trait multiplier over agents."""
+    out = {}
+    for f in fields(tr.Traits):
+        values = [getattr(a.traits or tr.Traits(), f.name) for a in agents]
+        if not values:
+            continue
+        out[f.name] = {
+            "mean": statistics.fmean(values),
+            "sd": statistics.pstdev(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    return out
+
+
+def run(options: dict) -> dict:
+    """Run one world to completion and summarise it."""
+    return _run(options)[0]
+
+
+def _run(options: dict) -> Tuple[dict, list]:
+    """run(), plus the surviving agents."""
+    apply_overrides(options.get("overrides", ()))
+    if options.get("bushes") is not None:
+        cfg.RESOURCES["NUM_BUSHES"] = options["bushes"]
+
+    dt = options["dt"]
+    ticks = options["ticks"]
+    sample_every = max(1, int(round(options["sample"] / dt)))
+    num_agents = options["agents"] if options.get("agents") is not None else cfg.NUM_AGENTS
+
+    if options.get("regions"):
+        from partition import has_cores_for, parse_regions
+        cols, rows = parse_regions(options["regions"])
+        if has_cores_for(cols, rows) or not cfg.PARTITION["FALLBACK"]:
+            return run_regions(options, num_agents, dt, ticks, sample_every)
+        print(f"note: {cols}x{rows} regions need {cols * rows} cores, "
+              f"{os.cpu_count()} available: running one process", file=sys.stderr)
+
+    world = wd.create_world(num_agents, seed=options.get("seed"))
+    if options.get("alloc_profile"):
+        from allocprof import AllocProfiler
+        world.profiler = AllocProfiler()
+    initial_traits = trait_stats(world.agents)
+
+    server = None
+    if options.get("metrics_port") is not None:
+        from metrics import MetricsServer
+        server = MetricsServer(world, port=options["metrics_port"])
+        server.start()
+
+    survival: List[List[float]] = [[0.0, len(world.agents)]]
+    start = time.perf_counter()
+    while world.tick < ticks and world.agents:
+        wd.step_world(world, dt)
+        if world.tick % sample_every == 0 or not world.agents:
+            survival.append([round(world.time, 6), len(world.agents)])
+    wall = time.perf_counter() - start
+    if server is not None:
+        server.stop()
+
+    summary = {
+        "seed": options.get("seed"),
+        "agents": num_agents,
+        "bushes": len(world.bushes),
+        "dt": dt,
+        "ticks": world.tick,
+        "sim_time": world.time,
+        "wall_time": wall,
+        "ticks_per_sec": world.tick / wall if wall > 0 else 0.0,
+        "extinct": not world.agents,
+        "final_population": len(world.agents),
+        "births": world.births,
+        "deaths": dict(sorted(world.deaths.items())),
+        "survival": survival,
+        "traits": {"initial": initial_traits, "final": trait_stats(world.agents)},
+    }
+    if world.profiler is not None:
+        world.profiler.stop()
+        summary["allocations"] = world.profiler.report()
+        print(world.profiler.format_report(), file=sys.stderr)
+    return summary, world.agents
+
+
+def run_regions(options: dict, num_agents: int, dt: float, ticks: int,
+                sample_every: int) -> Tuple[dict, list]:
+    """_run() for one world partitioned over worker processes (partition.py)."""
+    from partition import PartitionedWorld, parse_regions
+    cols, rows = parse_regions(options["regions"])
+    overrides = list(options.get("overrides", ()))
+    if options.get("bushes") is not None:
+        overrides.append(f"RESOURCES.NUM_BUSHES={options['bushes']}")
+
+    pw = PartitionedWorld(num_agents, cols, rows, seed=options.get("seed"),
+                          dt=dt, overrides=overrides)
+    survival: List[List[float]] = [[0.0, num_agents]]
+    start = time.perf_counter()
+    try:
+        # the population read back lags one tick: extinction stops a tick late
+        while pw.tick < ticks and pw.population:
+            pw.step()
+            if pw.tick % sample_every == 0:
+                survival.append([round(pw.tick * dt, 6), pw.population])
+    finally:
+        regions = pw.close(collect=True)
+    wall = time.perf_counter() - start
+    agents = [a for r in regions for a in r["agents"]]
+    deaths: Dict[str, int] = {}
+    for r in regions:
+        for cause, n in r["deaths"].items():
+            deaths[cause] = deaths.get(cause, 0) + n
+    if pw.tick % sample_every:
+        survival.append([round(pw.tick * dt, 6), len(agents)])
+
+    summary = {
+        "seed": options.get("seed"),
+        "agents": num_agents,
+        "bushes": pw.num_bushes,
+        "regions": [cols, rows],
+        "dt": dt,
+        "ticks": pw.tick,
+        "sim_time": pw.tick * dt,
+        "wall_time": wall,
+        "ticks_per_sec": pw.tick / wall if wall > 0 else 0.0,
+        "extinct": not agents,
+        "final_population": len(agents),
+        "births": sum(r["births"] for r in regions),
+        "deaths": dict(sorted(deaths.items())),
+        "region_population": [r["population"] for r in regions],
+        "survival": survival,
+        # no initial traits: starting agents are only ever built in the workers
+        "traits": {"final": trait_stats(agents)},
+    }
+    return summary, agents
+
+
+AGENT_FLOATS = ("x", "y", "age", "hunger", "thirst", "energy", "health")
+AGENT_INTS = ("id", "generation")
+
+
+def agent_columns(agents) -> Dict[str, array]:
+    """Final agent state as flat columns (agent_x, ..., trait_vision_mult)."""
+    cols = {f"agent_{name}": array("d", (getattr(a, name) for a in agents))
+            for name in AGENT_FLOATS}
+    cols.update({f"agent_{name}": array("q", (getattr(a, name) for a in agents))
+                 for name in AGENT_INTS})
+    for f in fields(tr.Traits):
+        cols[f"trait_{f.name}"] = array(
+            "d", (getattr(a.traits or tr.Traits(), f.name) for a in agents))
+    return cols
+
+
+def run_to_channel(job) -> ResultRef:
+    """
+    Pool entry: _run() with the arrays written to the results channel; only
+    the small summary is pickled back. The final agents' columns are only
+    written when the channel is kept (--results-dir): otherwise nobody
+    reads them.
+    """
+    options, channel = job
+    summary, agents = _run(options)
+    survival = summary.pop("survival")
+    arrays = {
+        "survival_time": array("d", (t for t, _n in survival)),
+        "survival_population": array("q", (n for _t, n in survival)),
+    }
+    if channel.keep:
+        arrays.update(agent_columns(agents))
+    return channel.write(arrays, summary)
+
+
+def _summary_from(channel: ResultChannel, ref: ResultRef, keep: bool) -> dict:
+    summary = dict(ref.meta)
+    if keep:
+        summary["results"] = ref.to_dict()
+        return summary
+    with channel.open(ref) as r:
+        summary["survival"] = [[t, n] for t, n in
+                               zip(r["survival_time"], r["survival_population"])]
+    channel.remove(ref)
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m headless",
+        description="Run the simulation without a window and print a JSON summary.")
+    p.add_argument("--agents", type=int, default=None,
+                   help="starting agents (default: config NUM_AGENTS)")
+    p.add_argument("--bushes", type=int, default=None,
+                   help="food bushes (default: config RESOURCES.NUM_BUSHES)")
+    p.add_argument("--seed", type=int, default=None,
+                   help="seed of the first run; run i uses seed + i")
+    p.add_argument("--dt", type=float, default=None,
+                   help="seconds per tick (default: 1 / SIM.HZ)")
+    p.add_argument("--ticks", type=int, default=36000,
+                   help="stop after this many ticks (or at extinction)")
+    p.add_argument("--runs", type=int, default=1, help="independent runs")
+    p.add_argument("--workers", type=int, default=1,
+                   help="processes to spread runs over")
+    p.add_argument("--sample", type=float, default=1.0,
+                   help="survival curve sampling interval (sim seconds)")
+    p.add_argument("--set", dest="overrides", action="append", default=[],
+                   metavar="NAME=VALUE",
+                   help="config override, e.g. RATES.HUNGER_UP=0.5 (repeatable)")
+    p.add_argument("--alloc-profile", action="store_true",
+                   help="trace allocations per tick/phase (slow; report on stderr "
+                        "and under \"allocations\")")
+    p.add_argument("--metrics-port", type=int, default=None,
+                   help="serve Prometheus metrics on 127.0.0.1:PORT while running "
+                        "(run i uses PORT + i)")
+    p.add_argument("--regions", default=None, metavar="COLSxROWS",
+                   help="step one world as COLSxROWS regions, one process each "
+                        "(runs then go one after another); with fewer cores than "
+                        "regions one process is used unless PARTITION.FALLBACK=False")
+    p.add_argument("--world-cache", default=None, metavar="DIR",
+                   help="load seeded world layouts (and flow fields) from DIR, "
+                        "generating and storing them on first use")
+    p.add_argument("--results-dir", default=None, metavar="DIR",
+                   help="keep each run's arrays (survival curve, final agent columns) "
+                        "as files in DIR; summaries point at them under \"results\"")
+    p.add_argument("--out", default=None,
+                   help="write the JSON summary here instead of stdout")
+    return p
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.world_cache:
+        args.overrides.append(f"WORLD_CACHE.DIR={args.world_cache!r}")
+    try:
+        apply_overrides(args.overrides)
+        if args.regions:
+            from partition import parse_regions
+            parse_regions(args.regions)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    dt = args.dt if args.dt is not None else 1.0 / cfg.SIM["HZ"]
+    jobs = []
+    for i in range(max(1, args.runs)):
+        jobs.append({
+            "agents": args.agents,
+            "bushes": args.bushes,
+            "seed": None if args.seed is None else args.seed + i,
+            "dt": dt,
+            "ticks": args.ticks,
+            "sample": args.sample,
+            "overrides": args.overrides,
+            "alloc_profile": args.alloc_profile,
+            "metrics_port": None if args.metrics_port is None else args.metrics_port + i,
+            "regions": args.regions,
+        })
+
+    pooled = args.workers > 1 and len(jobs) > 1 and not args.regions
+    if pooled or args.results_dir:
+        # arrays come back through files, not pickles
+        keep = args.results_dir is not None
+        with ResultChannel(args.results_dir, keep=keep) as channel:
+            work = [(job, channel) for job in jobs]
+            if pooled:
+                from multiprocessing import Pool  # only sweeps pay for it
+                with Pool(min(args.workers, len(jobs))) as pool:
+                    refs = pool.map(run_to_channel, work)
+            else:
+                refs = [run_to_channel(w) for w in work]
+            results = [_summary_from(channel, ref, keep) for ref in refs]
+    else:
+        results = [run(job) for job in jobs]
+
+    summary = results[0] if len(results) == 1 else {"runs": results}
+    text = json.dumps(summary, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
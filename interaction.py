@@ -6,6 +6,9 @@ import pygame
 import config as cfg
 import agent as ag
 import traits as tr
+import simulation as sim
+import trails
+from camera import Camera
 
 # Cache loaded icon images
 _icon_cache = {}
@@ -13,6 +16,9 @@ _icon_cache = {}
 # Global state for following an agent
 _followed_agent_id = None
 
+# Trail of the followed agent: one preallocated ring buffer, reused
+_trail = trails.Trail()
+
 
 def _load_icon(icon_key: str) -> pygame.Surface | None:
     """
@@ -35,14 +41,20 @@ def _load_icon(icon_key: str) -> pygame.Surface | None:
         return None
 
 
-def get_agent_at_mouse(agents: list[ag.Agent], mouse_pos: tuple) -> ag.Agent | None:
+def get_agent_at_mouse(agents: list[ag.Agent], mouse_pos: tuple,
+                       camera: Camera | None = None) -> ag.Agent | None:
     """
     Check if mouse is hovering over any agent.
     Returns the agent if found, None otherwise.
     Extended radius for easier detection.
+    mouse_pos is in screen space; it is mapped into the world via camera.
     """
-    mx, my = mouse_pos
-    hover_radius = cfg.AGENT_RADIUS + 15
+    if camera is None:
+        mx, my = mouse_pos
+        hover_radius = cfg.AGENT_RADIUS + 15
+    else:
+        mx, my = camera.screen_to_world(*mouse_pos)
+        hover_radius = cfg.AGENT_RADIUS + 15 / camera.zoom
     for a in agents:
         dx = a.x - mx
         dy = a.y - my
@@ -55,12 +67,22 @@ def get_agent_at_mouse(agents: list[ag.Agent], mouse_pos: tuple) -> ag.Agent | N
 def toggle_follow(agent: ag.Agent) -> None:
     """
     Toggle following an agent. If already following, unfollow.
+    Following starts a fresh trail for the agent.
     """
     global _followed_agent_id
     if _followed_agent_id == agent.id:
         _followed_agent_id = None  # Unfollow
+        _trail.clear()
     else:
         _followed_agent_id = agent.id  # Follow this agent
+        _trail.follow(agent)
+
+
+def get_followed_trail() -> trails.Trail:
+    """
+    The followed agent's trail (empty when nobody is followed).
+    """
+    return _trail
 
 
 def get_followed_agent(agents: list[ag.Agent]) -> ag.Agent | None:
@@ -94,6 +116,9 @@ def get_agent_state_value(agent: ag.Agent) -> tuple[str | None, str]:
     Get icon key and value for agent's current state.
     Returns (icon_key, value_string) or (None, "OK")
     """
+    if ag.can_mate(agent):
+        return ("LOVE", "Ready")
+
     thirsty = agent.thirst >= cfg.THRESHOLDS["THIRST_SEEK"]
     hungry = agent.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"]
 
@@ -111,11 +136,21 @@ def get_agent_state_value(agent: ag.Agent) -> tuple[str | None, str]:
         return (None, "OK")
 
 
-def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
+def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent,
+                         camera: Camera | None = None) -> pygame.Rect:
     """
     Draw a chatbox-style indicator above the agent showing their state,
     with additional info: food memory, water location, and age.
+    Returns the screen area drawn over.
     """
+    # Anchor point on screen (box itself is not scaled by zoom)
+    if camera is None:
+        anchor_x, anchor_y = int(agent.x), int(agent.y)
+        agent_r = cfg.AGENT_RADIUS
+    else:
+        anchor_x, anchor_y = camera.world_to_screen(agent.x, agent.y)
+        agent_r = camera.scale(cfg.AGENT_RADIUS)
+
     # Get state-based color
     box_color = get_agent_state_color(agent)
     icon_key, value_text = get_agent_state_value(agent)
@@ -139,7 +174,7 @@ def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
         effective_timeout = tr.effective_memory_ttl(
             cfg.MEMORY["TIMEOUT"], traits_obj)
         timeout_ms = effective_timeout * 1000
-        current_time_ms = pygame.time.get_ticks()
+        current_time_ms = sim.now_ms()
         valid_memories = [
             (x, y, ts) for x, y, ts in agent.food_memory
             if (current_time_ms - ts) <= timeout_ms
@@ -158,7 +193,7 @@ def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
         effective_timeout = tr.effective_memory_ttl(
             cfg.MEMORY["TIMEOUT"], traits_obj)
         timeout_ms = effective_timeout * 1000
-        current_time_ms = pygame.time.get_ticks()
+        current_time_ms = sim.now_ms()
         if hasattr(agent, 'last_water_time_ms') and agent.last_water_time_ms >= 0:
             if (current_time_ms - agent.last_water_time_ms) <= timeout_ms:
                 wx, wy = agent.last_water_pos
@@ -198,8 +233,8 @@ def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
     box_width = max(icon_size + gap + 30, info_width) + padding_x * 2
     box_height = top_height + 8 + info_height + padding_y * 2
 
-    box_x = int(agent.x) - box_width // 2
-    box_y = int(agent.y) - cfg.AGENT_RADIUS - box_height - 15
+    box_x = anchor_x - box_width // 2
+    box_y = anchor_y - agent_r - box_height - 15
 
     # Draw rounded box
     box_rect = pygame.Rect(box_x, box_y, box_width, box_height)
@@ -238,8 +273,8 @@ def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
         current_y += line_surface.get_height() + 2
 
     # Draw small arrow pointing to agent (chatbox tail)
-    arrow_x = int(agent.x)
-    arrow_y = int(agent.y) - cfg.AGENT_RADIUS - 8
+    arrow_x = anchor_x
+    arrow_y = anchor_y - agent_r - 8
     pygame.draw.polygon(
         screen,
         box_color,
@@ -251,12 +286,14 @@ def draw_agent_state_box(screen: pygame.Surface, agent: ag.Agent) -> None:
         [(arrow_x - 4, arrow_y), (arrow_x + 4, arrow_y), (arrow_x, arrow_y + 6)],
         1
     )
+    return box_rect.union(pygame.Rect(arrow_x - 4, arrow_y, 9, 7))
 
 
-def draw_agent_debug_panel(screen: pygame.Surface, agent: ag.Agent) -> None:
+def draw_agent_debug_panel(screen: pygame.Surface, agent: ag.Agent) -> pygame.Rect | None:
     """
     Draw debug panel in top-right showing agent effective trait values.
     Shows the actual values the agent uses (after trait multipliers applied).
+    Returns the screen area drawn over (None if nothing was drawn).
     Format:
     Vision: x.xx px
     Speed: x.xx
@@ -265,7 +302,7 @@ def draw_agent_debug_panel(screen: pygame.Surface, agent: ag.Agent) -> None:
     """
     traits_obj = getattr(agent, "traits", None)
     if traits_obj is None:
-        return
+        return None
 
     # Calculate effective values
     effective_vision = tr.effective_vision(
@@ -317,3 +354,4 @@ def draw_agent_debug_panel(screen: pygame.Surface, agent: ag.Agent) -> None:
     for line_surface in rendered_lines:
         screen.blit(line_surface, (panel_x + padding, current_y))
         current_y += line_surface.get_height() + 2
+    return panel_rect
@@ -0,0 +1,64 @@
+"""
+Level-of-detail update scheduling.
+Comfortable agents wandering inside their home region, far from any
+resource, are updated only every LOD INTERVAL ticks with the skipped time
+aggregated into one larger dt. Rates are linear between thresholds, so as
+long as no threshold is crossed in the meantime the stats come out the same.
+Agents are promoted back to full rate PROMOTE_MARGIN seconds before a
+threshold (HUNGER_SEEK, THIRST_SEEK, ENERGY_SLOW, MAX_AGE) or as soon as
+an interaction (mating) is possible.
+"""
+import config as cfg
+import agent as ag
+import traits as tr
+
+
+def is_idle(a: ag.Agent, water, bush_grid) -> bool:
+    """True if the agent can safely run at reduced update frequency."""
+    if (
+        a.action != "WANDER"
+        or a.eat_pause > 0.0
+        or a.occupying is not None
+        or a.home_pos is None
+    ):
+        return False
+
+    # inside home region
+    dx = a.x - a.home_pos[0]
+    dy = a.y - a.home_pos[1]
+    if dx * dx + dy * dy > a.home_region_radius * a.home_region_radius:
+        return False
+
+    # comfortable, with headroom before the next threshold
+    th = cfg.THRESHOLDS
+    if not (
+        a.hunger < th["HUNGER_SEEK"]
+        and a.thirst < th["THIRST_SEEK"]
+        and a.energy > th["ENERGY_SLOW"]
+    ):
+        return False
+    margin = cfg.LOD["PROMOTE_MARGIN"]
+    traits_obj = a.traits or tr.Traits()
+    hunger_rate = tr.effective_drain(cfg.RATES["HUNGER_UP"], traits_obj)
+    thirst_rate = tr.effective_drain(cfg.RATES["THIRST_UP"], traits_obj)
+    energy_rate = -tr.effective_drain(cfg.RATES["ENERGY_DOWN"], traits_obj)
+    if (
+        ag.seconds_until(a.hunger, th["HUNGER_SEEK"], hunger_rate) <= margin
+        or ag.seconds_until(a.thirst, th["THIRST_SEEK"], thirst_rate) <= margin
+        or ag.seconds_until(a.energy, th["ENERGY_SLOW"], energy_rate) <= margin
+        or cfg.MAX_AGE - a.age <= margin
+    ):
+        return False
+
+    # an interaction is possible
+    if ag.can_mate(a):
+        return False
+
+    # far from any resource (nothing to sense or touch)
+    vision = tr.effective_vision(a.vision_radius, traits_obj)
+    if water.nearest(a.x, a.y, vision) is not None:
+        return False
+    for _b in bush_grid.in_radius(a.x, a.y, vision):
+        return False
+
+    return True
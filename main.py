@@ -1,23 +1,78 @@
 import pygame
 import math
+import os
 
 import config as cfg
-import agent as ag
-import resources as res
-import simulation as sim
+import render
 import interaction
+import world as wd
+import runner as rn
+import trails
+from timestep import FixedStepper, TimeControl
+from camera import Camera
 
 pygame.init()
 screen = pygame.display.set_mode((cfg.WIDTH, cfg.HEIGHT))
 clock = pygame.time.Clock()
 
-agents = [
-    ag.create_agent(i, cfg.WIDTH, cfg.HEIGHT, cfg.AGENT_RADIUS)
-    for i in range(cfg.NUM_AGENTS)
-]
+world = wd.create_world()
 
-pond = res.create_pond()
-bushes = res.create_bushes(pond)
+# Optionally step the world on its own thread; the render loop then draws
+# interpolated snapshots and never blocks the simulation (or vice versa).
+sim_runner = None
+if cfg.SIM["THREADED"]:
+    sim_runner = rn.SimulationRunner(world, flat_out=cfg.SIM["FLAT_OUT"])
+    sim_runner.start()
+
+# Optional Prometheus endpoint (reads engine counters, never the lock)
+metrics_server = None
+if cfg.METRICS["ENABLED"]:
+    from metrics import MetricsServer
+    metrics_server = MetricsServer(world)
+    metrics_server.start()
+
+# Unthreaded: fixed sub-steps, skipping drawing before dropping sim time
+stepper = FixedStepper()
+
+# Time scale: 1-4 pick 1x/10x/100x/max, space pauses, "." single-steps
+timectl = TimeControl(stepper)
+
+# Trails: the followed agent's, plus optionally a coarse one for everyone
+follow_trail = interaction.get_followed_trail() if cfg.TRAIL["ENABLED"] else None
+all_trails = trails.TrailGrid() if cfg.TRAIL["ALL_AGENTS"] else None
+
+
+def record_trails(agents, sim_time):
+    if follow_trail is not None:
+        follow_trail.record(sim_time)
+    if all_trails is not None:
+        all_trails.record(agents, sim_time)
+
+
+def step(step_dt):
+    wd.step_world(world, step_dt)
+    record_trails(world.agents, world.time)
+
+
+def export_trails():
+    out_dir = cfg.TRAIL["EXPORT_DIR"]
+    os.makedirs(out_dir, exist_ok=True)
+    if follow_trail is not None and follow_trail.agent_id is not None:
+        path = os.path.join(out_dir, f"trail-{follow_trail.agent_id}-{world.tick}.csv")
+        follow_trail.export(path)
+        print(f"trail written to {path}")
+    if all_trails is not None:
+        path = os.path.join(out_dir, f"trails-all-{world.tick}.csv")
+        all_trails.export(path)
+        print(f"trails written to {path}")
+
+
+# Optional dirty-rect drawing: only changed areas are redrawn and pushed
+renderer = render.DirtyRenderer(screen) if cfg.RENDER["DIRTY_RECTS"] else None
+
+camera = Camera()
+camera.clamp_to_world()
+dragging = False
 
 running = True
 while running:
@@ -29,61 +84,157 @@ while running:
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left click
                 mouse_pos = pygame.mouse.get_pos()
+                # threaded: pick from the snapshot, not the live agents
+                pickable = world.agents if sim_runner is None else \
+                    sim_runner.interpolation()[1].agents
                 clicked_agent = interaction.get_agent_at_mouse(
-                    agents, mouse_pos)
+                    pickable, mouse_pos, camera)
                 if clicked_agent is not None:
                     interaction.toggle_follow(clicked_agent)
-
-    screen.fill(cfg.COLOURS["GRASS"])
-
-    # resources
-    res.update_resources(bushes, dt)
-    res.draw_resources(screen, pond, bushes)
-
-    alive = []
-    for a in agents:
-        if not sim.update_agent(a, dt, pond, bushes):
+            elif event.button in (2, 3):  # Middle/right drag pans
+                dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button in (2, 3):
+                dragging = False
+        elif event.type == pygame.MOUSEMOTION:
+            if dragging:
+                camera.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                timectl.toggle_pause()
+            elif event.key == pygame.K_PERIOD:
+                timectl.single_step()
+            elif event.key == pygame.K_t:
+                export_trails()
+            elif pygame.K_1 <= event.key < pygame.K_1 + len(timectl.speeds):
+                timectl.set_speed(event.key - pygame.K_1)
+            if sim_runner is not None:
+                sim_runner.speed = timectl.speed
+                sim_runner.paused = timectl.paused
+                if event.key == pygame.K_PERIOD:
+                    sim_runner.step_once()
+        elif event.type == pygame.MOUSEWHEEL:
+            factor = cfg.CAMERA["ZOOM_STEP"] ** event.y
+            camera.zoom_at(factor, *pygame.mouse.get_pos())
+
+    # keyboard pan (arrows / WASD)
+    keys = pygame.key.get_pressed()
+    pan = cfg.CAMERA["PAN_SPEED"] * dt
+    pan_x = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - \
+        (keys[pygame.K_LEFT] or keys[pygame.K_a])
+    pan_y = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - \
+        (keys[pygame.K_UP] or keys[pygame.K_w])
+    if pan_x or pan_y:
+        camera.pan(pan_x * pan, pan_y * pan)
+
+    if sim_runner is None:
+        plan = timectl.run(dt, step)
+        if not plan.render:
             continue
-
-        alive.append(a)
+        draw_agents = world.agents
+    else:
+        prev_snap, curr_snap, alpha = sim_runner.interpolation()
+        draw_agents = curr_snap.agents
+        if follow_trail is not None and follow_trail.agent_id is not None:
+            # sample this snapshot's copy of the followed agent
+            follow_trail.retarget(interaction.get_followed_agent(curr_snap.agents))
+        record_trails(curr_snap.agents, curr_snap.sim_time)
+
+    # resources (live objects: hold the sim lock while reading them)
+    if renderer is not None:
+        if sim_runner is None:
+            renderer.begin(world.water, world.bushes, camera)
+        else:
+            with sim_runner.lock:
+                renderer.begin(world.water, world.bushes, camera)
+    else:
+        screen.fill(cfg.COLOURS["GRASS"])
+        if sim_runner is None:
+            render.draw_resources(screen, world.water, world.bushes, camera)
+        else:
+            with sim_runner.lock:
+                render.draw_resources(screen, world.water, world.bushes, camera)
+
+    # trails go under the agents
+    trail_rects = []
+    if all_trails is not None:
+        trail_rects.extend(all_trails.draw(screen, camera))
+    if follow_trail is not None:
+        trail_rects.append(follow_trail.draw(screen, camera))
+    if renderer is not None:
+        for rect in trail_rects:
+            renderer.touch(rect)
+
+    # only agents inside the viewport are drawn
+    view_x0, view_y0, view_x1, view_y1 = camera.view_rect()
+    pad = cfg.AGENT_RADIUS + 1
+    draw_r = camera.scale(cfg.AGENT_RADIUS)
+
+    for a in draw_agents:
+        if sim_runner is None:
+            ax, ay = a.x, a.y
+        else:
+            ax, ay = rn.interpolated_position(a, prev_snap, curr_snap, alpha)
 
         # --- Safe draw guard (prevents pygame crash) ---
-        if not (math.isfinite(a.x) and math.isfinite(a.y)):
+        if not (math.isfinite(ax) and math.isfinite(ay)):
             continue
 
-        cx, cy = int(a.x), int(a.y)
+        # --- Render culling ---
+        if not (view_x0 - pad <= ax <= view_x1 + pad
+                and view_y0 - pad <= ay <= view_y1 + pad):
+            continue
 
-        pygame.draw.circle(
+        cx, cy = camera.world_to_screen(ax, ay)
+
+        outline = pygame.draw.circle(
             screen,
             cfg.COLOURS["OUTLINE"],
             (cx, cy),
-            cfg.AGENT_RADIUS + 1
+            draw_r + 1
         )
         pygame.draw.circle(
             screen,
             a.colour,
             (cx, cy),
-            cfg.AGENT_RADIUS
+            draw_r
         )
+        if renderer is not None:
+            renderer.touch(outline)
 
-    agents = alive
+    agents = draw_agents
 
     # Draw state box for hovered agent or followed agent
     mouse_pos = pygame.mouse.get_pos()
-    hovered_agent = interaction.get_agent_at_mouse(agents, mouse_pos)
+    hovered_agent = interaction.get_agent_at_mouse(agents, mouse_pos, camera)
     followed_agent = interaction.get_followed_agent(agents)
 
-    # Show chatbox for hovered agent
-    if hovered_agent is not None:
-        interaction.draw_agent_state_box(screen, hovered_agent)
-    # Or show chatbox for followed agent if they exist
-    elif followed_agent is not None:
-        interaction.draw_agent_state_box(screen, followed_agent)
+    # Keep the followed agent in view
+    if followed_agent is not None and not dragging:
+        camera.center_on(followed_agent.x, followed_agent.y)
+
+    # Show chatbox for hovered agent, or for followed agent if they exist
+    box_agent = hovered_agent if hovered_agent is not None else followed_agent
+    overlays = []
+    if box_agent is not None:
+        overlays.append(interaction.draw_agent_state_box(screen, box_agent, camera))
 
     # Show debug traits panel for followed agent
     if followed_agent is not None:
-        interaction.draw_agent_debug_panel(screen, followed_agent)
-
-    pygame.display.flip()
-
+        overlays.append(interaction.draw_agent_debug_panel(screen, followed_agent))
+
+    if timectl.speed != 1 or timectl.paused:
+        overlays.append(render.draw_speed_label(screen, timectl.label()))
+
+    if renderer is not None:
+        for rect in overlays:
+            renderer.touch(rect)
+        renderer.present()
+    else:
+        pygame.display.flip()
+
+if sim_runner is not None:
+    sim_runner.stop()
+if metrics_server is not None:
+    metrics_server.stop()
 pygame.quit()
@@ -0,0 +1,154 @@
+"""
+Prometheus-style metrics for long runs without a window.
+
+EngineStats is updated incrementally by step_world (tick timings, running
+trait sums on spawn/death), so a scrape only reads a handful of numbers and
+copies a short ring buffer; it never walks the agents or takes the world
+lock. MetricsServer serves them as text on localhost from a daemon thread:
+
+    curl http://127.0.0.1:9108/metrics
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import fields
+from typing import Deque, Dict, Iterable, List, Optional
+
+import config as cfg
+import traits as tr
+
+TRAIT_NAMES = tuple(f.name for f in fields(tr.Traits))
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class EngineStats:
+    """Counters the engine keeps up to date as it runs."""
+
+    def __init__(self, window: Optional[int] = None):
+        window = window or cfg.METRICS["WINDOW"]
+        self.tick_durations: Deque[float] = deque(maxlen=window)
+        self.tick_ends: Deque[float] = deque(maxlen=window)
+        self.tick_time_sum = 0.0
+        self.trait_sums: Dict[str, float] = {name: 0.0 for name in TRAIT_NAMES}
+        self.trait_count = 0
+
+    def on_tick(self, duration: float) -> None:
+        self.tick_durations.append(duration)
+        self.tick_ends.append(time.perf_counter())
+        self.tick_time_sum += duration
+
+    def on_spawn(self, agents: Iterable) -> None:
+        sums = self.trait_sums
+        for a in agents:
+            t = a.traits or tr.Traits()
+            for name in TRAIT_NAMES:
+                sums[name] += getattr(t, name)
+            self.trait_count += 1
+
+    def on_death(self, a) -> None:
+        t = a.traits or tr.Traits()
+        for name in TRAIT_NAMES:
+            self.trait_sums[name] -= getattr(t, name)
+        self.trait_count -= 1
+
+    def ticks_per_sec(self) -> float:
+        ends = list(self.tick_ends)
+        if len(ends) < 2 or ends[-1] <= ends[0]:
+            return 0.0
+        return (len(ends) - 1) / (ends[-1] - ends[0])
+
+    def tick_quantiles(self) -> Dict[float, float]:
+        durations = sorted(self.tick_durations)
+        if not durations:
+            return {}
+        last = len(durations) - 1
+        return {q: durations[min(last, int(q * len(durations)))] for q in QUANTILES}
+
+    def trait_means(self) -> Dict[str, float]:
+        n = self.trait_count
+        return {name: (s / n if n > 0 else 0.0) for name, s in self.trait_sums.items()}
+
+
+def render_metrics(world) -> str:
+    """Prometheus text exposition for world (cheap; safe from any thread)."""
+    stats = world.stats
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples) -> None:
+        lines.append(f"# HELP evosim_{name} {help_text}")
+        lines.append(f"# TYPE evosim_{name} {kind}")
+        for labels, value in samples:
+            label = ""
+            if labels:
+                label = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+            lines.append(f"evosim_{name}{label} {value}")
+
+    metric("ticks_total", "counter", "Simulation ticks stepped.",
+           [((), world.tick)])
+    metric("sim_time_seconds", "gauge", "Simulated time.",
+           [((), world.time)])
+    metric("ticks_per_second", "gauge", "Recent stepping rate (wall clock).",
+           [((), stats.ticks_per_sec())])
+
+    quantiles = stats.tick_quantiles()
+    lines.append("# HELP evosim_tick_duration_seconds Wall time per tick (recent window).")
+    lines.append("# TYPE evosim_tick_duration_seconds summary")
+    for q, value in quantiles.items():
+        lines.append(f'evosim_tick_duration_seconds{{quantile="{q}"}} {value}')
+    lines.append(f"evosim_tick_duration_seconds_sum {stats.tick_time_sum}")
+    lines.append(f"evosim_tick_duration_seconds_count {world.tick}")
+
+    metric("agents", "gauge", "Living agents.", [((), len(world.agents))])
+    metric("births_total", "counter", "Offspring born.", [((), world.births)])
+    metric("deaths_total", "counter", "Agents died, by cause.",
+           [((("cause", cause),), n) for cause, n in sorted(dict(world.deaths).items())])
+    metric("bush_food", "gauge", "Food items currently on each bush.",
+           [((("bush", i),), b.food_count) for i, b in enumerate(world.bushes)])
+    metric("trait_mean", "gauge", "Mean trait multiplier over living agents.",
+           [((("trait", name),), value) for name, value in stats.trait_means().items()])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves /metrics for one world on a background thread."""
+
+    def __init__(self, world, host: Optional[str] = None, port: Optional[int] = None):
+        # http.server costs ~50 ms to import: only runs that serve pay for it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = render_metrics(world).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                pass  # a scrape every few seconds would flood the console
+
+        self.httpd = ThreadingHTTPServer(
+            (host or cfg.METRICS["HOST"],
+             cfg.METRICS["PORT"] if port is None else port),
+            Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
@@ -0,0 +1,719 @@
+"""
+Partitioned worlds: one large world stepped by several processes.
+
+The world is tiled into cols x rows regions. Each region's agents are
+stepped by its own worker process with world.step_world, so one world can
+spread over every core of a node:
+
+    python -m headless --regions 4x4 --agents 1000000 \\
+        --set WORLD_WIDTH=24000 --set WORLD_HEIGHT=24000 \\
+        --set REPRODUCTION.MAX_AGENTS=2000000 --bushes 4000
+
+The parent builds the static layout (ponds, bushes, initial food, flow
+fields) once and pickles it into a shared block; every worker loads the
+same copy, so terrain lookups need no traffic. What changes and crosses
+borders lives in multiprocessing.shared_memory too:
+
+- food: a SharedFoodStore over one shared block, eaten and spawned under a
+  lock; each bush is regrown only by the region holding its centre;
+- crowding: each pond's / bush's occupants is the sum of one counter per
+  region, so POND_MAX_DRINKERS / BUSH_MAX_EATERS hold world-wide;
+- population: one shared count, so REPRODUCTION.MAX_AGENTS caps the whole
+  world (a region reserves each birth under the lock);
+- halo: after each tick a region publishes (id, x, y) of its agents within
+  HALO of its border. Neighbours load them as ghosts into their agent grid,
+  so separation works across borders;
+- migrants: agents that stepped into another region are pickled into the
+  sender's outbox and adopted by the receiver.
+
+Ghosts are positions only: a region cannot change a neighbour's agents,
+so ghosts never mate. Two agents on either side of a border mate once one
+of them crosses it; pairing is only lost within MATE_RADIUS of a border.
+
+A tick is two barrier waits (step and post migrants; adopt and publish).
+The parent takes part in both and reads per-region counters in between.
+
+Partitioning only pays off with a core per region: the barriers, halo and
+migrant traffic cost more than they save when regions share cores (2x2 on
+one core runs at about 0.85x the single-process world). headless therefore
+runs a single process when os.cpu_count() is below the region count,
+unless PARTITION.FALLBACK is off.
+"""
+import multiprocessing as mp
+import os
+import pickle
+import random
+import struct
+import traceback
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from threading import BrokenBarrierError
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import config as cfg
+import agent as ag
+import resources as res
+import world as wd
+from headless import apply_overrides, config_overlay, parse_overrides
+from randstream import RandomStream
+
+_LEN = struct.Struct("<q")  # outbox header: pickled payload size
+_COUNTERS = 4               # per region: population, births, deaths, tick
+# control block: [stop flag, _COUNTERS per region..., world population]
+
+# control[0] values
+_RUN, _STOP, _STOP_COLLECT = 0, 1, 2
+_BROKEN = "another region failed"
+
+
+def halo_width() -> float:
+    halo = cfg.PARTITION["HALO"]
+    if halo is None:
+        # the widest an agent can see (clamp_traits caps vision_mult at 2)
+        halo = cfg.SENSING["VISION_RADIUS"] * 2.0
+    return float(halo)
+
+
+def parse_regions(text: str) -> Tuple[int, int]:
+    """"4x2" -> (4, 2)."""
+    cols, sep, rows = text.lower().partition("x")
+    try:
+        cols_n, rows_n = int(cols), int(rows)
+    except ValueError:
+        cols_n = rows_n = 0
+    if not sep or cols_n < 1 or rows_n < 1:
+        raise ValueError(f"regions {text!r} is not COLSxROWS")
+    return cols_n, rows_n
+
+
+def has_cores_for(cols: int, rows: int) -> bool:
+    """True if there is at least one core per region."""
+    return (os.cpu_count() or 1) >= cols * rows
+
+
+@dataclass(frozen=True)
+class RegionLayout:
+    """cols x rows equal tiles over the world, numbered row by row."""
+    cols: int
+    rows: int
+    width: float
+    height: float
+    halo: float
+
+    @property
+    def count(self) -> int:
+        return self.cols * self.rows
+
+    def bounds(self, index: int) -> Tuple[float, float, float, float]:
+        cx, cy = index % self.cols, index // self.cols
+        w, h = self.width / self.cols, self.height / self.rows
+        return (cx * w, cy * h, (cx + 1) * w, (cy + 1) * h)
+
+    def region_of(self, x: float, y: float) -> int:
+        cx = min(self.cols - 1, max(0, int(x * self.cols / self.width)))
+        cy = min(self.rows - 1, max(0, int(y * self.rows / self.height)))
+        return cy * self.cols + cx
+
+    def neighbours(self, index: int) -> List[int]:
+        """Regions within halo of this one (they swap halos and migrants)."""
+        x0, y0, x1, y1 = self.bounds(index)
+        out = []
+        for j in range(self.count):
+            if j == index:
+                continue
+            bx0, by0, bx1, by1 = self.bounds(j)
+            gap_x = max(0.0, bx0 - x1, x0 - bx1)
+            gap_y = max(0.0, by0 - y1, y0 - by1)
+            if gap_x <= self.halo and gap_y <= self.halo:
+                out.append(j)
+        return out
+
+
+class Ghost:
+    """
+    Position of an agent stepped by a neighbouring region. Only its region
+    can change it, so it never mates here (see the module docstring).
+    """
+    __slots__ = ("id", "x", "y")
+    alive = False  # never passes agent.can_mate
+
+    def __init__(self, agent_id: int, x: float, y: float):
+        self.id = agent_id
+        self.x = x
+        self.y = y
+
+
+class SharedFoodStore(res.FoodStore):
+    """
+    FoodStore over shared memory, used by several processes at once.
+    x / y / alive are views of one block laid out like the store it was
+    made from. There are no per-process free / live lists: a bush's few
+    slots are scanned instead. Eating and spawning take the lock, reads
+    don't.
+    """
+
+    def __init__(self, store: res.FoodStore, buf, lock):
+        n = len(store.alive)
+        self.bush = store.bush
+        self._reach = store._reach
+        self._buf = buf
+        self.x = buf[:8 * n].cast("d")
+        self.y = buf[8 * n:16 * n].cast("d")
+        self.alive = buf[16 * n:17 * n]
+        self.lock = lock
+
+        self._slots: List[range] = []
+        start = 0
+        for index in range(len(store._reach)):
+            end = start
+            while end < n and store.bush[end] == index:
+                end += 1
+            self._slots.append(range(start, end))
+            start = end
+
+    @staticmethod
+    def block_size(store: res.FoodStore) -> int:
+        return max(1, 17 * len(store.alive))
+
+    @staticmethod
+    def fill(store: res.FoodStore, buf) -> None:
+        """Copy a local store's food into a block of block_size(store)."""
+        n = len(store.alive)
+        buf[:8 * n] = store.x.tobytes()
+        buf[8 * n:16 * n] = store.y.tobytes()
+        buf[16 * n:17 * n] = bytes(store.alive)
+
+    def release(self) -> None:
+        """Drop the views (needed before the block is closed)."""
+        for view in (self.x, self.y, self.alive):
+            view.release()
+
+    def __len__(self) -> int:
+        return sum(self.alive)
+
+    def count(self, index: int) -> int:
+        slots = self._slots[index]
+        return sum(self.alive[slots.start:slots.stop])
+
+    def positions(self, index: int):
+        x, y, alive = self.x, self.y, self.alive
+        for slot in self._slots[index]:
+            if alive[slot]:
+                yield x[slot], y[slot]
+
+    def spawn(self, index: int, fx: float, fy: float) -> bool:
+        alive = self.alive
+        with self.lock:
+            for slot in self._slots[index]:
+                if not alive[slot]:
+                    self.x[slot] = fx
+                    self.y[slot] = fy
+                    alive[slot] = 1
+                    return True
+        return False
+
+    def eat_random(self, index: int, rng=None) -> bool:
+        if rng is None:
+            rng = random
+        alive = self.alive
+        with self.lock:
+            live = [slot for slot in self._slots[index] if alive[slot]]
+            if not live:
+                return False
+            alive[live[rng.randrange(len(live))]] = 0
+        return True
+
+    def nearest(self, x: float, y: float, max_dist: float,
+                indices: Optional[Iterable[int]] = None) -> Optional[Tuple[float, float]]:
+        best = None
+        best_d2 = max_dist * max_dist
+        fx, fy, alive = self.x, self.y, self.alive
+        reach_of, slots_of = self._reach, self._slots
+        for i in range(len(reach_of)) if indices is None else indices:
+            bx, by, reach = reach_of[i]
+            slots = slots_of[i]
+            lim = max_dist + reach
+            if (bx - x) * (bx - x) + (by - y) * (by - y) > lim * lim:
+                continue
+            for slot in slots:
+                if not alive[slot]:
+                    continue
+                dx = fx[slot] - x
+                dy = fy[slot] - y
+                d2 = dx * dx + dy * dy
+                if d2 <= best_d2 and (best is None or d2 < best_d2):
+                    best = (fx[slot], fy[slot])
+                    best_d2 = d2
+        return best
+
+    def snapshot(self) -> dict:
+        return {"x": self.x.tobytes(), "y": self.y.tobytes(),
+                "alive": bytes(self.alive)}
+
+    def restore(self, snap: dict) -> None:
+        n = len(self.alive)
+        with self.lock:
+            self._buf[:8 * n] = snap["x"]
+            self._buf[8 * n:16 * n] = snap["y"]
+            self._buf[16 * n:17 * n] = snap["alive"]
+
+
+class _SharedOccupants:
+    """
+    Mixin for a Pond / FoodBush shared by every region: occupants is the
+    sum of one counter per region (rows) in shared memory. A region only
+    writes its own row, by the change from the total it last read (the
+    simulation only writes occupants right after reading it), so no lock
+    is needed.
+    """
+    _rows: Sequence = ()
+    _own = None
+    _slot = 0
+    _read = 0
+
+    @property
+    def occupants(self) -> int:
+        slot = self._slot
+        self._read = total = sum(row[slot] for row in self._rows)
+        return total
+
+    @occupants.setter
+    def occupants(self, value: int) -> None:
+        self._own[self._slot] += value - self._read
+
+
+class SharedPond(_SharedOccupants, res.Pond):
+    pass
+
+
+class SharedBush(_SharedOccupants, res.FoodBush):
+    pass
+
+
+def share_crowding(world: wd.World, rows: Sequence, index: int) -> None:
+    """Make world's ponds and bushes count occupants in rows (one per region)."""
+    for slot, r in enumerate([*world.water.ponds, *world.bushes]):
+        r.__class__ = SharedPond if isinstance(r, res.Pond) else SharedBush
+        r._rows = rows
+        r._own = rows[index]
+        r._slot = slot
+
+
+# ---------------------------------------------------------
+# shared blocks
+# ---------------------------------------------------------
+class _Blocks:
+    """The shared memory of one partitioned world (created by the parent)."""
+
+    def __init__(self, layout, food, crowding, control, halos, outboxes):
+        self.layout = layout
+        self.food = food
+        self.crowding = crowding
+        self.control = control
+        self.halos = halos
+        self.outboxes = outboxes
+
+    @classmethod
+    def create(cls, layout: RegionLayout, world_bytes: bytes, food_bytes: int,
+               resources: int) -> "_Blocks":
+        def block(size: int) -> shared_memory.SharedMemory:
+            return shared_memory.SharedMemory(create=True, size=max(8, size))
+
+        halo_bytes = 8 * (1 + 3 * cfg.PARTITION["HALO_CAPACITY"])
+        n = layout.count
+        blocks = cls(block(_LEN.size + len(world_bytes)), block(food_bytes),
+                     block(8 * n * resources), block(8 * (2 + _COUNTERS * n)),
+                     [block(halo_bytes) for _ in range(n)],
+                     [block(_LEN.size + cfg.PARTITION["OUTBOX_BYTES"]) for _ in range(n)])
+        for b in blocks.all():
+            b.buf[:8] = bytes(8)  # zero counts / stop flag / outbox sizes
+        blocks.crowding.buf[:] = bytes(len(blocks.crowding.buf))
+        _LEN.pack_into(blocks.layout.buf, 0, len(world_bytes))
+        blocks.layout.buf[_LEN.size:_LEN.size + len(world_bytes)] = world_bytes
+        return blocks
+
+    @classmethod
+    def attach(cls, names: dict) -> "_Blocks":
+        def block(name: str) -> shared_memory.SharedMemory:
+            return shared_memory.SharedMemory(name=name)
+
+        return cls(block(names["layout"]), block(names["food"]), block(names["crowding"]),
+                   block(names["control"]),
+                   [block(n) for n in names["halos"]],
+                   [block(n) for n in names["outboxes"]])
+
+    def names(self) -> dict:
+        return {"layout": self.layout.name, "food": self.food.name,
+                "crowding": self.crowding.name, "control": self.control.name,
+                "halos": [b.name for b in self.halos],
+                "outboxes": [b.name for b in self.outboxes]}
+
+    def all(self) -> List[shared_memory.SharedMemory]:
+        return [self.layout, self.food, self.crowding, self.control,
+                *self.halos, *self.outboxes]
+
+    def load_world(self) -> wd.World:
+        """A world (no agents) over the parent's pickled layout."""
+        buf = self.layout.buf
+        (size,) = _LEN.unpack_from(buf, 0)
+        parts = pickle.loads(buf[_LEN.size:_LEN.size + size])
+        return wd.World(agents=[], **parts)
+
+    def close(self) -> None:
+        for b in self.all():
+            b.close()
+
+    def unlink(self) -> None:
+        for b in self.all():
+            b.unlink()
+
+
+# ---------------------------------------------------------
+# worker side
+# ---------------------------------------------------------
+def _layout_bytes(world: wd.World) -> bytes:
+    """The static part of world (see _Blocks.load_world), pickled."""
+    parts = {"water": world.water, "bushes": world.bushes, "food": world.food,
+             "bush_grid": world.bush_grid, "flow": world.flow}
+    return pickle.dumps(parts, pickle.HIGHEST_PROTOCOL)
+
+
+def _pack(a: ag.Agent, water: res.WaterIndex, now: float) -> None:
+    """
+    Swap a's pond / bush references for indices before it is pickled, and
+    wake it: the receiver's wake queue does not hold it (the sender's
+    stale entry only touches the sender's copy).
+    """
+    if a.asleep:
+        a.asleep = False
+        a.lod_dt += max(0.0, now - a.slept_at)
+    if a.occupying is not None:
+        a.occupying.occupants = max(0, a.occupying.occupants - 1)
+    for name in ("occupying", "queue_for"):
+        ref = getattr(a, name)
+        if isinstance(ref, res.Pond):
+            setattr(a, name, ("pond", water.ponds.index(ref)))
+        elif ref is not None:
+            setattr(a, name, ("bush", ref.index))
+
+
+def _unpack(a: ag.Agent, world: wd.World) -> None:
+    for name in ("occupying", "queue_for"):
+        ref = getattr(a, name)
+        if ref is not None:
+            kind, i = ref
+            setattr(a, name, world.water.ponds[i] if kind == "pond" else world.bushes[i])
+    if a.occupying is not None:
+        a.occupying.occupants += 1
+
+
+class _Region:
+    """A worker's region: its world plus views of the shared blocks."""
+
+    def __init__(self, index: int, layout: RegionLayout, spec: dict,
+                 blocks: _Blocks, lock):
+        self.index = index
+        self.layout = layout
+        self.bounds = layout.bounds(index)
+        self.neighbours = layout.neighbours(index)
+        self.blocks = blocks
+        self.halos = [b.buf.cast("d") for b in blocks.halos]
+        self.control = blocks.control.buf.cast("q")
+        self.lock = lock
+        self._population = 1 + _COUNTERS * layout.count  # control slot
+        self._deaths = 0
+
+        # the parent's layout (and initial food), shared with every region
+        world = blocks.load_world()
+        food = SharedFoodStore(world.food, blocks.food.buf, lock)
+        for b in world.bushes:
+            b.store = food
+        world.food = food
+        world.regrow = [b for b in world.bushes if layout.region_of(b.x, b.y) == index]
+        resources = len(world.water.ponds) + len(world.bushes)
+        self._crowding = blocks.crowding.buf.cast("q")
+        self._rows = [self._crowding[j * resources:(j + 1) * resources]
+                      for j in range(layout.count)]
+        share_crowding(world, self._rows, index)
+        world.claim_birth = self._claim_birth
+
+        seed = spec["seed"]
+        region_seed = None if seed is None else seed * 100003 + index
+        world.rng = rng = RandomStream(region_seed)
+
+        # this region's share of the starting agents, ids interleaved
+        n = layout.count
+        count = spec["agents"] // n + (index < spec["agents"] % n)
+        x0, y0, x1, y1 = self.bounds
+        r = cfg.AGENT_RADIUS
+        for k in range(count):
+            a = ag.create_agent(index + k * n, cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT, r, rng)
+            a.x = rng.uniform(max(x0, r), min(x1, cfg.WORLD_WIDTH - r))
+            a.y = rng.uniform(max(y0, r), min(y1, cfg.WORLD_HEIGHT - r))
+            world.agents.append(a)
+        world.next_id = index + count * n
+        world.id_stride = n
+        world.stats.on_spawn(world.agents)
+        self.world = world
+
+    def step(self, dt: float) -> None:
+        world = self.world
+        world.ghosts = self._read_ghosts()
+        wd.step_world(world, dt)
+        deaths = sum(world.deaths.values())
+        if deaths != self._deaths:
+            with self.lock:
+                self.control[self._population] -= deaths - self._deaths
+            self._deaths = deaths
+        self._post_migrants()
+
+    def _claim_birth(self) -> bool:
+        """Reserve one birth under the world-wide MAX_AGENTS."""
+        c, slot = self.control, self._population
+        with self.lock:
+            if c[slot] >= cfg.REPRODUCTION["MAX_AGENTS"]:
+                return False
+            c[slot] += 1
+        return True
+
+    def _read_ghosts(self) -> List[Ghost]:
+        h = self.layout.halo
+        x0, y0, x1, y1 = self.bounds
+        x0, y0, x1, y1 = x0 - h, y0 - h, x1 + h, y1 + h
+        ghosts = []
+        for j in self.neighbours:
+            t = self.halos[j]
+            for k in range(1, 1 + 3 * int(t[0]), 3):
+                x, y = t[k + 1], t[k + 2]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    ghosts.append(Ghost(int(t[k]), x, y))
+        return ghosts
+
+    def _post_migrants(self) -> None:
+        world = self.world
+        region_of = self.layout.region_of
+        keep = []
+        out: Dict[int, List[ag.Agent]] = {}
+        for a in world.agents:
+            j = region_of(a.x, a.y)
+            if j == self.index:
+                keep.append(a)
+            else:
+                out.setdefault(j, []).append(a)
+
+        data = b""
+        if out:
+            world.agents = keep
+            for moved in out.values():
+                for a in moved:
+                    world.stats.on_death(a)  # leaves this region's trait sums
+                    _pack(a, world.water, world.time)
+            data = pickle.dumps(out, pickle.HIGHEST_PROTOCOL)
+        buf = self.blocks.outboxes[self.index].buf
+        if _LEN.size + len(data) > len(buf):
+            raise RuntimeError(f"region {self.index}: {len(data)} bytes of migrants "
+                               "overflow PARTITION.OUTBOX_BYTES")
+        _LEN.pack_into(buf, 0, len(data))
+        buf[_LEN.size:_LEN.size + len(data)] = data
+
+    def adopt(self) -> None:
+        world = self.world
+        for j in self.neighbours:
+            buf = self.blocks.outboxes[j].buf
+            (size,) = _LEN.unpack_from(buf, 0)
+            if not size:
+                continue
+            moved = pickle.loads(buf[_LEN.size:_LEN.size + size]).get(self.index)
+            if moved:
+                for a in moved:
+                    _unpack(a, world)
+                world.agents.extend(moved)
+                world.stats.on_spawn(moved)
+
+    def publish(self) -> None:
+        """Write this region's halo and counters."""
+        world = self.world
+        h = self.layout.halo
+        x0, y0, x1, y1 = self.bounds
+        x0, y0, x1, y1 = x0 + h, y0 + h, x1 - h, y1 - h
+        t = self.halos[self.index]
+        cap = (len(t) - 1) // 3
+        k = 1
+        for a in world.agents:
+            x, y = a.x, a.y
+            if x < x0 or x > x1 or y < y0 or y > y1:
+                if k > 3 * cap:
+                    raise RuntimeError(f"region {self.index}: border agents overflow "
+                                       "PARTITION.HALO_CAPACITY")
+                t[k] = a.id
+                t[k + 1] = x
+                t[k + 2] = y
+                k += 3
+        t[0] = (k - 1) // 3
+
+        c = self.control
+        base = 1 + _COUNTERS * self.index
+        c[base] = len(world.agents)
+        c[base + 1] = world.births
+        c[base + 2] = sum(world.deaths.values())
+        c[base + 3] = world.tick
+
+    def summary(self, collect: bool) -> dict:
+        world = self.world
+        if collect:
+            for a in world.agents:
+                _pack(a, world.water, world.time)  # no shared objects in the result
+        return {"index": self.index, "population": len(world.agents),
+                "births": world.births, "deaths": dict(world.deaths),
+                "agents": world.agents if collect else None}
+
+    def release(self) -> None:
+        self.world.food.release()
+        for view in (*self.halos, *self._rows, self._crowding, self.control):
+            view.release()
+
+
+def _worker(index: int, layout: RegionLayout, spec: dict, names: dict,
+            barrier, lock, results) -> None:
+    apply_overrides(spec["overrides"])
+
+    blocks = _Blocks.attach(names)
+    region = None
+    summary = {"index": index, "error": None}
+    try:
+        region = _Region(index, layout, spec, blocks, lock)
+        region.publish()
+        while True:
+            barrier.wait()
+            stop = region.control[0]
+            if stop != _RUN:
+                summary.update(region.summary(stop == _STOP_COLLECT))
+                break
+            region.step(spec["dt"])
+            barrier.wait()
+            region.adopt()
+            region.publish()
+    except BrokenBarrierError:
+        summary["error"] = _BROKEN
+    except Exception:
+        barrier.abort()
+        summary["error"] = traceback.format_exc()
+    finally:
+        if region is not None:
+            region.release()
+        blocks.close()
+        results.put(summary)
+
+
+# ---------------------------------------------------------
+# parent side
+# ---------------------------------------------------------
+class PartitionedWorld:
+    """
+    One world split over cols x rows worker processes.
+
+        with PartitionedWorld(1_000_000, 4, 4, seed=1) as pw:
+            for _ in range(600):
+                pw.step()
+            final = pw.close()
+
+    population / births / deaths are as of the previous tick while running
+    and exact after close().
+    """
+
+    def __init__(self, num_agents: int, cols: int, rows: int,
+                 seed: Optional[int] = None, dt: Optional[float] = None,
+                 overrides: Sequence[str] = ()):
+        self.layout = RegionLayout(cols, rows, cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT,
+                                   halo_width())
+        self.spec = {"agents": num_agents, "seed": seed,
+                     "dt": dt if dt is not None else 1.0 / cfg.SIM["HZ"],
+                     "overrides": list(overrides)}
+        self.tick = 0
+        self.population = num_agents
+        self.births = 0
+        self.deaths = 0
+        self.results: List[dict] = []
+
+        with config_overlay(parse_overrides(overrides)):
+            template = wd.create_world(0, seed=seed)
+        self.num_bushes = len(template.bushes)
+        self._blocks = _Blocks.create(self.layout, _layout_bytes(template),
+                                      SharedFoodStore.block_size(template.food),
+                                      len(template.water.ponds) + len(template.bushes))
+        SharedFoodStore.fill(template.food, self._blocks.food.buf)
+        self._control = self._blocks.control.buf.cast("q")
+        self._control[1 + _COUNTERS * self.layout.count] = num_agents
+
+        ctx = mp.get_context()
+        n = self.layout.count
+        self._barrier = ctx.Barrier(n + 1)
+        self._results = ctx.Queue()
+        lock = ctx.Lock()
+        names = self._blocks.names()
+        self._procs = [
+            ctx.Process(target=_worker, name=f"region-{i}", daemon=True,
+                        args=(i, self.layout, self.spec, names,
+                              self._barrier, lock, self._results))
+            for i in range(n)
+        ]
+        for p in self._procs:
+            p.start()
+
+    def __enter__(self) -> "PartitionedWorld":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _wait(self) -> None:
+        try:
+            self._barrier.wait()
+        except BrokenBarrierError:
+            self.close()  # raises with the failing region's traceback
+            raise
+
+    def _read_counters(self) -> None:
+        c = self._control
+        n = self.layout.count
+        rows = [c[1 + _COUNTERS * i:1 + _COUNTERS * (i + 1)] for i in range(n)]
+        self.population = sum(r[0] for r in rows)
+        self.births = sum(r[1] for r in rows)
+        self.deaths = sum(r[2] for r in rows)
+
+    def step(self) -> None:
+        """Advance every region by one tick."""
+        self._wait()            # regions have published: counters are current
+        self._read_counters()
+        self._wait()            # regions have stepped and posted migrants
+        self.tick += 1
+
+    def close(self, collect: bool = False) -> List[dict]:
+        """
+        Stop the workers and free shared memory. Returns one summary per
+        region (population, births, deaths by cause; agents if collect).
+        """
+        if self._procs is None:
+            return self.results
+        procs, self._procs = self._procs, None
+        self._control[0] = _STOP_COLLECT if collect else _STOP
+        if not self._barrier.broken:
+            try:
+                self._barrier.wait()
+            except BrokenBarrierError:
+                pass
+            else:
+                self._read_counters()
+        results = sorted((self._results.get() for _ in procs), key=lambda r: r["index"])
+        for p in procs:
+            p.join()
+        self._control.release()
+        self._blocks.close()
+        self._blocks.unlink()
+        self.results = results
+
+        failed = [r for r in results if r["error"]]
+        if failed:
+            first = next((r for r in failed if r["error"] != _BROKEN), failed[0])
+            raise RuntimeError(f"region {first['index']} failed:\n{first['error']}")
+        return results
@@ -0,0 +1,35 @@
+"""
+Per-world random stream.
+Each world owns one seeded stream, so runs are reproducible and several
+worlds can step in one process without sharing the global `random` state.
+Scalar draws stay on random.Random's C core (cheaper per value in CPython
+than handing values out of a pre-drawn buffer); whole arrays for vectorized
+paths come in one call from a NumPy Generator seeded alongside it.
+"""
+import random as _random
+from typing import Optional, Sequence
+
+
+class RandomStream(_random.Random):
+    """random.Random with a cheaper choice() and block draws (floats)."""
+
+    def __init__(self, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.seed_value = seed
+        self._gen = None
+
+    def choice(self, seq: Sequence):
+        # one random() instead of Random.choice's getrandbits loop
+        return seq[int(self.random() * len(seq))]
+
+    def floats(self, n: int, low: float = 0.0, high: float = 1.0):
+        """n uniforms in [low, high) in one draw, for vectorized paths."""
+        if self._gen is None:
+            try:
+                import numpy as np  # first use only: keeps startup light
+            except ImportError:
+                return [low + (high - low) * self.random() for _ in range(n)]
+            self._gen = np.random.default_rng(
+                self.seed_value if self.seed_value is not None
+                else self.getrandbits(64))
+        return low + (high - low) * self._gen.random(n)
@@ -0,0 +1,729 @@
+"""
+Frozen scalar reference step for differential testing.
+
+A self-contained copy of the plain per-agent tick as it stood before the
+engine optimizations (LOD, wake queue, analytic stats, batched collision,
+flow fields, spatial indexes, flat food store). differential.py checks
+every engine against it, so it must not share the code those engines
+rewrite:
+
+- stats are integrated with the original Euler update;
+- ponds and food are found by brute-force loops over every pond circle,
+  bush blob and food item (no WaterIndex / FoodStore queries);
+- food lives in plain per-bush lists (FoodLists);
+- neighbours come from a private copy of the uniform agent grid.
+
+Only the data types (Agent, Pond, FoodBush, Traits), config, the trait
+formulas and world layout generation are shared. Do not optimize this
+file: it is the specification the engines are measured against.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+import config as cfg
+import agent as ag
+import resources as res
+import traits as tr
+import world as wd
+
+INTERACT_COOLDOWN = 0.8
+MAX_SPEED = 3.5
+BOUNCE_DAMP = 0.92
+
+# set by step_world before each tick
+_sim_time_ms = 0
+_rng = None
+
+
+class FoodLists:
+    """Food per bush as plain lists of (x, y); eating pops a random item."""
+
+    def __init__(self, food: List[List[Tuple[float, float]]]):
+        self.food = food
+
+    @classmethod
+    def from_store(cls, store: res.FoodStore, bushes: List[res.FoodBush]) -> "FoodLists":
+        return cls([list(store.positions(b.index)) for b in bushes])
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.food)
+
+    def count(self, index: int) -> int:
+        return len(self.food[index])
+
+    def positions(self, index: int):
+        return iter(self.food[index])
+
+
+class _Grid:
+    """Uniform grid of agents, rebuilt once per tick (bucket order matters)."""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Tuple[int, int], list] = {}
+
+    def rebuild(self, agents: list) -> None:
+        cs = self.cell_size
+        self.cells = {}
+        for a in agents:
+            self.cells.setdefault((int(a.x // cs), int(a.y // cs)), []).append(a)
+
+    def neighbors(self, x: float, y: float, radius: float):
+        cs = self.cell_size
+        for cx in range(int((x - radius) // cs), int((x + radius) // cs) + 1):
+            for cy in range(int((y - radius) // cs), int((y + radius) // cs) + 1):
+                for a in self.cells.get((cx, cy), ()):
+                    dx = a.x - x
+                    dy = a.y - y
+                    if dx * dx + dy * dy <= radius * radius:
+                        yield a
+
+
+def create_world(num_agents: int = cfg.NUM_AGENTS, seed: Optional[int] = None) -> wd.World:
+    """wd.create_world, with food moved into FoodLists and a private grid."""
+    world = wd.create_world(num_agents, seed=seed)
+    world.food = FoodLists.from_store(world.food, world.bushes)
+    for b in world.bushes:
+        b.store = world.food
+    world.grid = _Grid(cfg.CROWDING["GRID_CELL"])
+    world.flow = None
+    return world
+
+
+def step_world(world: wd.World, dt: float) -> None:
+    """Advance a world built by create_world() by dt seconds."""
+    global _sim_time_ms, _rng
+    _sim_time_ms = int(world.time * 1000)
+    _rng = world.rng
+
+    for b in world.bushes:
+        _update_regen(world.food, b, dt)
+
+    world.grid.rebuild(world.agents)
+    alive = []
+    for a in world.agents:
+        _apply_separation(a, world.grid)
+        if _update_agent(a, dt, world.water.ponds, world.bushes, world.food):
+            alive.append(a)
+        else:
+            cause = ag.death_cause(a)
+            world.deaths[cause] = world.deaths.get(cause, 0) + 1
+    world.agents = alive
+
+    _mate_agents(world)
+    world.time += dt
+    world.tick += 1
+
+
+# =========================================================
+# RESOURCES
+# =========================================================
+
+def _update_regen(food: FoodLists, b: res.FoodBush, dt: float) -> None:
+    if len(food.food[b.index]) >= b.capacity:
+        b.regen_timer = 0.0
+        return
+    b.regen_timer += dt
+    if b.regen_timer >= cfg.RESOURCES["FOOD_REGEN_SECONDS"]:
+        b.regen_timer = 0.0
+        item = _new_food_item(food.food[b.index], b)
+        if item is not None:
+            food.food[b.index].append(item)
+
+
+def _new_food_item(items: list, b: res.FoodBush) -> Optional[Tuple[float, float]]:
+    food_r = cfg.RESOURCES["FOOD_RADIUS"]
+    rim = cfg.RESOURCES["FOOD_RIM_THICKNESS"]
+    edge_margin = cfg.RESOURCES["FOOD_EDGE_MARGIN"]
+    top = sorted(b.blob_circles, key=lambda c: c[2], reverse=True)[:2]
+
+    gap = cfg.RESOURCES["FOOD_MIN_GAP"]
+    for _phase in range(3):
+        min_dist = (food_r * 2) + gap
+        for _ in range(cfg.RESOURCES["FOOD_SPAWN_ATTEMPTS"]):
+            cx, cy, r = _rng.choice(top)
+            usable_r = max(0.0, r - edge_margin - food_r - rim - 2)
+            angle = _rng.uniform(0, 2 * math.pi)
+            radius = usable_r * (_rng.random() ** 0.5)
+            fx = max(10, min(cfg.WORLD_WIDTH - 10, cx + math.cos(angle) * radius))
+            fy = max(10, min(cfg.WORLD_HEIGHT - 10, cy + math.sin(angle) * radius))
+            if all((fx - ex) * (fx - ex) + (fy - ey) * (fy - ey) >= min_dist * min_dist
+                   for ex, ey in items):
+                return (fx, fy)
+        gap = max(0, gap - 2)
+    return None
+
+
+def _touch_circle(x, y, agent_r, circles, eps):
+    best = None
+    best_dist = float("inf")
+    for (cx, cy, cr) in circles:
+        dist = math.hypot(x - cx, y - cy)
+        if dist <= agent_r + cr + eps and dist < best_dist:
+            best_dist = dist
+            best = (cx, cy, cr, dist)
+    return best
+
+
+def _collision_circle(x, y, radius, circles):
+    best = None
+    best_overlap = 0.0
+    for (cx, cy, cr) in circles:
+        dist = math.hypot(x - cx, y - cy)
+        overlap = (radius + cr) - dist
+        if overlap > best_overlap:
+            best_overlap = overlap
+            best = (cx, cy, cr, dist, overlap)
+    return best
+
+
+def _touching_pond(x, y, ponds, eps):
+    best = None
+    for p in ponds:
+        hit = _touch_circle(x, y, cfg.AGENT_RADIUS, p.circles, eps)
+        if hit is not None and (best is None or hit[3] < best[1][3]):
+            best = (p, hit)
+    return best
+
+
+def _colliding_pond(x, y, ponds):
+    best = None
+    for p in ponds:
+        hit = _collision_circle(x, y, cfg.AGENT_RADIUS, p.circles)
+        if hit is not None and (best is None or hit[4] > best[4]):
+            best = hit
+    return best
+
+
+def _nearest_pond(x, y, ponds, max_dist):
+    best = None
+    best_d2 = max_dist * max_dist
+    for p in ponds:
+        d2 = (p.cx - x) * (p.cx - x) + (p.cy - y) * (p.cy - y)
+        if d2 <= best_d2:
+            best = p
+            best_d2 = d2
+    return best
+
+
+def _nearest_food(x, y, food: FoodLists, max_dist):
+    best = None
+    best_d2 = max_dist * max_dist
+    for items in food.food:
+        for (fx, fy) in items:
+            d2 = (fx - x) * (fx - x) + (fy - y) * (fy - y)
+            if d2 <= best_d2 and (best is None or d2 < best_d2):
+                best = (fx, fy)
+                best_d2 = d2
+    return best
+
+
+def _near_blobs(x, y, ponds, bushes, pad) -> bool:
+    for p in ponds:
+        for (cx, cy, cr) in p.circles:
+            if math.hypot(x - cx, y - cy) < cr + pad:
+                return True
+    for b in bushes:
+        for (cx, cy, cr) in b.blob_circles:
+            if math.hypot(x - cx, y - cy) < cr + pad:
+                return True
+    return False
+
+
+# =========================================================
+# AGENT STATS
+# =========================================================
+
+def _clamp(v: float) -> float:
+    return max(0.0, min(100.0, v))
+
+
+def _update_internal_state(a: ag.Agent, dt: float) -> None:
+    a.age += dt
+    t = a.traits or tr.Traits()
+    rates, th = cfg.RATES, cfg.THRESHOLDS
+
+    a.hunger = _clamp(a.hunger + tr.effective_drain(rates["HUNGER_UP"], t) * dt)
+    a.thirst = _clamp(a.thirst + tr.effective_drain(rates["THIRST_UP"], t) * dt)
+    a.energy = _clamp(a.energy - tr.effective_drain(rates["ENERGY_DOWN"], t) * dt)
+    a.health = _clamp(a.health)
+
+    drain = rates["HEALTH_DRAIN_BASE"]
+    if a.thirst >= th["THIRST_SEEK"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.hunger >= th["HUNGER_SEEK"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.energy <= th["ENERGY_SLOW"]:
+        drain += rates["HEALTH_DRAIN_SEEK"]
+    if a.thirst >= th["THIRST_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+    if a.hunger >= th["HUNGER_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+    if a.energy <= th["ENERGY_CRIT"]:
+        drain += rates["HEALTH_DRAIN_CRIT"]
+
+    if (a.hunger < th["HUNGER_SEEK"] and a.thirst < th["THIRST_SEEK"]
+            and a.energy > th["ENERGY_SLOW"]):
+        a.health += rates["HEALTH_REGEN"] * dt
+    a.health = _clamp(a.health - drain * dt)
+    if a.health <= 0.0 or a.age >= cfg.MAX_AGE:
+        a.alive = False
+
+
+def _movement_multiplier(a: ag.Agent) -> float:
+    th = cfg.THRESHOLDS
+    slow, crit = th["ENERGY_SLOW"], th["ENERGY_CRIT"]
+    min_mult = th.get("ENERGY_MIN_MULT", 0.35)
+    if a.energy >= slow:
+        energy_mult = 1.0
+    elif a.energy <= crit:
+        energy_mult = min_mult
+    else:
+        energy_mult = min_mult + (a.energy - crit) / (slow - crit) * (1.0 - min_mult)
+
+    start_mult = th.get("START_SPEED_MULT", 0.55)
+    ramp_s = th.get("SPEED_RAMP_SECONDS", 45.0)
+    if ramp_s <= 0:
+        ramp_mult = 1.0
+    else:
+        ramp_mult = min(1.0, start_mult + (a.age / ramp_s) * (1.0 - start_mult))
+    return energy_mult * ramp_mult
+
+
+def _can_mate(a: ag.Agent) -> bool:
+    rep, th = cfg.REPRODUCTION, cfg.THRESHOLDS
+    return (a.alive and a.mate_cooldown <= 0.0 and a.age >= rep["MIN_AGE"]
+            and a.health >= rep["MIN_HEALTH"] and a.hunger < th["HUNGER_SEEK"]
+            and a.thirst < th["THIRST_SEEK"] and a.energy > th["ENERGY_SLOW"]
+            and a.action == "WANDER" and a.eat_pause <= 0.0 and a.occupying is None)
+
+
+def _mate_agents(world: wd.World) -> None:
+    rep = cfg.REPRODUCTION
+    room = rep["MAX_AGENTS"] - len(world.agents)
+    if room <= 0:
+        return
+    children = []
+    for a in world.agents:
+        if len(children) >= room:
+            break
+        if not _can_mate(a):
+            continue
+        for b in world.grid.neighbors(a.x, a.y, rep["MATE_RADIUS"]):
+            if b is a or not _can_mate(b):
+                continue
+            children.append(ag.create_offspring(world.next_id, a, b, world.rng))
+            world.next_id += world.id_stride
+            for parent in (a, b):
+                parent.mate_cooldown = rep["COOLDOWN"]
+                parent.energy = max(0.0, parent.energy - rep["ENERGY_COST"])
+                parent.hunger = min(100.0, parent.hunger + rep["HUNGER_COST"])
+            break
+    world.agents.extend(children)
+    world.births += len(children)
+
+
+# =========================================================
+# AGENT UPDATE
+# =========================================================
+
+def _memory_expired(timestamp_ms: int, a: ag.Agent) -> bool:
+    if timestamp_ms < 0:
+        return True
+    ttl = tr.effective_memory_ttl(cfg.MEMORY["TIMEOUT"], a.traits or tr.Traits())
+    return (_sim_time_ms - timestamp_ms) > ttl * 1000
+
+
+def _release_slot(a: ag.Agent) -> None:
+    if a.occupying is not None:
+        a.occupying.occupants = max(0, a.occupying.occupants - 1)
+        a.occupying = None
+
+
+def _claim_slot(a: ag.Agent, resource) -> None:
+    _release_slot(a)
+    resource.occupants += 1
+    a.occupying = resource
+
+
+def _start_queue(a: ag.Agent, resource) -> None:
+    a.action = "QUEUE"
+    a.queue_for = resource
+    a.queue_timer = 0.0
+
+
+def _update_agent(a: ag.Agent, dt: float, ponds, bushes, food: FoodLists) -> bool:
+    """One agent, one tick; False if it died."""
+    _update_internal_state(a, dt)
+    if not a.alive:
+        _release_slot(a)
+        return False
+
+    _safe_pos(a)
+    _clamp_speed(a)
+
+    if a.interact_cooldown > 0.0:
+        a.interact_cooldown = max(0.0, a.interact_cooldown - dt)
+    if a.mate_cooldown > 0.0:
+        a.mate_cooldown = max(0.0, a.mate_cooldown - dt)
+    if a.eat_pause > 0.0:
+        a.eat_pause = max(0.0, a.eat_pause - dt)
+        if a.eat_pause <= 0.0:
+            _release_slot(a)
+        return True
+
+    if a.action == "QUEUE" and _update_queue(a, dt, ponds, bushes):
+        return True
+
+    if a.action == "DRINK":
+        return _drink(a, dt, ponds, bushes)
+
+    target = _choose_target(a, ponds, bushes, food)
+    if target is None:
+        _wander_steer(a, dt, ponds, bushes)
+    else:
+        _steer_towards(a, target[0], target[1])
+    _clamp_speed(a)
+
+    mult = _movement_multiplier(a)
+    return _resolve_move(a, a.x + a.velocityX * mult * (60.0 * dt),
+                         a.y + a.velocityY * mult * (60.0 * dt), ponds, bushes)
+
+
+def _update_queue(a: ag.Agent, dt: float, ponds, bushes) -> bool:
+    resource = a.queue_for
+    a.queue_timer += dt
+    is_pond = isinstance(resource, res.Pond)
+    if is_pond:
+        limit = cfg.CROWDING["POND_MAX_DRINKERS"]
+        still_needed = a.thirst >= cfg.THRESHOLDS["THIRST_OK"]
+    else:
+        limit = cfg.CROWDING["BUSH_MAX_EATERS"]
+        still_needed = a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and resource.food_count > 0
+
+    if still_needed and resource.occupants < limit:
+        a.queue_for = None
+        if is_pond:
+            touching = _touching_pond(a.x, a.y, ponds, 6.0)
+            if touching is None or touching[0] is not resource:
+                a.action = "WANDER"
+                return True
+            _claim_slot(a, resource)
+            a.action = "DRINK"
+            a.drink_timer = 0.0
+        else:
+            a.action = "WANDER"
+        return True
+
+    if not still_needed or a.queue_timer >= cfg.CROWDING["QUEUE_TIMEOUT"]:
+        a.queue_for = None
+        a.action = "WANDER"
+        a.interact_cooldown = max(a.interact_cooldown, INTERACT_COOLDOWN)
+        a.waypoint = _random_waypoint(ponds, bushes)
+        a.waypoint_timer = 0.0
+        return False
+    return True
+
+
+def _drink(a: ag.Agent, dt: float, ponds, bushes) -> bool:
+    touching = _touching_pond(a.x, a.y, ponds, 6.0)
+    if touching is None or a.thirst <= cfg.THRESHOLDS["THIRST_OK"]:
+        _release_slot(a)
+        a.action = "WANDER"
+        a.drink_timer = 0.0
+        a.interact_cooldown = INTERACT_COOLDOWN
+        a.has_drunk = True
+        if a.has_eaten and a.home_pos is None and a.last_water_pos:
+            a.home_pos = ((a.last_water_pos[0] + a.x) / 2.0,
+                          (a.last_water_pos[1] + a.y) / 2.0)
+        _nudge_velocity(a)
+        _clamp_speed(a)
+        a.waypoint = _random_waypoint(ponds, bushes)
+        a.waypoint_timer = _rng.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
+        return True
+
+    a.drink_timer += dt
+    while a.drink_timer >= cfg.RESOURCES["DRINK_INTERVAL"]:
+        a.drink_timer -= cfg.RESOURCES["DRINK_INTERVAL"]
+        a.thirst = max(0.0, a.thirst - cfg.RESOURCES["DRINK_AMOUNT"])
+        a.water_sips += 1
+        if "ENERGY_FROM_DRINK" in cfg.RESOURCES:
+            a.energy = min(100.0, a.energy + cfg.RESOURCES["ENERGY_FROM_DRINK"])
+    return True
+
+
+def _resolve_move(a: ag.Agent, nx: float, ny: float, ponds, bushes) -> bool:
+    pond_contact = _touching_pond(nx, ny, ponds, 6.0)
+    if pond_contact is not None:
+        a.last_water_pos = (pond_contact[0].cx, pond_contact[0].cy)
+        a.last_water_time_ms = _sim_time_ms
+
+    if (a.interact_cooldown <= 0.0 and a.thirst >= cfg.THRESHOLDS["THIRST_SEEK"]
+            and pond_contact is not None):
+        pond = pond_contact[0]
+        if pond.occupants >= cfg.CROWDING["POND_MAX_DRINKERS"]:
+            _start_queue(a, pond)
+            return True
+        _claim_slot(a, pond)
+        a.action = "DRINK"
+        a.drink_timer = 0.0
+        return True
+
+    hungry = a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"]
+    for b in bushes:
+        if _touch_circle(nx, ny, cfg.AGENT_RADIUS, b.blob_circles, 4.0) is None:
+            continue
+        if not any(abs(mx - b.x) < 5 and abs(my - b.y) < 5 for mx, my, _ts in a.food_memory):
+            a.food_memory.append((b.x, b.y, _sim_time_ms))
+
+        items = b.store.food[b.index]
+        if a.interact_cooldown <= 0.0 and hungry and items:
+            if b.occupants >= cfg.CROWDING["BUSH_MAX_EATERS"]:
+                _start_queue(a, b)
+                return True
+            items.pop(_rng.randrange(len(items)))
+            _claim_slot(a, b)
+            a.hunger = max(0.0, a.hunger - cfg.RESOURCES["EAT_AMOUNT"])
+            a.food_eaten += 1
+            if "ENERGY_FROM_EAT" in cfg.RESOURCES:
+                a.energy = min(100.0, a.energy + cfg.RESOURCES["ENERGY_FROM_EAT"])
+            a.eat_pause = cfg.RESOURCES["EAT_PAUSE"]
+            a.interact_cooldown = INTERACT_COOLDOWN
+            a.has_eaten = True
+            if a.has_drunk and a.home_pos is None and a.last_water_pos is not None:
+                a.home_pos = ((b.x + a.last_water_pos[0]) / 2.0,
+                              (b.y + a.last_water_pos[1]) / 2.0)
+            _nudge_velocity(a)
+            _clamp_speed(a)
+            return True
+
+        hit = _collision_circle(nx, ny, cfg.AGENT_RADIUS, b.blob_circles)
+        if hit is not None:
+            _apply_bounce(a, hit)
+            if not items:
+                a.interact_cooldown = max(a.interact_cooldown, 2.0)
+            a.waypoint = _random_waypoint(ponds, bushes)
+            a.waypoint_timer = 0.0
+            return True
+
+    hit = _colliding_pond(nx, ny, ponds)
+    if hit is not None:
+        _apply_bounce(a, hit)
+        if a.action == "WANDER":
+            a.waypoint = _random_waypoint(ponds, bushes)
+            a.waypoint_timer = 0.0
+        return True
+
+    r = cfg.AGENT_RADIUS
+    if nx < r:
+        nx = r
+        a.velocityX *= -1
+    elif nx > cfg.WORLD_WIDTH - r:
+        nx = cfg.WORLD_WIDTH - r
+        a.velocityX *= -1
+    if ny < r:
+        ny = r
+        a.velocityY *= -1
+    elif ny > cfg.WORLD_HEIGHT - r:
+        ny = cfg.WORLD_HEIGHT - r
+        a.velocityY *= -1
+    a.x, a.y = nx, ny
+
+    _safe_pos(a)
+    _clamp_speed(a)
+    return True
+
+
+def _apply_separation(a: ag.Agent, grid: _Grid) -> None:
+    if a.action != "WANDER" or a.eat_pause > 0.0:
+        return
+    radius = cfg.CROWDING["SEPARATION_RADIUS"]
+    sx = 0.0
+    sy = 0.0
+    for b in grid.neighbors(a.x, a.y, radius):
+        if b is a:
+            continue
+        dx = a.x - b.x
+        dy = a.y - b.y
+        d = math.hypot(dx, dy)
+        if d < 1e-6:
+            angle = _rng.uniform(0, 6.28318)
+            sx += math.cos(angle)
+            sy += math.sin(angle)
+            continue
+        w = (radius - d) / radius
+        sx += dx / d * w
+        sy += dy / d * w
+    if sx or sy:
+        strength = cfg.CROWDING["SEPARATION_STRENGTH"]
+        a.velocityX += sx * strength
+        a.velocityY += sy * strength
+
+
+# =========================================================
+# SENSING + STEERING
+# =========================================================
+
+def _choose_target(a: ag.Agent, ponds, bushes, food: FoodLists):
+    vision = tr.effective_vision(a.vision_radius, a.traits or tr.Traits())
+    pond = _nearest_pond(a.x, a.y, ponds, vision)
+    pond_pos = None if pond is None else (pond.cx, pond.cy)
+    food_visible = _nearest_food(a.x, a.y, food, vision) if bushes else None
+
+    a.food_memory = [m for m in a.food_memory if not _memory_expired(m[2], a)]
+    if _memory_expired(a.last_water_time_ms, a):
+        a.last_water_pos = None
+        a.last_water_time_ms = -1
+
+    if a.last_water_pos is None and pond_pos is not None:
+        return pond_pos
+    if not a.food_memory and bushes:
+        nearest = min(bushes, key=lambda b: math.hypot(b.x - a.x, b.y - a.y))
+        return (nearest.x, nearest.y)
+
+    thirsty = a.thirst >= cfg.THRESHOLDS["THIRST_SEEK"]
+    hungry = a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"]
+
+    if a.home_pos is not None and not thirsty and not hungry:
+        hx, hy = a.home_pos
+        if math.hypot(hx - a.x, hy - a.y) > a.home_region_radius:
+            return _waypoint_near_home(hx, hy, a.home_region_radius, ponds, bushes)
+        return None
+
+    if a.thirst > 80:
+        if pond_pos is not None:
+            return pond_pos
+        if a.last_water_pos:
+            return a.last_water_pos
+
+    if thirsty and hungry:
+        first, second = ((pond_pos, food_visible) if a.thirst >= a.hunger
+                         else (food_visible, pond_pos))
+        return first if first is not None else second
+    if thirsty:
+        return pond_pos if pond_pos is not None else (a.last_water_pos or None)
+    if hungry:
+        if food_visible is not None:
+            return food_visible
+        memory = a.food_memory
+        if memory and a.last_water_pos:
+            wx, wy = a.last_water_pos
+            memory = sorted(memory, key=lambda m: math.hypot(wx - m[0], wy - m[1]))
+        for bx, by, _ts in memory:
+            for b in bushes:
+                if abs(b.x - bx) < 15 and abs(b.y - by) < 15 and b.food_count > 0:
+                    return (bx, by)
+    return None
+
+
+def _steer_towards(a: ag.Agent, tx: float, ty: float) -> None:
+    dx = tx - a.x
+    dy = ty - a.y
+    d = math.hypot(dx, dy)
+    if d < 1e-6:
+        return
+    steer = a.steer_strength
+    ux = dx / d
+    uy = dy / d
+    a.velocityX = (1 - steer) * a.velocityX + steer * ux
+    a.velocityY = (1 - steer) * a.velocityY + steer * uy
+
+
+def _wander_steer(a: ag.Agent, dt: float, ponds, bushes) -> None:
+    if a.waypoint is None:
+        a.waypoint = _random_waypoint(ponds, bushes)
+        a.waypoint_timer = _rng.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
+    a.waypoint_timer += dt
+
+    wx, wy = a.waypoint
+    timeout = cfg.SENSING["WAYPOINT_TIMEOUT"] * (0.85 + 0.4 * _rng.random())
+    if (math.hypot(wx - a.x, wy - a.y) <= cfg.SENSING["WAYPOINT_REACHED"]
+            or a.waypoint_timer >= timeout):
+        a.waypoint = _random_waypoint(ponds, bushes)
+        a.waypoint_timer = 0.0
+        wx, wy = a.waypoint
+    _steer_towards(a, wx, wy)
+
+    j = cfg.SENSING["WANDER_JITTER"]
+    a.velocityX += (-j + 2.0 * j * _rng.random()) * 0.05
+    a.velocityY += (-j + 2.0 * j * _rng.random()) * 0.05
+
+
+def _waypoint_near_home(hx, hy, radius, ponds, bushes):
+    m = cfg.SENSING["WAYPOINT_MARGIN"]
+    for _ in range(100):
+        angle = _rng.uniform(0, 6.28318)
+        distance = _rng.uniform(0, radius)
+        x = max(m, min(cfg.WORLD_WIDTH - m, hx + math.cos(angle) * distance))
+        y = max(m, min(cfg.WORLD_HEIGHT - m, hy + math.sin(angle) * distance))
+        if not _near_blobs(x, y, ponds, bushes, 60.0):
+            return (x, y)
+    return (hx, hy)
+
+
+def _random_waypoint(ponds, bushes):
+    m = cfg.SENSING["WAYPOINT_MARGIN"]
+    for _ in range(160):
+        x = _rng.uniform(m, cfg.WORLD_WIDTH - m)
+        y = _rng.uniform(m, cfg.WORLD_HEIGHT - m)
+        if not _near_blobs(x, y, ponds, bushes, 60.0):
+            return (x, y)
+    return (_rng.uniform(m, cfg.WORLD_WIDTH - m), _rng.uniform(m, cfg.WORLD_HEIGHT - m))
+
+
+# =========================================================
+# STABILITY HELPERS
+# =========================================================
+
+def _apply_bounce(a: ag.Agent, hit) -> None:
+    cx, cy, cr, dist, overlap = hit
+    if dist == 0:
+        nxn, nyn = 1.0, 0.0
+    else:
+        nxn = (a.x - cx) / dist
+        nyn = (a.y - cy) / dist
+    a.x += nxn * (overlap + 1.0)
+    a.y += nyn * (overlap + 1.0)
+    dot = a.velocityX * nxn + a.velocityY * nyn
+    a.velocityX = (a.velocityX - 2 * dot * nxn) * BOUNCE_DAMP
+    a.velocityY = (a.velocityY - 2 * dot * nyn) * BOUNCE_DAMP
+
+    if dist > 1e-2:
+        a.velocityX += (a.x - cx) / dist * 6.0
+        a.velocityY += (a.y - cy) / dist * 6.0
+    else:
+        angle = _rng.uniform(0, 6.28318)
+        a.velocityX = math.cos(angle) * 6.0
+        a.velocityY = math.sin(angle) * 6.0
+    _clamp_speed(a)
+    _safe_pos(a)
+
+
+def _nudge_velocity(a: ag.Agent) -> None:
+    a.velocityX += _rng.choice([-1, 1]) * 0.6
+    a.velocityY += _rng.choice([-1, 1]) * 0.6
+
+
+def _clamp_speed(a: ag.Agent) -> None:
+    vx, vy = a.velocityX, a.velocityY
+    if not (math.isfinite(vx) and math.isfinite(vy)):
+        a.velocityX = _rng.choice([-1.2, -1.0, 1.0, 1.2])
+        a.velocityY = _rng.choice([-1.2, -1.0, 1.0, 1.2])
+        return
+    speed = math.hypot(vx, vy)
+    if speed < 1e-6:
+        a.velocityX = _rng.choice([-1.0, 1.0])
+        a.velocityY = _rng.choice([-1.0, 1.0])
+        return
+    max_speed = tr.effective_max_speed(MAX_SPEED, a.traits or tr.Traits())
+    if speed > max_speed:
+        s = max_speed / speed
+        a.velocityX *= s
+        a.velocityY *= s
+
+
+def _safe_pos(a: ag.Agent) -> None:
+    if not (math.isfinite(a.x) and math.isfinite(a.y)):
+        a.x = _rng.uniform(cfg.AGENT_RADIUS, cfg.WORLD_WIDTH - cfg.AGENT_RADIUS)
+        a.y = _rng.uniform(cfg.AGENT_RADIUS, cfg.WORLD_HEIGHT - cfg.AGENT_RADIUS)
+        _nudge_velocity(a)
@@ -0,0 +1,201 @@
+"""
+Drawing for the pygame viewer.
+Kept apart from resources/simulation so headless runs and worker
+processes never import pygame.
+"""
+from typing import Dict, List, Optional
+
+import pygame
+
+import config as cfg
+from camera import Camera
+from resources import FoodBush, Pond, WaterIndex
+
+# Cache loaded fonts (by size): a Font is parsed from disk when created
+_font_cache: Dict[int, pygame.font.Font] = {}
+
+
+def draw_resources(screen: pygame.Surface, water: WaterIndex, bushes: List[FoodBush],
+                   camera: Optional[Camera] = None) -> None:
+    """
+    Draw ponds, bushes and food. Only circles inside the camera viewport
+    are drawn (everything is drawn 1:1 when no camera is given).
+    """
+    if camera is None:
+        camera = Camera()
+
+    for pond in water.ponds:
+        _draw_pond(screen, pond, camera)
+
+    _draw_bushes(screen, bushes, camera)
+
+
+def _draw_pond(screen: pygame.Surface, pond: Pond, camera: Camera) -> None:
+    # --- POND: draw rim first (bigger circles), then water fill ---
+    RIM_THICKNESS = 10
+    x0, y0, x1, y1 = pond.bounds
+    vx0, vy0, vx1, vy1 = camera.view_rect()
+    if x1 + RIM_THICKNESS < vx0 or x0 - RIM_THICKNESS > vx1 \
+            or y1 + RIM_THICKNESS < vy0 or y0 - RIM_THICKNESS > vy1:
+        return
+
+    pond_circles = [c for c in pond.circles
+                    if camera.is_visible(c[0], c[1], c[2] + RIM_THICKNESS)]
+    for (x, y, r) in pond_circles:
+        pygame.draw.circle(
+            screen,
+            cfg.COLOURS["WATER_RIM"],
+            camera.world_to_screen(x, y),
+            camera.scale(r + RIM_THICKNESS)
+        )
+
+    for (x, y, r) in pond_circles:
+        pygame.draw.circle(
+            screen,
+            cfg.COLOURS["WATER"],
+            camera.world_to_screen(x, y),
+            camera.scale(r)
+        )
+
+    # sparkles (after pond fill so they sit on top)
+    if pond_circles:
+        for (sx, sy, sr) in pond.sparkles:
+            if camera.is_visible(sx, sy, sr):
+                pygame.draw.circle(
+                    screen, cfg.COLOURS["WATER_SPARKLE"],
+                    camera.world_to_screen(sx, sy), camera.scale(sr))
+
+
+def _draw_bushes(screen: pygame.Surface, bushes: List[FoodBush], camera: Camera) -> None:
+    # --- BUSHES: draw outline first, then fill ---
+    BUSH_OUTLINE_THICKNESS = 4
+    visible_bushes = [b for b in bushes
+                      if any(camera.is_visible(x, y, r + BUSH_OUTLINE_THICKNESS)
+                             for (x, y, r) in b.blob_circles)]
+    for b in visible_bushes:
+        # outline
+        for (x, y, r) in b.blob_circles:
+            pygame.draw.circle(
+                screen,
+                cfg.COLOURS["BUSH_OUTLINE"],
+                camera.world_to_screen(x, y),
+                camera.scale(r + BUSH_OUTLINE_THICKNESS)
+            )
+        # fill
+        for (x, y, r) in b.blob_circles:
+            pygame.draw.circle(
+                screen,
+                cfg.COLOURS["BUSH"],
+                camera.world_to_screen(x, y),
+                camera.scale(r)
+            )
+
+    fr = cfg.RESOURCES["FOOD_RADIUS"]
+    rim = cfg.RESOURCES["FOOD_RIM_THICKNESS"]
+
+    for b in visible_bushes:
+        for fx, fy in b.food_positions():
+            pos = camera.world_to_screen(fx, fy)
+            pygame.draw.circle(
+                screen, cfg.COLOURS["FOOD_RIM"], pos, camera.scale(fr + rim))
+            pygame.draw.circle(
+                screen, cfg.COLOURS["FOOD"], pos, camera.scale(fr))
+
+
+class DirtyRenderer:
+    """
+    Dirty-rectangle drawing for the viewer.
+
+    Grass, ponds, bushes and food are drawn once into a background surface
+    for the current camera view. Each frame restores the areas drawn over
+    last frame from it, redraws bushes whose food changed, and pushes only
+    those rects plus this frame's sprites with pygame.display.update. A
+    camera move (pan, zoom, follow) rebuilds the background and flips.
+
+        renderer.begin(water, bushes, camera)
+        renderer.touch(pygame.draw.circle(screen, ...))   # every sprite
+        renderer.present()
+    """
+
+    def __init__(self, screen: pygame.Surface):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size())
+        self._view: Optional[tuple] = None      # camera the background is for
+        self._visible: List[FoodBush] = []
+        self._food: Dict[int, tuple] = {}       # bush index -> food drawn
+        self._drawn: List[pygame.Rect] = []     # sprites drawn this frame
+        self._restored: List[pygame.Rect] = []  # last frame's sprites, erased
+        self._full = True
+
+    def begin(self, water: WaterIndex, bushes: List[FoodBush], camera: Camera) -> None:
+        """Bring the screen back to the background (call with resources readable)."""
+        view = (camera.x, camera.y, camera.zoom)
+        bg = self.background
+        if view != self._view:
+            self._view = view
+            bg.fill(cfg.COLOURS["GRASS"])
+            draw_resources(bg, water, bushes, camera)
+            self._visible = [b for b in bushes if _bush_rect(b, camera).colliderect(bg.get_rect())]
+            self._food = {b.index: tuple(b.food_positions()) for b in self._visible}
+            self._full = True
+        else:
+            for b in self._visible:
+                food = tuple(b.food_positions())
+                if food != self._food[b.index]:
+                    self._food[b.index] = food
+                    rect = _bush_rect(b, camera).clip(bg.get_rect())
+                    # repaint everything under the bush, keeping overlaps in order
+                    bg.set_clip(rect)
+                    bg.fill(cfg.COLOURS["GRASS"])
+                    draw_resources(bg, water, bushes, camera)
+                    bg.set_clip(None)
+                    self._restored.append(rect)
+
+        if self._full:
+            self.screen.blit(bg, (0, 0))
+        else:
+            self._restored.extend(self._drawn)
+            for rect in self._restored:
+                self.screen.blit(bg, rect, rect)
+        self._drawn = []
+
+    def touch(self, rect: Optional[pygame.Rect]) -> None:
+        """Record an area drawn over the background this frame."""
+        if rect is not None:
+            self._drawn.append(rect)
+
+    def present(self) -> None:
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        else:
+            pygame.display.update(self._restored + self._drawn)
+        self._restored = []
+
+
+def draw_speed_label(screen: pygame.Surface, text: str) -> pygame.Rect:
+    """Time-scale readout in the top-left corner; returns the area drawn."""
+    label = _font(18).render(text, True, (255, 255, 255))
+    rect = pygame.Rect(10, 10, label.get_width() + 8, label.get_height() + 6)
+    pygame.draw.rect(screen, (0, 0, 0), rect)
+    screen.blit(label, (rect.x + 4, rect.y + 3))
+    return rect
+
+
+def _font(size: int) -> pygame.font.Font:
+    font = _font_cache.get(size)
+    if font is None:
+        font = _font_cache[size] = pygame.font.Font(None, size)
+    return font
+
+
+def _bush_rect(b: FoodBush, camera: Camera) -> pygame.Rect:
+    """Screen area of a bush with its outline and food."""
+    pad = 4 + cfg.RESOURCES["FOOD_RADIUS"] + cfg.RESOURCES["FOOD_RIM_THICKNESS"]
+    x0 = min(x - r for (x, y, r) in b.blob_circles) - pad
+    y0 = min(y - r for (x, y, r) in b.blob_circles) - pad
+    x1 = max(x + r for (x, y, r) in b.blob_circles) + pad
+    y1 = max(y + r for (x, y, r) in b.blob_circles) + pad
+    sx0, sy0 = camera.world_to_screen(x0, y0)
+    sx1, sy1 = camera.world_to_screen(x1, y1)
+    return pygame.Rect(sx0 - 1, sy0 - 1, sx1 - sx0 + 3, sy1 - sy0 + 3)
@@ -1,20 +1,21 @@
 # resources.py
 import random
 import math
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 
-import pygame
 import config as cfg
+from spatial import StaticGrid
 
 
 def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-def _rand_point(margin: int) -> Tuple[float, float]:
-    x = random.uniform(margin, cfg.WIDTH - margin)
-    y = random.uniform(margin, cfg.HEIGHT - margin)
+def _rand_point(margin: int, rng) -> Tuple[float, float]:
+    x = rng.uniform(margin, cfg.WORLD_WIDTH - margin)
+    y = rng.uniform(margin, cfg.WORLD_HEIGHT - margin)
     return x, y
 
 
@@ -24,27 +25,181 @@ class FoodItem:
     y: float
 
 
+class FoodStore:
+    """
+    All food in one world, in flat preallocated arrays.
+    Each bush owns `capacity` consecutive slots; x / y / bush / alive are
+    contiguous (array, bytearray) so whole-world queries and snapshots work
+    on plain memory. Per bush, a free list of empty slots makes spawning an
+    O(1) write, and an ordered list of live slots keeps eating identical to
+    popping a random item off a list.
+    """
+
+    def __init__(self):
+        self.x = array("d")
+        self.y = array("d")
+        self.bush = array("i")
+        self.alive = bytearray()
+        self._free: List[List[int]] = []
+        self._live: List[List[int]] = []
+        self._reach: List[Tuple[float, float, float]] = []  # culling circle per bush
+
+    def __len__(self) -> int:
+        return sum(len(live) for live in self._live)
+
+    def register(self, bush: "FoodBush") -> None:
+        """Give bush its slots (call once blob_circles are set)."""
+        index = len(self._live)
+        start = len(self.alive)
+        n = bush.capacity
+        self.x.extend([0.0] * n)
+        self.y.extend([0.0] * n)
+        self.bush.extend([index] * n)
+        self.alive.extend(bytes(n))
+        self._free.append(list(range(start + n - 1, start - 1, -1)))
+        self._live.append([])
+
+        reach = max((math.hypot(cx - bush.x, cy - bush.y) + cr
+                     for (cx, cy, cr) in bush.blob_circles), default=0.0)
+        self._reach.append((bush.x, bush.y, reach))
+        bush.store = self
+        bush.index = index
+
+    def count(self, index: int) -> int:
+        return len(self._live[index])
+
+    def positions(self, index: int) -> Iterator[Tuple[float, float]]:
+        x, y = self.x, self.y
+        for slot in self._live[index]:
+            yield x[slot], y[slot]
+
+    def spawn(self, index: int, fx: float, fy: float) -> bool:
+        free = self._free[index]
+        if not free:
+            return False
+        slot = free.pop()
+        self.x[slot] = fx
+        self.y[slot] = fy
+        self.alive[slot] = 1
+        self._live[index].append(slot)
+        return True
+
+    def eat_random(self, index: int, rng=None) -> bool:
+        """Remove a random live item of bush index (rng: the world's stream)."""
+        if rng is None:
+            rng = random
+        live = self._live[index]
+        if not live:
+            return False
+        slot = live.pop(rng.randrange(len(live)))
+        self.alive[slot] = 0
+        self._free[index].append(slot)
+        return True
+
+    def nearest(self, x: float, y: float, max_dist: float,
+                indices: Optional[Iterable[int]] = None) -> Optional[Tuple[float, float]]:
+        """
+        Closest food item within max_dist of (x, y), bushes out of range
+        skipped. indices: the bushes to look at, in bush order (default all).
+        """
+        best = None
+        best_d2 = max_dist * max_dist
+        fx, fy = self.x, self.y
+        reach_of, live_of = self._reach, self._live
+        for i in range(len(reach_of)) if indices is None else indices:
+            live = live_of[i]
+            if not live:
+                continue
+            bx, by, reach = reach_of[i]
+            lim = max_dist + reach
+            if (bx - x) * (bx - x) + (by - y) * (by - y) > lim * lim:
+                continue
+            for slot in live:
+                dx = fx[slot] - x
+                dy = fy[slot] - y
+                d2 = dx * dx + dy * dy
+                if d2 <= best_d2 and (best is None or d2 < best_d2):
+                    best = (fx[slot], fy[slot])
+                    best_d2 = d2
+        return best
+
+    def nearest_many(self, xs, ys, max_dist: float):
+        """
+        Vectorized nearest(): slot index of the closest live food within
+        max_dist for every (xs[i], ys[i]), -1 where none. Works on the
+        store's memory in place (needs numpy).
+        """
+        import numpy as np
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        out = np.full(len(xs), -1, dtype=np.int64)
+        slots = np.flatnonzero(np.frombuffer(self.alive, dtype=np.uint8))
+        if len(slots) == 0 or len(xs) == 0:
+            return out
+        fx = np.frombuffer(self.x, dtype=np.float64)[slots]
+        fy = np.frombuffer(self.y, dtype=np.float64)[slots]
+
+        chunk = cfg.COLLISION["CHUNK"]
+        for start in range(0, len(xs), chunk):
+            dx = fx[None, :] - xs[start:start + chunk, None]
+            dy = fy[None, :] - ys[start:start + chunk, None]
+            d2 = dx * dx + dy * dy
+            best = d2.argmin(axis=1)
+            hit = d2[np.arange(len(best)), best] <= max_dist * max_dist
+            out[start:start + chunk] = np.where(hit, slots[best], -1)
+        return out
+
+    def snapshot(self) -> dict:
+        """Copy of all food state (plain bytes / lists), see restore()."""
+        return {
+            "x": self.x.tobytes(),
+            "y": self.y.tobytes(),
+            "alive": bytes(self.alive),
+            "free": [list(f) for f in self._free],
+            "live": [list(l) for l in self._live],
+        }
+
+    def restore(self, snap: dict) -> None:
+        self.x = array("d", snap["x"])
+        self.y = array("d", snap["y"])
+        self.alive = bytearray(snap["alive"])
+        self._free = [list(f) for f in snap["free"]]
+        self._live = [list(l) for l in snap["live"]]
+
+
 @dataclass
 class FoodBush:
     x: float
     y: float
     capacity: int
-    food: List[FoodItem] = field(default_factory=list)
     regen_timer: float = 0.0
+    occupants: int = 0      # agents currently eating here
+    store: Optional[FoodStore] = None   # set by FoodStore.register
+    index: int = -1
 
     # for drawing a blob behind it
     blob_circles: List[Tuple[float, float, float]
                        ] = field(default_factory=list)
 
-    def spawn_initial_food(self) -> None:
+    @property
+    def food_count(self) -> int:
+        return self.store.count(self.index)
+
+    def food_positions(self) -> Iterator[Tuple[float, float]]:
+        return self.store.positions(self.index)
+
+    def spawn_initial_food(self, rng=None) -> None:
+        if rng is None:
+            rng = random
         safety = 200  # prevent infinite loops
-        while len(self.food) < self.capacity and safety > 0:
-            item = self._new_food_item()
+        while self.food_count < self.capacity and safety > 0:
+            item = self._new_food_item(rng)
             if item is not None:
-                self.food.append(item)
+                self.store.spawn(self.index, item.x, item.y)
             safety -= 1
 
-    def _new_food_item(self) -> Optional[FoodItem]:
+    def _new_food_item(self, rng) -> Optional[FoodItem]:
 
         food_r = cfg.RESOURCES["FOOD_RADIUS"]
         rim = cfg.RESOURCES["FOOD_RIM_THICKNESS"]
@@ -65,21 +220,21 @@ class FoodBush:
             min_dist_sq = min_dist * min_dist
 
             for _ in range(attempts):
-                cx, cy, r = random.choice(top)
+                cx, cy, r = rng.choice(top)
                 usable_r = max(0.0, r - edge_margin - food_r - rim - 2)
 
-                angle = random.uniform(0, 2 * math.pi)
-                radius = usable_r * (random.random() ** 0.5)
+                angle = rng.uniform(0, 2 * math.pi)
+                radius = usable_r * (rng.random() ** 0.5)
                 fx = cx + math.cos(angle) * radius
                 fy = cy + math.sin(angle) * radius
 
-                fx = _clamp(fx, 10, cfg.WIDTH - 10)
-                fy = _clamp(fy, 10, cfg.HEIGHT - 10)
+                fx = _clamp(fx, 10, cfg.WORLD_WIDTH - 10)
+                fy = _clamp(fy, 10, cfg.WORLD_HEIGHT - 10)
 
                 ok = True
-                for f in self.food:
-                    dx = fx - f.x
-                    dy = fy - f.y
+                for (ex, ey) in self.food_positions():
+                    dx = fx - ex
+                    dy = fy - ey
                     if (dx * dx + dy * dy) < min_dist_sq:
                         ok = False
                         break
@@ -93,81 +248,198 @@ class FoodBush:
         # too crowded: don't spawn a new one
         return None
 
-    def update_regen(self, dt: float) -> None:
+    def update_regen(self, dt: float, rng=None) -> None:
         # regen scaffolding for later (won't change anything until food gets eaten)
-        if len(self.food) >= self.capacity:
+        if self.food_count >= self.capacity:
             self.regen_timer = 0.0
             return
 
         self.regen_timer += dt
         if self.regen_timer >= cfg.RESOURCES["FOOD_REGEN_SECONDS"]:
             self.regen_timer = 0.0
-            item = self._new_food_item()
+            item = self._new_food_item(random if rng is None else rng)
             if item is not None:
-                self.food.append(item)
+                self.store.spawn(self.index, item.x, item.y)
 
 
 @dataclass
 class Pond:
     circles: List[Tuple[float, float, float]]
     sparkles: List[Tuple[float, float, int]]
+    id: int = 0
+    occupants: int = 0      # agents currently drinking here
+
+    # cached at creation (ponds never move)
+    cx: float = field(init=False, default=0.0)
+    cy: float = field(init=False, default=0.0)
+    r_max: float = field(init=False, default=0.0)
+    bounds: Tuple[float, float, float, float] = field(
+        init=False, default=(0.0, 0.0, 0.0, 0.0))
+
+    def __post_init__(self) -> None:
+        n = max(1, len(self.circles))
+        self.cx = sum(c[0] for c in self.circles) / n
+        self.cy = sum(c[1] for c in self.circles) / n
+        self.r_max = max((c[2] for c in self.circles), default=0.0)
+        self.bounds = (
+            min(c[0] - c[2] for c in self.circles),
+            min(c[1] - c[2] for c in self.circles),
+            max(c[0] + c[2] for c in self.circles),
+            max(c[1] + c[2] for c in self.circles),
+        )
 
 
-def create_pond() -> Pond:
-    margin = cfg.RESOURCES["POND_MARGIN"]
-    cx, cy = _rand_point(margin)
+def create_pond(center: Optional[Tuple[float, float]] = None, pond_id: int = 0,
+                rng=None) -> Pond:
+    if rng is None:
+        rng = random
+    if center is None:
+        center = _rand_point(cfg.RESOURCES["POND_MARGIN"], rng)
+    cx, cy = center
 
     circles: List[Tuple[float, float, float]] = []
     for _ in range(cfg.RESOURCES["POND_CIRCLES"]):
-        r = random.uniform(
+        r = rng.uniform(
             cfg.RESOURCES["POND_RADIUS_MIN"], cfg.RESOURCES["POND_RADIUS_MAX"])
-        ox = random.uniform(-60, 60)
-        oy = random.uniform(-50, 50)
+        ox = rng.uniform(-60, 60)
+        oy = rng.uniform(-50, 50)
         circles.append((cx + ox, cy + oy, r))
 
     # --- sparkles: random points inside random pond circles ---
     sparkles: List[Tuple[float, float, int]] = []
-    import math
     for _ in range(cfg.RESOURCES["POND_SPARKLES"]):
-        scx, scy, sr = random.choice(circles)
-        angle = random.uniform(0, 2 * math.pi)
-        radius = sr * (random.random() ** 0.5)
+        scx, scy, sr = rng.choice(circles)
+        angle = rng.uniform(0, 2 * math.pi)
+        radius = sr * (rng.random() ** 0.5)
         sx = scx + math.cos(angle) * radius
         sy = scy + math.sin(angle) * radius
-        srad = random.randint(
+        srad = rng.randint(
             cfg.RESOURCES["POND_SPARKLE_R_MIN"], cfg.RESOURCES["POND_SPARKLE_R_MAX"])
         sparkles.append((sx, sy, srad))
 
-    return Pond(circles=circles, sparkles=sparkles)
+    return Pond(circles=circles, sparkles=sparkles, id=pond_id)
 
 
 def pond_bounds(pond: Pond) -> Tuple[float, float, float]:
     """
     Returns (cx, cy, r_max) so we can keep bushes away from pond.
     """
-    cx = sum(c[0] for c in pond.circles) / len(pond.circles)
-    cy = sum(c[1] for c in pond.circles) / len(pond.circles)
-    r_max = max(c[2] for c in pond.circles)
-    return cx, cy, r_max
+    return pond.cx, pond.cy, pond.r_max
 
 
-def create_bushes(pond: Pond) -> List[FoodBush]:
+class WaterIndex:
+    """
+    All ponds in the world plus a uniform grid over their bounds, so
+    "nearest visible water" and "touching any pond" only look at ponds
+    in nearby cells.
+    """
+
+    # contact queries use eps up to this, so ponds are indexed with this pad
+    CONTACT_PAD = 16.0
+
+    def __init__(self, ponds: List[Pond]):
+        self.ponds = ponds
+        self.grid: StaticGrid[Pond] = StaticGrid(
+            cfg.RESOURCES["WATER_INDEX_CELL"])
+        pad = cfg.AGENT_RADIUS + self.CONTACT_PAD
+        for p in ponds:
+            self.grid.insert(p, p.bounds, pad)
+
+    def nearest(self, x: float, y: float, max_dist: float) -> Optional[Pond]:
+        """Pond whose centre is closest to (x, y) and within max_dist."""
+        best = None
+        best_d2 = max_dist * max_dist
+        for p in self.grid.in_radius(x, y, max_dist):
+            dx = p.cx - x
+            dy = p.cy - y
+            d2 = dx * dx + dy * dy
+            if d2 <= best_d2:
+                best = p
+                best_d2 = d2
+        return best
+
+    def touching(self, x: float, y: float, agent_r: float, eps: float = 2.0):
+        """
+        Returns (pond, (cx, cy, cr, dist)) for the closest pond circle in
+        contact range, else None.
+        """
+        best = None
+        for p in self.grid.at(x, y):
+            hit = touch_circle(x, y, agent_r, p.circles, eps)
+            if hit is not None and (best is None or hit[3] < best[1][3]):
+                best = (p, hit)
+        return best
+
+    def colliding(self, x: float, y: float, agent_r: float):
+        """Deepest overlapping pond circle (cx, cy, cr, dist, overlap), else None."""
+        best = None
+        for p in self.grid.at(x, y):
+            hit = _closest_collision_circle(x, y, agent_r, p.circles)
+            if hit is not None and (best is None or hit[4] > best[4]):
+                best = hit
+        return best
+
+    def near_any(self, x: float, y: float, pad: float) -> bool:
+        """True if (x, y) is within pad of any pond circle."""
+        for p in self.grid.in_radius(x, y, pad):
+            for (cx, cy, cr) in p.circles:
+                if math.hypot(x - cx, y - cy) < (cr + pad):
+                    return True
+        return False
+
+
+def create_ponds(rng=None) -> List[Pond]:
+    """Place NUM_PONDS ponds, keeping their centres POND_MIN_DIST apart."""
+    if rng is None:
+        rng = random
+    ponds: List[Pond] = []
+    margin = cfg.RESOURCES["POND_MARGIN"]
+    min_dist_sq = cfg.RESOURCES["POND_MIN_DIST"] ** 2
+
+    for i in range(cfg.RESOURCES["NUM_PONDS"]):
+        center = _rand_point(margin, rng)
+        for _try in range(cfg.RESOURCES["POND_SPAWN_ATTEMPTS"]):
+            if all((center[0] - p.cx) ** 2 + (center[1] - p.cy) ** 2 >= min_dist_sq
+                   for p in ponds):
+                break
+            center = _rand_point(margin, rng)
+        ponds.append(create_pond(center, pond_id=i, rng=rng))
+
+    return ponds
+
+
+def create_water(rng=None) -> WaterIndex:
+    return WaterIndex(create_ponds(rng))
+
+
+def create_bushes(water: WaterIndex, store: Optional[FoodStore] = None,
+                  rng=None) -> List[FoodBush]:
+    """Place NUM_BUSHES bushes clear of the ponds; their food goes in store."""
+    if rng is None:
+        rng = random
+    if store is None:
+        store = FoodStore()
     bushes: List[FoodBush] = []
 
     min_dist = cfg.RESOURCES["BUSH_MIN_DIST"]
     min_dist_sq = min_dist * min_dist
     attempts = cfg.RESOURCES["BUSH_SPAWN_ATTEMPTS"]
 
-    pcx, pcy, pr = pond_bounds(pond)
-    pond_safe = pr + cfg.RESOURCES["POND_BUSH_BUFFER"]
-    pond_safe_sq = pond_safe * pond_safe
+    buffer = cfg.RESOURCES["POND_BUSH_BUFFER"]
+    # centroid -> outermost edge, so the grid query covers every pond in range
+    p_max_r = max((max(p.bounds[2] - p.cx, p.cx - p.bounds[0],
+                       p.bounds[3] - p.cy, p.cy - p.bounds[1])
+                   for p in water.ponds), default=0.0)
 
     def valid_spot(x: float, y: float) -> bool:
-        # keep away from pond
-        dxp = x - pcx
-        dyp = y - pcy
-        if (dxp * dxp + dyp * dyp) < pond_safe_sq:
-            return False
+        # keep away from every pond
+        for p in water.grid.in_radius(x, y, buffer + p_max_r):
+            pcx, pcy, pr = pond_bounds(p)
+            pond_safe = pr + buffer
+            dxp = x - pcx
+            dyp = y - pcy
+            if (dxp * dxp + dyp * dyp) < pond_safe * pond_safe:
+                return False
 
         # spacing check vs existing bushes
         for b in bushes:
@@ -183,11 +455,11 @@ def create_bushes(pond: Pond) -> List[FoodBush]:
 
         # main placement attempts
         for _try in range(attempts):
-            bx, by = _rand_point(margin=80)
+            bx, by = _rand_point(80, rng)
             if not valid_spot(bx, by):
                 continue
 
-            cap = random.randint(
+            cap = rng.randint(
                 cfg.RESOURCES["FOOD_PER_BUSH_MIN"],
                 cfg.RESOURCES["FOOD_PER_BUSH_MAX"]
             )
@@ -195,15 +467,16 @@ def create_bushes(pond: Pond) -> List[FoodBush]:
 
             # bush blob circles (for visuals)
             for _ in range(cfg.RESOURCES["BUSH_BLOB_CIRCLES"]):
-                r = random.uniform(
+                r = rng.uniform(
                     cfg.RESOURCES["BUSH_BLOB_RADIUS_MIN"],
                     cfg.RESOURCES["BUSH_BLOB_RADIUS_MAX"]
                 )
-                ox = random.uniform(-18, 18)
-                oy = random.uniform(-18, 18)
+                ox = rng.uniform(-18, 18)
+                oy = rng.uniform(-18, 18)
                 bush.blob_circles.append((bx + ox, by + oy, r))
 
-            bush.spawn_initial_food()
+            store.register(bush)
+            bush.spawn_initial_food(rng)
             bushes.append(bush)
             placed = True
             break
@@ -211,113 +484,118 @@ def create_bushes(pond: Pond) -> List[FoodBush]:
         # fallback placement (still tries to respect constraints)
         if not placed:
             for _try in range(20):
-                bx, by = _rand_point(margin=80)
+                bx, by = _rand_point(80, rng)
                 if not valid_spot(bx, by):
                     continue
 
-                cap = random.randint(
+                cap = rng.randint(
                     cfg.RESOURCES["FOOD_PER_BUSH_MIN"],
                     cfg.RESOURCES["FOOD_PER_BUSH_MAX"]
                 )
                 bush = FoodBush(x=bx, y=by, capacity=cap)
 
                 for _ in range(cfg.RESOURCES["BUSH_BLOB_CIRCLES"]):
-                    r = random.uniform(
+                    r = rng.uniform(
                         cfg.RESOURCES["BUSH_BLOB_RADIUS_MIN"],
                         cfg.RESOURCES["BUSH_BLOB_RADIUS_MAX"]
                     )
-                    ox = random.uniform(-18, 18)
-                    oy = random.uniform(-18, 18)
+                    ox = rng.uniform(-18, 18)
+                    oy = rng.uniform(-18, 18)
                     bush.blob_circles.append((bx + ox, by + oy, r))
 
-                bush.spawn_initial_food()
+                store.register(bush)
+                bush.spawn_initial_food(rng)
                 bushes.append(bush)
                 placed = True
                 break
 
         # last resort: place anywhere (rare, but prevents “missing bushes”)
         if not placed:
-            bx, by = _rand_point(margin=80)
+            bx, by = _rand_point(80, rng)
 
-            cap = random.randint(
+            cap = rng.randint(
                 cfg.RESOURCES["FOOD_PER_BUSH_MIN"],
                 cfg.RESOURCES["FOOD_PER_BUSH_MAX"]
             )
             bush = FoodBush(x=bx, y=by, capacity=cap)
 
             for _ in range(cfg.RESOURCES["BUSH_BLOB_CIRCLES"]):
-                r = random.uniform(
+                r = rng.uniform(
                     cfg.RESOURCES["BUSH_BLOB_RADIUS_MIN"],
                     cfg.RESOURCES["BUSH_BLOB_RADIUS_MAX"]
                 )
-                ox = random.uniform(-18, 18)
-                oy = random.uniform(-18, 18)
+                ox = rng.uniform(-18, 18)
+                oy = rng.uniform(-18, 18)
                 bush.blob_circles.append((bx + ox, by + oy, r))
 
-            bush.spawn_initial_food()
+            store.register(bush)
+            bush.spawn_initial_food(rng)
             bushes.append(bush)
 
     return bushes
 
 
-def update_resources(bushes: List[FoodBush], dt: float) -> None:
-    for b in bushes:
-        b.update_regen(dt)
-
-
-def draw_resources(screen: pygame.Surface, pond: Pond, bushes: List[FoodBush]) -> None:
-    # --- POND: draw rim first (bigger circles), then water fill ---
-    RIM_THICKNESS = 10
-    for (x, y, r) in pond.circles:
-        pygame.draw.circle(
-            screen,
-            cfg.COLOURS["WATER_RIM"],
-            (int(x), int(y)),
-            int(r + RIM_THICKNESS)
-        )
+class BushGrid(StaticGrid[FoodBush]):
+    """
+    StaticGrid over bush blob bounds that also answers "nearest bush
+    centre" from any distance: each cell remembers, on first use, the
+    bushes that can be nearest to some point in it.
+    """
 
-    for (x, y, r) in pond.circles:
-        pygame.draw.circle(
-            screen,
-            cfg.COLOURS["WATER"],
-            (int(x), int(y)),
-            int(r)
+    def __init__(self, bushes: List[FoodBush], cell_size: float):
+        super().__init__(cell_size)
+        self.bushes = bushes
+        self._nearest: Dict[Tuple[int, int], List[FoodBush]] = {}
+
+    def nearest(self, x: float, y: float) -> Optional[FoodBush]:
+        """Bush whose centre is closest to (x, y); the first in bush order on ties."""
+        cell = self._cell(x, y)
+        candidates = self._nearest.get(cell)
+        if candidates is None:
+            candidates = self._nearest[cell] = self._candidates(cell)
+        best = None
+        best_d = math.inf
+        for b in candidates:
+            d = math.hypot(b.x - x, b.y - y)
+            if d < best_d:
+                best, best_d = b, d
+        return best
+
+    def _candidates(self, cell: Tuple[int, int]) -> List[FoodBush]:
+        """Bushes no farther from the cell than the nearest one's far corner."""
+        size = self.cell_size
+        x0, y0 = cell[0] * size, cell[1] * size
+        x1, y1 = x0 + size, y0 + size
+        near = []
+        bound = math.inf
+        for b in self.bushes:
+            dx = max(x0 - b.x, 0.0, b.x - x1)
+            dy = max(y0 - b.y, 0.0, b.y - y1)
+            fx = max(b.x - x0, x1 - b.x)
+            fy = max(b.y - y0, y1 - b.y)
+            near.append((dx * dx + dy * dy, b))
+            bound = min(bound, fx * fx + fy * fy)
+        return [b for d2, b in near if d2 <= bound]
+
+
+def index_bushes(bushes: List[FoodBush]) -> BushGrid:
+    """Uniform grid over bush blob bounds for "any bush nearby?" queries."""
+    grid = BushGrid(bushes, cfg.RESOURCES["WATER_INDEX_CELL"])
+    for b in bushes:
+        bounds = (
+            min(c[0] - c[2] for c in b.blob_circles),
+            min(c[1] - c[2] for c in b.blob_circles),
+            max(c[0] + c[2] for c in b.blob_circles),
+            max(c[1] + c[2] for c in b.blob_circles),
         )
+        grid.insert(b, bounds)
+    return grid
 
-    # sparkles (after pond fill so they sit on top)
-    for (sx, sy, sr) in pond.sparkles:
-        pygame.draw.circle(
-            screen, cfg.COLOURS["WATER_SPARKLE"], (int(sx), int(sy)), sr)
 
-    # --- BUSHES: draw outline first, then fill ---
-    BUSH_OUTLINE_THICKNESS = 4
+def update_resources(bushes: List[FoodBush], dt: float, rng=None) -> None:
     for b in bushes:
-        # outline
-        for (x, y, r) in b.blob_circles:
-            pygame.draw.circle(
-                screen,
-                cfg.COLOURS["BUSH_OUTLINE"],
-                (int(x), int(y)),
-                int(r + BUSH_OUTLINE_THICKNESS)
-            )
-        # fill
-        for (x, y, r) in b.blob_circles:
-            pygame.draw.circle(
-                screen,
-                cfg.COLOURS["BUSH"],
-                (int(x), int(y)),
-                int(r)
-            )
+        b.update_regen(dt, rng)
 
-    fr = cfg.RESOURCES["FOOD_RADIUS"]
-    rim = cfg.RESOURCES["FOOD_RIM_THICKNESS"]
-
-    for b in bushes:
-        for f in b.food:
-            pygame.draw.circle(
-                screen, cfg.COLOURS["FOOD_RIM"], (int(f.x), int(f.y)), fr + rim)
-            pygame.draw.circle(
-                screen, cfg.COLOURS["FOOD"], (int(f.x), int(f.y)), fr)
 
 # --------------------------
 # COLLISION HELPERS (solid)
@@ -365,12 +643,8 @@ def bounce_off_circle(nx: float, ny: float, vx: float, vy: float,
     return nx, ny, rvx, rvy
 
 
-def pick_food_from_bush(bush: FoodBush) -> bool:
-    if not bush.food:
-        return False
-    idx = random.randrange(len(bush.food))
-    bush.food.pop(idx)
-    return True
+def pick_food_from_bush(bush: FoodBush, rng=None) -> bool:
+    return bush.store.eat_random(bush.index, rng)
 
 
 def touch_circle(x: float, y: float, agent_r: float, circles, eps: float = 2.0):
@@ -0,0 +1,181 @@
+"""
+Zero-copy results channel for worker pools.
+
+Workers write a run's arrays (survival curve, final agent columns, any
+per-tick trace) into one file in a shared directory and hand back only a
+small ResultRef (path + field layout + a meta dict). The parent maps the
+file and reads the arrays in place, so aggregating thousands of runs copies
+nothing through pickle or pipes:
+
+    with ResultChannel() as channel:
+        refs = pool.map(work, [(job, channel) for job in jobs])
+        for ref in refs:
+            with channel.open(ref) as r:
+                total += sum(r["survival_population"])
+
+The directory defaults to /dev/shm (POSIX shared memory, so nothing touches
+disk) with the temp dir as fallback. Files, not one SharedMemory block per
+run: a mapped file needs no open descriptor, so thousands of results can be
+mapped at once, and a channel can be kept on disk for later analysis.
+"""
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+_ALIGN = 8
+_SHM_DIR = "/dev/shm"
+
+
+@dataclass(frozen=True)
+class ResultRef:
+    """Where one run's arrays are: file, (name, typecode, offset, count)s, meta."""
+    path: str
+    fields: Tuple[Tuple[str, str, int, int], ...]
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {"path": self.path,
+                "fields": {name: [code, offset, count]
+                           for name, code, offset, count in self.fields}}
+
+    @classmethod
+    def from_dict(cls, d: dict, meta: Optional[dict] = None) -> "ResultRef":
+        return cls(d["path"], tuple((name, code, offset, count)
+                                    for name, (code, offset, count) in d["fields"].items()),
+                   dict(meta or {}))
+
+
+class RunResult:
+    """A run's arrays as typed memoryviews over the mapped file (read-only)."""
+
+    def __init__(self, ref: ResultRef):
+        self.ref = ref
+        self.meta = ref.meta
+        self._map = None
+        self._views: Dict[str, memoryview] = {}
+        size = os.path.getsize(ref.path)
+        if size:
+            with open(ref.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        raw = memoryview(self._map) if self._map is not None else memoryview(b"")
+        for name, code, offset, count in ref.fields:
+            self._views[name] = raw[offset:offset + count * struct.calcsize(code)].cast(code)
+        raw.release()
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self._views[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._views
+
+    def names(self) -> Iterable[str]:
+        return self._views.keys()
+
+    def numpy(self, name: str):
+        """The array as a numpy view (no copy; needs numpy)."""
+        import numpy as np
+        return np.frombuffer(self._views[name], dtype=self._views[name].format)
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __enter__(self) -> "RunResult":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _as_buffer(values) -> memoryview:
+    """A contiguous typed view of values (array / numpy array / float list)."""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = memoryview(array("d", values))
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes()).cast(view.format)
+    code = view.format.lstrip("@=<")  # native order only, as in the parent
+    if view.ndim != 1 or code != view.format:
+        view = view.cast("B").cast(code)
+    return view
+
+
+class ResultChannel:
+    """
+    A directory of result files shared by a parent and its workers.
+    Picklable (it is just the directory), so it can ride along with jobs.
+    The process that created it removes it on close() unless keep=True.
+    """
+
+    def __init__(self, directory: Optional[str] = None, keep: bool = False):
+        if directory is None:
+            base = _SHM_DIR if os.path.isdir(_SHM_DIR) else None
+            directory = tempfile.mkdtemp(prefix="evosim-results-", dir=base)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keep = keep
+        self._owner = os.getpid()
+
+    def __getstate__(self) -> dict:
+        # no owner: a worker's copy never removes the directory
+        return {"directory": self.directory, "keep": self.keep, "_owner": None}
+
+    # -----------------------------------------------------
+    # worker side
+    # -----------------------------------------------------
+    def write(self, arrays: Mapping[str, Any], meta: Optional[dict] = None,
+              name: Optional[str] = None) -> ResultRef:
+        """
+        Write arrays (name -> array / numpy array / list of floats) to one
+        file, a fresh one or `name` in the channel (replaced atomically).
+        """
+        fd, tmp = tempfile.mkstemp(suffix=".bin", dir=self.directory)
+        path = tmp if name is None else os.path.join(self.directory, name)
+        fields = []
+        offset = 0
+        with os.fdopen(fd, "wb") as f:
+            for key, values in arrays.items():
+                view = _as_buffer(values)
+                pad = -offset % _ALIGN
+                if pad:
+                    f.write(bytes(pad))
+                    offset += pad
+                f.write(view.cast("B"))
+                fields.append((key, view.format, offset, len(view)))
+                offset += view.nbytes
+        if path != tmp:
+            os.replace(tmp, path)
+        return ResultRef(path, tuple(fields), dict(meta or {}))
+
+    # -----------------------------------------------------
+    # parent side
+    # -----------------------------------------------------
+    def open(self, ref: ResultRef) -> RunResult:
+        return RunResult(ref)
+
+    def remove(self, ref: ResultRef) -> None:
+        try:
+            os.remove(ref.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        if not self.keep and self._owner == os.getpid():
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> "ResultChannel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
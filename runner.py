@@ -0,0 +1,154 @@
+"""
+Background simulation runner.
+Steps the world on a worker thread at its own fixed rate (or flat out)
+and publishes double-buffered snapshots that the render loop reads and
+interpolates between, so slow drawing never slows the simulation.
+A snapshot holds copies (AgentView) of what the viewer reads about each
+agent, never the live Agent objects the sim thread keeps changing.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import config as cfg
+import agent as ag
+import world as wd
+
+
+class AgentView:
+    """One agent as the viewer sees it at a snapshot (drawing, state box, trails)."""
+
+    __slots__ = ("id", "x", "y", "colour", "alive", "action", "hunger", "thirst",
+                 "energy", "health", "age", "traits", "food_memory",
+                 "last_water_pos", "last_water_time_ms",
+                 "mate_cooldown", "eat_pause", "occupying")
+
+    def __init__(self, a: ag.Agent):
+        self.id = a.id
+        self.x = a.x
+        self.y = a.y
+        self.colour = a.colour
+        self.alive = a.alive
+        self.action = a.action
+        self.hunger = a.hunger
+        self.thirst = a.thirst
+        self.energy = a.energy
+        self.health = a.health
+        self.age = a.age
+        self.traits = a.traits              # never changed after birth
+        self.food_memory = list(a.food_memory or ())
+        self.last_water_pos = a.last_water_pos
+        self.last_water_time_ms = a.last_water_time_ms
+        # for agent.can_mate (the state box's "ready to mate")
+        self.mate_cooldown = a.mate_cooldown
+        self.eat_pause = a.eat_pause
+        self.occupying = a.occupying        # only ever compared with None
+
+
+@dataclass
+class Snapshot:
+    tick: int
+    sim_time: float
+    wall_time: float                        # time.perf_counter() at publish
+    agents: List[AgentView] = field(default_factory=list)
+    positions: Dict[int, Tuple[float, float]] = field(default_factory=dict)
+
+
+def take_snapshot(world: wd.World) -> Snapshot:
+    agents = [AgentView(a) for a in world.agents]
+    return Snapshot(
+        tick=world.tick,
+        sim_time=world.time,
+        wall_time=time.perf_counter(),
+        agents=agents,
+        positions={a.id: (a.x, a.y) for a in agents},
+    )
+
+
+class SimulationRunner:
+    """
+    Owns the world while running. The render thread must hold `lock` when
+    it touches live world objects (ponds, bushes); agents are read from
+    snapshots instead.
+    """
+
+    def __init__(self, world: wd.World, step_dt: Optional[float] = None,
+                 flat_out: bool = False):
+        self.world = world
+        self.step_dt = step_dt if step_dt is not None else 1.0 / \
+            cfg.SIM["HZ"]
+        self.flat_out = flat_out
+        self.lock = threading.Lock()
+        self.paused = False
+        self.speed: Optional[float] = 1.0   # sim seconds per real second; None = flat out
+
+        # double buffer: render interpolates prev -> curr
+        first = take_snapshot(world)
+        self._buffers = (first, first)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _run(self) -> None:
+        next_step = time.perf_counter()
+        while not self._stop.is_set():
+            if self.paused:
+                time.sleep(0.01)
+                next_step = time.perf_counter()
+                continue
+
+            self.step_once()
+
+            speed = self.speed
+            if self.flat_out or speed is None:
+                # let the render thread grab the GIL now and then
+                time.sleep(0)
+                continue
+
+            next_step += self.step_dt / speed
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # fell behind: don't try to replay the missed time
+                next_step = time.perf_counter()
+
+    def step_once(self) -> None:
+        """One fixed step (also used to single-step while paused)."""
+        with self.lock:
+            wd.step_world(self.world, self.step_dt)
+        self._publish(take_snapshot(self.world))
+
+    def _publish(self, snap: Snapshot) -> None:
+        # one attribute store so readers always see a consistent pair
+        self._buffers = (self._buffers[1], snap)
+
+    def interpolation(self) -> Tuple[Snapshot, Snapshot, float]:
+        """
+        Returns (prev, curr, alpha). Draw each agent at
+        prev + (curr - prev) * alpha; alpha grows from 0 to 1 over one step.
+        """
+        prev, curr = self._buffers
+        interval = curr.wall_time - prev.wall_time
+        if interval <= 0.0:
+            return prev, curr, 1.0
+        alpha = (time.perf_counter() - curr.wall_time) / interval
+        return prev, curr, max(0.0, min(1.0, alpha))
+
+
+def interpolated_position(a: AgentView, prev: Snapshot, curr: Snapshot,
+                          alpha: float) -> Tuple[float, float]:
+    x1, y1 = curr.positions.get(a.id, (a.x, a.y))
+    x0, y0 = prev.positions.get(a.id, (x1, y1))
+    return (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
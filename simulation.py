@@ -1,6 +1,6 @@
 import math
 import random
-import pygame
+from typing import Optional, Tuple
 
 import config as cfg
 import resources as res
@@ -14,6 +14,90 @@ INTERACT_COOLDOWN = 0.8     # seconds after eat/drink before interacting again
 MAX_SPEED = 3.5             # clamp velocity so it can't explode
 BOUNCE_DAMP = 0.92          # damp bounce so energy doesn't grow
 
+# Simulation clock (ms). Memory timestamps use simulated time rather than
+# wall time so runs that step faster or slower than real time stay correct.
+_sim_time_ms = 0
+
+
+def set_time(seconds: float) -> None:
+    """Set the simulation clock (called by the world before each tick)."""
+    global _sim_time_ms
+    _sim_time_ms = int(seconds * 1000)
+
+
+def now_ms() -> int:
+    return _sim_time_ms
+
+
+# Random source for per-tick agent updates: the `random` module unless a
+# world installs its own stream (randstream.RandomStream) before stepping.
+_rng = random
+
+
+def set_rng(rng=None) -> None:
+    """Use rng for agent updates (None restores the `random` module)."""
+    global _rng
+    _rng = random if rng is None else rng
+
+
+# Flow fields toward resources (flowfield.FlowFields), installed by the
+# world each tick; None = steer straight at targets.
+_flow = None
+
+
+def set_flow(flow=None) -> None:
+    global _flow
+    _flow = flow
+
+
+# Grid over bush blobs (resources.index_bushes), installed by the world each
+# tick so per-agent bush lookups only visit nearby bushes; None = scan the
+# bush list.
+_bush_grid = None
+
+
+def set_bush_grid(grid=None) -> None:
+    global _bush_grid
+    _bush_grid = grid
+
+
+def _bushes_near(x: float, y: float, reach: float, bushes: list[res.FoodBush]):
+    """Bushes whose blobs may come within reach of (x, y), in bush order."""
+    if _bush_grid is None:
+        return bushes
+    near = list(_bush_grid.in_radius(x, y, reach))
+    if len(near) > 1:
+        near.sort(key=_bush_order)
+    return near
+
+
+def _bush_order(b: res.FoodBush) -> int:
+    return b.index
+
+
+def _nearest_bush(x: float, y: float, bushes: list[res.FoodBush]) -> res.FoodBush:
+    """Bush whose centre is closest to (x, y) (bushes must not be empty)."""
+    if _bush_grid is None:
+        return min(bushes, key=lambda b: _dist(x, y, b.x, b.y))
+    return _bush_grid.nearest(x, y)
+
+
+def _bush_has_food_at(bx: float, by: float, bushes: list[res.FoodBush]) -> bool:
+    """True if a bush centred within 15 px of a remembered spot has food."""
+    for b in _bushes_near(bx, by, 15.0, bushes):
+        if abs(b.x - bx) < 15 and abs(b.y - by) < 15 and b.food_count > 0:
+            return True
+    return False
+
+
+def _near_any_bush(x: float, y: float, pad: float, bushes: list[res.FoodBush]) -> bool:
+    """True if (x, y) is within pad of any bush blob circle."""
+    for b in _bushes_near(x, y, pad, bushes):
+        for (cx, cy, cr) in b.blob_circles:
+            if _dist(x, y, cx, cy) < (cr + pad):
+                return True
+    return False
+
 
 def _is_memory_expired(timestamp_ms: int, agent_traits: tr.Traits = None) -> bool:
     """Check if a memory entry is older than MEMORY_TIMEOUT (adjusted by traits)."""
@@ -25,7 +109,7 @@ def _is_memory_expired(timestamp_ms: int, agent_traits: tr.Traits = None) -> boo
     effective_timeout = tr.effective_memory_ttl(base_timeout, traits_obj)
     timeout_ms = effective_timeout * 1000
 
-    current_time_ms = pygame.time.get_ticks()
+    current_time_ms = now_ms()
     return (current_time_ms - timestamp_ms) > timeout_ms
 
 
@@ -50,13 +134,32 @@ def _clean_water_memory(a: ag.Agent) -> None:
         a.last_water_time_ms = -1
 
 
-def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBush]) -> bool:
+def update_agent(a: ag.Agent, dt: float, water: res.WaterIndex, bushes: list[res.FoodBush]) -> bool:
     """
     Update one agent for one frame.
     Returns True if agent remains alive, False if dead (caller removes it).
     """
-    ag.update_internal_state(a, dt)
+    status = plan_agent(a, dt, water, bushes)
+    if status is not None:
+        return status
+
+    nx, ny = propose_move(a, dt)
+    return resolve_move(a, nx, ny, water, bushes)
+
+
+def plan_agent(a: ag.Agent, dt: float, water: res.WaterIndex,
+               bushes: list[res.FoodBush]) -> Optional[bool]:
+    """
+    First half of update_agent: stats, timers, frozen states and steering.
+    Returns True/False (alive/dead) if the agent is done for this frame,
+    or None if it still has to move (propose_move + resolve_move).
+    """
+    if cfg.SIM["ANALYTIC_STATS"]:
+        ag.advance_internal_state(a, dt)
+    else:
+        ag.update_internal_state(a, dt)
     if not a.alive:
+        release_slot(a)
         return False
 
     _safe_pos(a)
@@ -66,18 +169,31 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     if getattr(a, "interact_cooldown", 0.0) > 0.0:
         a.interact_cooldown = max(0.0, a.interact_cooldown - dt)
 
+    if a.mate_cooldown > 0.0:
+        a.mate_cooldown = max(0.0, a.mate_cooldown - dt)
+
     if getattr(a, "eat_pause", 0.0) > 0.0:
         a.eat_pause = max(0.0, a.eat_pause - dt)
+        if a.eat_pause <= 0.0:
+            release_slot(a)
         return True
 
+    # ---------------------------------------------------------
+    # QUEUE STATE: wait at a full pond/bush until a slot frees up
+    # ---------------------------------------------------------
+    if a.action == "QUEUE":
+        if _update_queue(a, dt, water, bushes):
+            return True
+
     # ---------------------------------------------------------
     # DRINK STATE: freeze position, sip over time until THIRST_OK
     # ---------------------------------------------------------
     if getattr(a, "action", "WANDER") == "DRINK":
-        touching = res.touch_pond(a.x, a.y, cfg.AGENT_RADIUS, pond, eps=6.0)
+        touching = water.touching(a.x, a.y, cfg.AGENT_RADIUS, eps=6.0)
 
         # Release condition (prevents camping)
         if touching is None or a.thirst <= cfg.THRESHOLDS["THIRST_OK"]:
+            release_slot(a)
             a.action = "WANDER"
             a.drink_timer = 0.0
             a.interact_cooldown = INTERACT_COOLDOWN
@@ -93,8 +209,8 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
             _clamp_speed(a)
 
             # pick a new waypoint away from resources so they move off nicely
-            a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
-            a.waypoint_timer = random.uniform(
+            a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
+            a.waypoint_timer = _rng.uniform(
                 0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
             return True
 
@@ -102,6 +218,7 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
         while a.drink_timer >= cfg.RESOURCES["DRINK_INTERVAL"]:
             a.drink_timer -= cfg.RESOURCES["DRINK_INTERVAL"]
             a.thirst = max(0.0, a.thirst - cfg.RESOURCES["DRINK_AMOUNT"])
+            a.water_sips += 1
 
             # optional simplified energy boost
             if "ENERGY_FROM_DRINK" in cfg.RESOURCES:
@@ -113,33 +230,48 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     # ---------------------------------------------------------
     # SENSING + STEERING
     # ---------------------------------------------------------
-    target = _choose_target(a, pond, bushes)
+    target = _choose_target(a, water, bushes)
 
     if target is None:
-        _wander_steer(a, dt, pond, bushes)
+        _wander_steer(a, dt, water, bushes)
     else:
         tx, ty = target
-        _steer_towards(a, tx, ty)
+        _steer_to_target(a, tx, ty)
 
     _clamp_speed(a)
+    return None
 
-    # ---------------------------------------------------------
-    # PROPOSED MOVE
-    # ---------------------------------------------------------
+
+def propose_move(a: ag.Agent, dt: float) -> Tuple[float, float]:
+    """Position the agent would reach this frame at its current velocity."""
     move_scale = 60.0 * dt
     mult = ag.movement_multiplier(a)
 
     vx, vy = a.velocityX, a.velocityY
     nx = a.x + vx * mult * move_scale
     ny = a.y + vy * mult * move_scale
+    return nx, ny
 
+
+def resolve_move(a: ag.Agent, nx: float, ny: float, water: res.WaterIndex,
+                 bushes: list[res.FoodBush], contact=None) -> bool:
+    """
+    Second half of update_agent: interactions and collisions at the
+    proposed position (nx, ny), then move.
+    contact holds precomputed collision results for (nx, ny) (see
+    collision.StaticCircles); when None they are computed here.
+    """
     # ---------------------------------------------------------
     # WATER MEMORY: Log pond location on any contact
     # ---------------------------------------------------------
-    if res.touch_pond(nx, ny, cfg.AGENT_RADIUS, pond, eps=6.0) is not None:
-        px, py = _pond_center(pond)
+    if contact is None:
+        pond_contact = water.touching(nx, ny, cfg.AGENT_RADIUS, eps=6.0)
+    else:
+        pond_contact = contact.pond_touch
+    if pond_contact is not None:
+        px, py = _pond_center(pond_contact[0])
         a.last_water_pos = (px, py)
-        a.last_water_time_ms = pygame.time.get_ticks()
+        a.last_water_time_ms = now_ms()
 
     # ---------------------------------------------------------
     # START DRINK if thirsty + touching pond rim
@@ -147,8 +279,14 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     if (
         a.interact_cooldown <= 0.0
         and a.thirst >= cfg.THRESHOLDS["THIRST_SEEK"]
-        and res.touch_pond(nx, ny, cfg.AGENT_RADIUS, pond, eps=6.0) is not None
+        and pond_contact is not None
     ):
+        pond = pond_contact[0]
+        if pond.occupants >= cfg.CROWDING["POND_MAX_DRINKERS"]:
+            _start_queue(a, pond)
+            return True  # wait at the rim
+
+        _claim_slot(a, pond)
         a.action = "DRINK"
         a.drink_timer = 0.0
         return True  # freeze this frame
@@ -156,10 +294,7 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     # ---------------------------------------------------------
     # BUSH INTERACTION
     # ---------------------------------------------------------
-    for b in bushes:
-        touching = res.touch_bush(nx, ny, cfg.AGENT_RADIUS, b, eps=4.0)
-        if touching is None:
-            continue
+    for b, touching, hit in _bush_contacts(nx, ny, bushes, contact):
 
         # LOG BUSH IN MEMORY (discovery or update)
         if touching is not None:
@@ -171,13 +306,19 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
                 for mem in a.food_memory
             )
             if not already_remembered:
-                a.food_memory.append((b.x, b.y, pygame.time.get_ticks()))
+                a.food_memory.append((b.x, b.y, now_ms()))
 
         # TRY EAT: only if hungry, cooldown ready, and food exists
-        if a.interact_cooldown <= 0.0 and a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and len(b.food) > 0:
-            ate = res.pick_food_from_bush(b)
+        if a.interact_cooldown <= 0.0 and a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and b.food_count > 0:
+            if b.occupants >= cfg.CROWDING["BUSH_MAX_EATERS"]:
+                _start_queue(a, b)
+                return True  # wait at the bush edge
+
+            ate = res.pick_food_from_bush(b, _rng)
             if ate:
+                _claim_slot(a, b)
                 a.hunger = max(0.0, a.hunger - cfg.RESOURCES["EAT_AMOUNT"])
+                a.food_eaten += 1
                 if "ENERGY_FROM_EAT" in cfg.RESOURCES:
                     a.energy = min(100.0, a.energy +
                                    cfg.RESOURCES["ENERGY_FROM_EAT"])
@@ -197,25 +338,24 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
 
         # ALWAYS BOUNCE (prevent camping)
         # NOTE: set cooldown and force waypoint to prevent re-engagement with empty bushes
-        hit = res.collide_with_bush(nx, ny, cfg.AGENT_RADIUS, b)
         if hit is not None:
             _apply_bounce(a, hit)
 
             # If bush is empty: force them away with a longer cooldown
-            if len(b.food) == 0:
+            if b.food_count == 0:
                 # Long cooldown to force them to wander away
                 a.interact_cooldown = max(a.interact_cooldown, 2.0)
-                a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
+                a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
                 a.waypoint_timer = 0.0
-            elif a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and len(b.food) == 0:
+            elif a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and b.food_count == 0:
                 # Tried to eat but no food - set cooldown to avoid spam
                 a.interact_cooldown = max(
                     a.interact_cooldown, INTERACT_COOLDOWN)
-                a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
+                a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
                 a.waypoint_timer = 0.0
             else:
                 # Bush has food - short cooldown for natural spacing
-                a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
+                a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
                 a.waypoint_timer = 0.0
 
             return True
@@ -224,42 +364,47 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     # SOLID POND COLLISION (when not drinking)
     # ---------------------------------------------------------
     if a.action != "DRINK":
+        if contact is None:
+            pond_hit = water.colliding(nx, ny, cfg.AGENT_RADIUS)
+        else:
+            pond_hit = contact.pond_hit
+
         # NOT THIRSTY: bounce away immediately
         if a.thirst < cfg.THRESHOLDS["THIRST_SEEK"]:
-            hit = res.collide_with_pond(nx, ny, cfg.AGENT_RADIUS, pond)
+            hit = pond_hit
             if hit is not None:
                 _apply_bounce(a, hit)
                 if a.action == "WANDER":
                     a.waypoint = _random_waypoint_avoiding_resources(
-                        pond, bushes)
+                        water, bushes)
                     a.waypoint_timer = 0.0
                 return True
 
         # Otherwise handle normal collision
-        hit = res.collide_with_pond(nx, ny, cfg.AGENT_RADIUS, pond)
+        hit = pond_hit
         if hit is not None:
             _apply_bounce(a, hit)
 
             if a.action == "WANDER":
-                a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
+                a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
                 a.waypoint_timer = 0.0
             return True
 
     # ---------------------------------------------------------
-    # SCREEN BOUNDS
+    # WORLD BOUNDS
     # ---------------------------------------------------------
     if nx < cfg.AGENT_RADIUS:
         nx = cfg.AGENT_RADIUS
         a.velocityX *= -1
-    elif nx > cfg.WIDTH - cfg.AGENT_RADIUS:
-        nx = cfg.WIDTH - cfg.AGENT_RADIUS
+    elif nx > cfg.WORLD_WIDTH - cfg.AGENT_RADIUS:
+        nx = cfg.WORLD_WIDTH - cfg.AGENT_RADIUS
         a.velocityX *= -1
 
     if ny < cfg.AGENT_RADIUS:
         ny = cfg.AGENT_RADIUS
         a.velocityY *= -1
-    elif ny > cfg.HEIGHT - cfg.AGENT_RADIUS:
-        ny = cfg.HEIGHT - cfg.AGENT_RADIUS
+    elif ny > cfg.WORLD_HEIGHT - cfg.AGENT_RADIUS:
+        ny = cfg.WORLD_HEIGHT - cfg.AGENT_RADIUS
         a.velocityY *= -1
 
     a.x, a.y = nx, ny
@@ -269,19 +414,144 @@ def update_agent(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBu
     return True
 
 
+def _bush_contacts(nx: float, ny: float, bushes: list[res.FoodBush], contact):
+    """
+    Yields (bush, touching, collision hit) for bushes in contact range of
+    (nx, ny), in bush order.
+    """
+    start = 0
+    if contact is not None:
+        if contact.bush is None:
+            return
+        yield contact.bush, contact.bush_touch, contact.bush_hit
+        # rare: touching but not overlapping the first bush, keep scanning
+        start = contact.bush_index + 1
+
+    for b in _bushes_near(nx, ny, cfg.AGENT_RADIUS + 4.0, bushes):
+        if b.index < start:
+            continue
+        touching = res.touch_bush(nx, ny, cfg.AGENT_RADIUS, b, eps=4.0)
+        if touching is None:
+            continue
+        yield b, touching, res.collide_with_bush(nx, ny, cfg.AGENT_RADIUS, b)
+
+
+# =========================================================
+# CROWDING: resource slots, queueing and separation
+# =========================================================
+
+def _claim_slot(a: ag.Agent, resource) -> None:
+    release_slot(a)
+    resource.occupants += 1
+    a.occupying = resource
+
+
+def release_slot(a: ag.Agent) -> None:
+    """Give back the pond/bush slot held by the agent, if any."""
+    if a.occupying is not None:
+        a.occupying.occupants = max(0, a.occupying.occupants - 1)
+        a.occupying = None
+
+
+def _start_queue(a: ag.Agent, resource) -> None:
+    a.action = "QUEUE"
+    a.queue_for = resource
+    a.queue_timer = 0.0
+
+
+def _update_queue(a: ag.Agent, dt: float, water: res.WaterIndex,
+                  bushes: list[res.FoodBush]) -> bool:
+    """
+    Hold position until the resource has room.
+    Returns True while the agent stays frozen this frame.
+    """
+    resource = a.queue_for
+    a.queue_timer += dt
+
+    if isinstance(resource, res.Pond):
+        limit = cfg.CROWDING["POND_MAX_DRINKERS"]
+        still_needed = a.thirst >= cfg.THRESHOLDS["THIRST_OK"]
+    else:
+        limit = cfg.CROWDING["BUSH_MAX_EATERS"]
+        still_needed = a.hunger >= cfg.THRESHOLDS["HUNGER_SEEK"] and resource.food_count > 0
+
+    if still_needed and resource.occupants < limit:
+        a.queue_for = None
+        if isinstance(resource, res.Pond):
+            # queued at a step that was never taken: walk up to the rim first
+            touching = water.touching(a.x, a.y, cfg.AGENT_RADIUS, eps=6.0)
+            if touching is None or touching[0] is not resource:
+                a.action = "WANDER"
+                return True
+            _claim_slot(a, resource)
+            a.action = "DRINK"
+            a.drink_timer = 0.0
+            return True
+        # bush: resume normal behaviour; it is touching and will eat next frame
+        a.action = "WANDER"
+        return True
+
+    if not still_needed or a.queue_timer >= cfg.CROWDING["QUEUE_TIMEOUT"]:
+        # give up and wander off
+        a.queue_for = None
+        a.action = "WANDER"
+        a.interact_cooldown = max(a.interact_cooldown, INTERACT_COOLDOWN)
+        a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
+        a.waypoint_timer = 0.0
+        return False
+
+    return True
+
+
+def apply_separation(a: ag.Agent, grid) -> None:
+    """
+    Boids-style separation: steer away from agents closer than
+    SEPARATION_RADIUS. Only neighbours in adjacent grid cells are inspected.
+    Frozen agents (drinking, queueing, eating) are not pushed.
+    """
+    if a.action != "WANDER" or a.eat_pause > 0.0:
+        return
+
+    radius = cfg.CROWDING["SEPARATION_RADIUS"]
+    sx = 0.0
+    sy = 0.0
+    for b in grid.neighbors(a.x, a.y, radius):
+        if b is a:
+            continue
+        dx = a.x - b.x
+        dy = a.y - b.y
+        d = math.hypot(dx, dy)
+        if d < 1e-6:
+            angle = _rng.uniform(0, 6.28318)
+            sx += math.cos(angle)
+            sy += math.sin(angle)
+            continue
+        # stronger the closer they are (1 at contact, 0 at radius)
+        w = (radius - d) / radius
+        sx += dx / d * w
+        sy += dy / d * w
+
+    if sx or sy:
+        strength = cfg.CROWDING["SEPARATION_STRENGTH"]
+        a.velocityX += sx * strength
+        a.velocityY += sy * strength
+
+
 # =========================================================
 # SENSING: pick target (thirst > hunger)
 # =========================================================
 
-def _choose_target(a: ag.Agent, pond: res.Pond, bushes: list[res.FoodBush]):
+def _choose_target(a: ag.Agent, water: res.WaterIndex, bushes: list[res.FoodBush]):
     base_vision = getattr(a, "vision_radius", cfg.SENSING["VISION_RADIUS"])
     traits_obj = getattr(a, "traits", None) or tr.Traits()
     vision = tr.effective_vision(base_vision, traits_obj)
 
-    # Check what's available in vision
+    # Check what's available in vision (nearest pond only)
     pond_visible = False
-    pcx, pcy = _pond_center(pond)
-    if _dist(a.x, a.y, pcx, pcy) <= vision:
+    pcx, pcy = 0.0, 0.0
+    pond = water.nearest(a.x, a.y, vision)
+    if pond is not None:
+        pcx, pcy = _pond_center(pond)
         pond_visible = True
 
     food_visible = None
@@ -308,7 +578,7 @@ def _choose_target(a: ag.Agent, pond: res.Pond, bushes: list[res.FoodBush]):
         # Haven't found food yet - go to any visible bush
         if bushes:
             # Target nearest bush (even if empty, just to discover)
-            nearest_bush = min(bushes, key=lambda b: _dist(a.x, a.y, b.x, b.y))
+            nearest_bush = _nearest_bush(a.x, a.y, bushes)
             return (nearest_bush.x, nearest_bush.y)
         # Otherwise wander
 
@@ -323,7 +593,7 @@ def _choose_target(a: ag.Agent, pond: res.Pond, bushes: list[res.FoodBush]):
         if dist_to_home > a.home_region_radius:
             # Outside home region - generate waypoint within home region
             return _random_waypoint_in_home_region(a.home_pos[0], a.home_pos[1],
-                                                   a.home_region_radius, pond, bushes)
+                                                   a.home_region_radius, water, bushes)
         else:
             # Inside home region - wander normally (return None lets normal wandering happen)
             return None
@@ -370,49 +640,32 @@ def _choose_target(a: ag.Agent, pond: res.Pond, bushes: list[res.FoodBush]):
             # Find first bush that has food
             for bx, by, _ in sorted_bushes:
                 # Check if any bush at this location has food
-                for b in bushes:
-                    if abs(b.x - bx) < 15 and abs(b.y - by) < 15 and len(b.food) > 0:
-                        return (bx, by)
+                if _bush_has_food_at(bx, by, bushes):
+                    return (bx, by)
             # If no bush in memory has food, just wander
             return None
         elif food_memory:
             # No water memory but have food memory - target nearest with food
             for bx, by, _ in food_memory:
-                for b in bushes:
-                    if abs(b.x - bx) < 15 and abs(b.y - by) < 15 and len(b.food) > 0:
-                        return (bx, by)
+                if _bush_has_food_at(bx, by, bushes):
+                    return (bx, by)
             return None
 
     return None
 
 
 def _pond_center(pond: res.Pond):
-    circles = pond.circles  # list of (x,y,r)
-    sx = 0.0
-    sy = 0.0
-    n = len(circles)
-    for (x, y, _r) in circles:
-        sx += x
-        sy += y
-    return (sx / max(1, n), sy / max(1, n))
+    # centroid is cached on the pond at creation
+    return (pond.cx, pond.cy)
 
 
 def _nearest_food_in_vision(a: ag.Agent, bushes: list[res.FoodBush], vision: float):
-    best = None
-    best_d2 = None
-    v2 = vision * vision
-
-    for b in bushes:
-        for f in getattr(b, "food", []):
-            dx = f.x - a.x
-            dy = f.y - a.y
-            d2 = dx * dx + dy * dy
-            if d2 <= v2:
-                if best is None or d2 < best_d2:
-                    best = (f.x, f.y)
-                    best_d2 = d2
-
-    return best
+    # all bushes share one world FoodStore
+    store = bushes[0].store
+    if _bush_grid is None:
+        return store.nearest(a.x, a.y, vision)
+    near = _bushes_near(a.x, a.y, vision, bushes)
+    return store.nearest(a.x, a.y, vision, [b.index for b in near]) if near else None
 
 
 # =========================================================
@@ -436,15 +689,25 @@ def _steer_towards(a: ag.Agent, tx: float, ty: float):
     a.velocityY = (1 - steer) * a.velocityY + steer * uy
 
 
+def _steer_to_target(a: ag.Agent, tx: float, ty: float):
+    """Steer toward a target, routed around blobs if it is a pond or bush."""
+    if _flow is not None:
+        step = _flow.direction_to(tx, ty, a.x, a.y)
+        if step is not None:
+            _steer_towards(a, a.x + step[0], a.y + step[1])
+            return
+    _steer_towards(a, tx, ty)
+
+
 # =========================================================
 # WAYPOINT WANDERING (Option B)
 # =========================================================
 
-def _wander_steer(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodBush]):
+def _wander_steer(a: ag.Agent, dt: float, water: res.WaterIndex, bushes: list[res.FoodBush]):
     # init if missing or invalid
     if getattr(a, "waypoint", None) is None:
-        a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
-        a.waypoint_timer = random.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
+        a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
+        a.waypoint_timer = _rng.uniform(0.0, cfg.SENSING["WAYPOINT_TIMEOUT"])
 
     a.waypoint_timer += dt
 
@@ -452,9 +715,11 @@ def _wander_steer(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodB
     reached_dist = cfg.SENSING["WAYPOINT_REACHED"]
     dist_to_wp = _dist(a.x, a.y, wx, wy)
 
-    timeout = cfg.SENSING["WAYPOINT_TIMEOUT"] * random.uniform(0.85, 1.25)
+    # uniform() written out: this runs every tick for every wanderer
+    rnd = _rng.random
+    timeout = cfg.SENSING["WAYPOINT_TIMEOUT"] * (0.85 + 0.4 * rnd())
     if dist_to_wp <= reached_dist or a.waypoint_timer >= timeout:
-        a.waypoint = _random_waypoint_avoiding_resources(pond, bushes)
+        a.waypoint = _random_waypoint_avoiding_resources(water, bushes)
         a.waypoint_timer = 0.0
         wx, wy = a.waypoint
 
@@ -462,85 +727,52 @@ def _wander_steer(a: ag.Agent, dt: float, pond: res.Pond, bushes: list[res.FoodB
 
     # tiny noise so wandering isn't robotic / synchronized
     j = cfg.SENSING["WANDER_JITTER"]
-    a.velocityX += random.uniform(-j, j) * 0.05
-    a.velocityY += random.uniform(-j, j) * 0.05
+    a.velocityX += (-j + 2.0 * j * rnd()) * 0.05
+    a.velocityY += (-j + 2.0 * j * rnd()) * 0.05
 
 
 def _random_waypoint_in_home_region(home_x: float, home_y: float,
                                     region_radius: float,
-                                    pond: res.Pond, bushes: list[res.FoodBush]):
+                                    water: res.WaterIndex, bushes: list[res.FoodBush]):
     """Generate a random waypoint within the home region."""
     avoid_pad = 60.0
 
     for _ in range(100):
         # Random point within home region
-        angle = random.uniform(0, 6.28318)
-        distance = random.uniform(0, region_radius)
+        angle = _rng.uniform(0, 6.28318)
+        distance = _rng.uniform(0, region_radius)
         x = home_x + math.cos(angle) * distance
         y = home_y + math.sin(angle) * distance
 
-        # Clamp to screen bounds
+        # Clamp to world bounds
         m = cfg.SENSING["WAYPOINT_MARGIN"]
-        x = max(m, min(cfg.WIDTH - m, x))
-        y = max(m, min(cfg.HEIGHT - m, y))
-
-        # avoid pond blobs
-        bad = False
-        for (cx, cy, cr) in pond.circles:
-            if _dist(x, y, cx, cy) < (cr + avoid_pad):
-                bad = True
-                break
-        if bad:
-            continue
-
-        # avoid bush blobs
-        for b in bushes:
-            for (cx, cy, cr) in b.blob_circles:
-                if _dist(x, y, cx, cy) < (cr + avoid_pad):
-                    bad = True
-                    break
-            if bad:
-                break
+        x = max(m, min(cfg.WORLD_WIDTH - m, x))
+        y = max(m, min(cfg.WORLD_HEIGHT - m, y))
 
-        if not bad:
-            return (x, y)
+        # avoid pond and bush blobs
+        if water.near_any(x, y, avoid_pad) or _near_any_bush(x, y, avoid_pad, bushes):
+            continue
+        return (x, y)
 
     # Fallback: just return home center if can't find valid waypoint
     return (home_x, home_y)
 
 
-def _random_waypoint_avoiding_resources(pond: res.Pond, bushes: list[res.FoodBush]):
+def _random_waypoint_avoiding_resources(water: res.WaterIndex, bushes: list[res.FoodBush]):
     m = cfg.SENSING["WAYPOINT_MARGIN"]
     avoid_pad = 60.0  # how far away from pond/bush blobs the waypoint must be
 
     for _ in range(160):
-        x = random.uniform(m, cfg.WIDTH - m)
-        y = random.uniform(m, cfg.HEIGHT - m)
-
-        # avoid pond blobs
-        bad = False
-        for (cx, cy, cr) in pond.circles:
-            if _dist(x, y, cx, cy) < (cr + avoid_pad):
-                bad = True
-                break
-        if bad:
-            continue
+        x = _rng.uniform(m, cfg.WORLD_WIDTH - m)
+        y = _rng.uniform(m, cfg.WORLD_HEIGHT - m)
 
-        # avoid bush blobs
-        for b in bushes:
-            for (cx, cy, cr) in b.blob_circles:
-                if _dist(x, y, cx, cy) < (cr + avoid_pad):
-                    bad = True
-                    break
-            if bad:
-                break
-        if bad:
+        # avoid pond and bush blobs
+        if water.near_any(x, y, avoid_pad) or _near_any_bush(x, y, avoid_pad, bushes):
             continue
-
         return (x, y)
 
     # fallback
-    return (random.uniform(m, cfg.WIDTH - m), random.uniform(m, cfg.HEIGHT - m))
+    return (_rng.uniform(m, cfg.WORLD_WIDTH - m), _rng.uniform(m, cfg.WORLD_HEIGHT - m))
 
 
 # =========================================================
@@ -566,7 +798,7 @@ def _apply_bounce(a: ag.Agent, hit_tuple) -> None:
         a.velocityY += away_y * push_strength
     else:
         # Agent is at collision center - pick random direction away
-        angle = random.uniform(0, 6.28318)
+        angle = _rng.uniform(0, 6.28318)
         a.velocityX = math.cos(angle) * 6.0
         a.velocityY = math.sin(angle) * 6.0
 
@@ -575,21 +807,21 @@ def _apply_bounce(a: ag.Agent, hit_tuple) -> None:
 
 
 def _nudge_velocity(a: ag.Agent) -> None:
-    a.velocityX += random.choice([-1, 1]) * 0.6
-    a.velocityY += random.choice([-1, 1]) * 0.6
+    a.velocityX += _rng.choice([-1, 1]) * 0.6
+    a.velocityY += _rng.choice([-1, 1]) * 0.6
 
 
 def _clamp_speed(a: ag.Agent) -> None:
     vx, vy = a.velocityX, a.velocityY
     if not (math.isfinite(vx) and math.isfinite(vy)):
-        a.velocityX = random.choice([-1.2, -1.0, 1.0, 1.2])
-        a.velocityY = random.choice([-1.2, -1.0, 1.0, 1.2])
+        a.velocityX = _rng.choice([-1.2, -1.0, 1.0, 1.2])
+        a.velocityY = _rng.choice([-1.2, -1.0, 1.0, 1.2])
         return
 
     speed = math.hypot(vx, vy)
     if speed < 1e-6:
-        a.velocityX = random.choice([-1.0, 1.0])
-        a.velocityY = random.choice([-1.0, 1.0])
+        a.velocityX = _rng.choice([-1.0, 1.0])
+        a.velocityY = _rng.choice([-1.0, 1.0])
         return
 
     # Apply speed trait multiplier
@@ -604,8 +836,8 @@ def _clamp_speed(a: ag.Agent) -> None:
 
 def _safe_pos(a: ag.Agent) -> None:
     if not (math.isfinite(a.x) and math.isfinite(a.y)):
-        a.x = random.uniform(cfg.AGENT_RADIUS, cfg.WIDTH - cfg.AGENT_RADIUS)
-        a.y = random.uniform(cfg.AGENT_RADIUS, cfg.HEIGHT - cfg.AGENT_RADIUS)
+        a.x = _rng.uniform(cfg.AGENT_RADIUS, cfg.WORLD_WIDTH - cfg.AGENT_RADIUS)
+        a.y = _rng.uniform(cfg.AGENT_RADIUS, cfg.WORLD_HEIGHT - cfg.AGENT_RADIUS)
         _nudge_velocity(a)
 
 
@@ -0,0 +1,91 @@
+"""
+Spatial indexing helpers.
+Uniform grids bucketing things by position so queries only look at
+nearby cells instead of every object in the world.
+"""
+from typing import Dict, Iterator, List, Tuple, TypeVar, Generic
+
+T = TypeVar("T")
+
+Cell = Tuple[int, int]
+
+
+class StaticGrid(Generic[T]):
+    """
+    Grid for static objects with an axis-aligned bounding box.
+    Each item is stored in every cell its (padded) box overlaps, so a point
+    query is a single dictionary lookup.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, List[T]] = {}
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, item: T, bounds: Tuple[float, float, float, float], pad: float = 0.0) -> None:
+        """bounds = (x0, y0, x1, y1) in world coordinates."""
+        x0, y0, x1, y1 = bounds
+        cx0, cy0 = self._cell(x0 - pad, y0 - pad)
+        cx1, cy1 = self._cell(x1 + pad, y1 + pad)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def at(self, x: float, y: float) -> List[T]:
+        """Items whose padded box may contain (x, y)."""
+        return self.cells.get(self._cell(x, y), [])
+
+    def in_radius(self, x: float, y: float, radius: float) -> Iterator[T]:
+        """Unique items in any cell overlapping the square around (x, y)."""
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        seen = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                for item in self.cells.get((cx, cy), ()):
+                    if id(item) not in seen:
+                        seen.add(id(item))
+                        yield item
+
+
+class AgentGrid:
+    """
+    Grid of moving points (agents), rebuilt from scratch once per tick.
+    Neighbour queries only visit the cells overlapping the query radius.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cells: Dict[Cell, list] = {}
+
+    def rebuild(self, agents: list) -> None:
+        cs = self.cell_size
+        cells: Dict[Cell, list] = {}
+        for a in agents:
+            key = (int(a.x // cs), int(a.y // cs))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [a]
+            else:
+                bucket.append(a)
+        self.cells = cells
+
+    def neighbors(self, x: float, y: float, radius: float) -> Iterator:
+        """Agents within radius of (x, y) (including one at exactly (x, y))."""
+        cs = self.cell_size
+        r2 = radius * radius
+        cx0, cy0 = int((x - radius) // cs), int((y - radius) // cs)
+        cx1, cy1 = int((x + radius) // cs), int((y + radius) // cs)
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for a in bucket:
+                    dx = a.x - x
+                    dy = a.y - y
+                    if dx * dx + dy * dy <= r2:
+                        yield a
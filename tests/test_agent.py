@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+import agent as ag
+import config as cfg
+from randstream import RandomStream
+
+
+def _agent(seed: int) -> ag.Agent:
+    return ag.create_agent(0, cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT, cfg.AGENT_RADIUS,
+                           RandomStream(seed))
+
+
+def _euler(a: ag.Agent, duration: float, dt: float = 1e-3) -> float:
+    t = 0.0
+    while a.alive and t < duration - 1e-12:
+        ag.update_internal_state(a, dt)
+        t += dt
+    return t
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_advance_matches_fine_euler(seed):
+    exact = _agent(seed)
+    stepped = copy.deepcopy(exact)
+    assert ag.advance_internal_state(exact, 30.0) == pytest.approx(30.0)
+    _euler(stepped, 30.0)
+    for name in ("hunger", "thirst", "energy", "health", "age"):
+        assert getattr(exact, name) == pytest.approx(getattr(stepped, name), abs=0.05)
+    assert exact.alive == stepped.alive
+
+
+def test_advance_stops_at_death():
+    exact = _agent(7)
+    exact.hunger = exact.thirst = 100.0
+    exact.energy = 0.0
+    exact.health = 5.0
+    stepped = copy.deepcopy(exact)
+    lived = ag.advance_internal_state(exact, 60.0)
+    assert not exact.alive
+    assert lived < 60.0
+    assert lived == pytest.approx(_euler(stepped, 60.0), abs=0.01)
+    assert not stepped.alive
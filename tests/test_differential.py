@@ -0,0 +1,35 @@
+import differential as diff
+
+
+def test_scalar_matches_reference_exactly():
+    result = diff.run_differential(diff.engine_named("scalar"), ticks=300,
+                                   num_agents=30, seed=1, tol=0.0)
+    assert result.divergence is None, diff.format_result(result)
+    assert result.compared > 0
+
+
+def test_wake_matches_reference():
+    # long enough for agents to eat and drink, so some are parked
+    result = diff.run_differential(diff.engine_named("wake"), ticks=1500,
+                                   num_agents=30, seed=1)
+    assert result.divergence is None, diff.format_result(result)
+    assert result.deferred > 0
+
+
+def test_lod_is_compared_statistically():
+    assert not diff.engine_named("lod").exact
+
+
+def test_lod_matches_reference_statistically():
+    result = diff.run_statistical(diff.engine_named("lod"), ticks=600,
+                                  num_agents=30, seeds=range(4),
+                                  scenario=diff.settle)
+    assert sum(result.candidate["deferred"]) > 0
+    assert not result.failed, diff.format_stat_result(result)
+
+
+def test_settled_scenario_keeps_scalar_exact():
+    result = diff.run_differential(diff.engine_named("scalar"), ticks=300,
+                                   num_agents=30, seed=1, tol=0.0,
+                                   scenario=diff.settle)
+    assert result.divergence is None, diff.format_result(result)
@@ -0,0 +1,45 @@
+import pytest
+
+import agent as ag
+import config as cfg
+import lod
+
+
+class _Nothing:
+    """No pond or bush anywhere."""
+
+    def nearest(self, x, y, radius):
+        return None
+
+    def in_radius(self, x, y, radius):
+        return []
+
+
+def _comfortable() -> ag.Agent:
+    a = ag.Agent(id=0, x=500.0, y=500.0, velocityX=1.0, velocityY=0.0,
+                 colour=(0, 0, 0), food_memory=[])
+    a.home_pos = (a.x, a.y)
+    a.age = 1.0  # too young to mate
+    return a
+
+
+def test_comfortable_agent_is_idle():
+    assert lod.is_idle(_comfortable(), _Nothing(), _Nothing())
+
+
+@pytest.mark.parametrize("stat, value", [
+    ("hunger", cfg.THRESHOLDS["HUNGER_SEEK"] + 5.0),
+    ("thirst", cfg.THRESHOLDS["THIRST_SEEK"] + 5.0),
+    ("energy", cfg.THRESHOLDS["ENERGY_SLOW"] - 5.0),
+])
+def test_stat_past_threshold_is_not_idle(stat, value):
+    a = _comfortable()
+    setattr(a, stat, value)
+    assert a.action == "WANDER"
+    assert not lod.is_idle(a, _Nothing(), _Nothing())
+
+
+def test_stat_near_threshold_is_not_idle():
+    a = _comfortable()
+    a.hunger = cfg.THRESHOLDS["HUNGER_SEEK"] - 1e-3
+    assert not lod.is_idle(a, _Nothing(), _Nothing())
@@ -0,0 +1,31 @@
+import math
+
+import pytest
+
+import resources as res
+from headless import config_overlay
+from randstream import RandomStream
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_bush_grid_nearest_matches_scan(seed):
+    with config_overlay({"WORLD_WIDTH": 4000, "WORLD_HEIGHT": 3000,
+                         "RESOURCES.NUM_BUSHES": 25, "RESOURCES.NUM_PONDS": 3}):
+        rng = RandomStream(seed)
+        water = res.create_water(rng)
+        bushes = res.create_bushes(water, res.FoodStore(), rng)
+        grid = res.index_bushes(bushes)
+        for _ in range(500):
+            x, y = rng.uniform(0, 4000), rng.uniform(0, 3000)
+            expected = min(bushes, key=lambda b: math.hypot(b.x - x, b.y - y))
+            assert grid.nearest(x, y) is expected
+
+
+def test_food_nearest_over_some_bushes():
+    rng = RandomStream(1)
+    water = res.create_water(rng)
+    store = res.FoodStore()
+    bushes = res.create_bushes(water, store, rng)
+    b = bushes[0]
+    assert store.nearest(b.x, b.y, 200.0, [b.index]) == store.nearest(b.x, b.y, 200.0)
+    assert store.nearest(b.x, b.y, 200.0, []) is None
@@ -0,0 +1,39 @@
+import os
+import pickle
+from array import array
+
+from resultchannel import ResultChannel, ResultRef
+
+
+def test_round_trip(tmp_path):
+    channel = ResultChannel(str(tmp_path / "results"), keep=True)
+    floats = array("d", [0.5, 1.5, -2.0])
+    ints = array("q", [1, 2, 3, 4, 5])
+    ref = channel.write({"floats": floats, "ints": ints, "listed": [1.0, 2.0]},
+                        meta={"seed": 3})
+    with channel.open(ref) as r:
+        assert sorted(r.names()) == ["floats", "ints", "listed"]
+        assert r["floats"].tolist() == floats.tolist()
+        assert r["ints"].tolist() == ints.tolist()
+        assert r["listed"].tolist() == [1.0, 2.0]
+        assert r.meta == {"seed": 3}
+
+    again = ResultRef.from_dict(ref.to_dict(), ref.meta)
+    with channel.open(again) as r:
+        assert r["ints"].format == "q"
+        assert r["ints"].tolist() == ints.tolist()
+
+    channel.remove(ref)
+    assert not os.path.exists(ref.path)
+
+
+def test_owner_removes_directory_and_workers_do_not(tmp_path):
+    path = str(tmp_path / "results")
+    channel = ResultChannel(path)
+    worker = pickle.loads(pickle.dumps(channel))
+    assert worker.keep is False
+    worker.write({"x": [1.0]})
+    worker.close()
+    assert os.path.isdir(path)
+    channel.close()
+    assert not os.path.exists(path)
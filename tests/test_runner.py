@@ -0,0 +1,22 @@
+import agent as ag
+import runner as rn
+import world as wd
+
+
+def test_snapshot_is_not_changed_by_later_steps():
+    world = wd.create_world(20, seed=4)
+    snap = rn.take_snapshot(world)
+    before = [(v.id, v.x, v.y, v.hunger, v.age, v.action) for v in snap.agents]
+    for _ in range(30):
+        wd.step_world(world, 1.0 / 60.0)
+    assert [(v.id, v.x, v.y, v.hunger, v.age, v.action) for v in snap.agents] == before
+    assert all(not isinstance(v, ag.Agent) for v in snap.agents)
+    assert snap.positions == {v.id: (v.x, v.y) for v in snap.agents}
+
+
+def test_view_answers_can_mate_like_the_agent():
+    world = wd.create_world(20, seed=4)
+    for a in world.agents:
+        a.age = 1000.0
+    for a in world.agents:
+        assert ag.can_mate(rn.AgentView(a)) == ag.can_mate(a)
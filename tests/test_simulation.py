@@ -0,0 +1,28 @@
+import agent as ag
+import config as cfg
+import resources as res
+import simulation as sim
+
+
+def _queued(x: float, pond: res.Pond) -> ag.Agent:
+    a = ag.Agent(id=0, x=x, y=500.0, velocityX=0.0, velocityY=0.0,
+                 colour=(0, 0, 0), food_memory=[])
+    a.thirst = 90.0
+    a.action = "QUEUE"
+    a.queue_for = pond
+    return a
+
+
+def test_queue_drinks_only_at_the_rim():
+    pond = res.Pond(circles=[(500.0, 500.0, 50.0)], sparkles=[])
+    water = res.WaterIndex([pond])
+
+    away = _queued(500.0 + 50.0 + cfg.AGENT_RADIUS + 40.0, pond)
+    assert sim._update_queue(away, 0.1, water, [])
+    assert away.action == "WANDER"
+    assert away.occupying is None and pond.occupants == 0
+
+    rim = _queued(500.0 + 50.0 + cfg.AGENT_RADIUS + 1.0, pond)
+    assert sim._update_queue(rim, 0.1, water, [])
+    assert rim.action == "DRINK"
+    assert rim.occupying is pond and pond.occupants == 1
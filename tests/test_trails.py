@@ -0,0 +1,39 @@
+import csv
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from trails import Trail  # noqa: E402
+
+
+def test_ring_wraps_oldest_first(tmp_path):
+    agent = SimpleNamespace(id=9, x=0.0, y=0.0, alive=True)
+    trail = Trail(length=4, interval=1.0)
+    trail.follow(agent)
+    for t in range(6):
+        agent.x, agent.y = float(t), float(-t)
+        trail.record(float(t))
+        trail.record(t + 0.5)  # within the interval: not sampled
+    assert trail.count == 4
+    assert trail.head == 6 % 4
+    assert list(trail.samples()) == [(float(t), float(t), float(-t)) for t in range(2, 6)]
+
+    path = tmp_path / "trail.csv"
+    trail.export(str(path))
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["agent_id", "t", "x", "y"]
+    assert [float(r[1]) for r in rows[1:]] == [2.0, 3.0, 4.0, 5.0]
+    assert {r[0] for r in rows[1:]} == {"9"}
+
+
+def test_follow_resets():
+    agent = SimpleNamespace(id=1, x=1.0, y=2.0, alive=True)
+    trail = Trail(length=3, interval=0.0)
+    trail.follow(agent)
+    trail.record(0.0)
+    trail.follow(agent)
+    assert trail.count == 0
+    assert list(trail.samples()) == []
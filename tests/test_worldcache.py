@@ -0,0 +1,63 @@
+import os
+from array import array
+
+import pytest
+
+import world as wd
+import worldcache
+from flowfield import FlowFields
+from headless import config_overlay
+
+
+def _state(world: wd.World):
+    return ([p.circles for p in world.water.ponds],
+            [(b.x, b.y, b.capacity) for b in world.bushes],
+            [sorted(world.food.positions(b.index)) for b in world.bushes],
+            world.rng.getstate(),
+            [(a.id, a.x, a.y, a.velocityX, a.velocityY) for a in world.agents])
+
+
+def _run(world: wd.World, ticks: int = 200):
+    for _ in range(ticks):
+        wd.step_world(world, 1.0 / 60.0)
+    return [(a.id, a.x, a.y, a.health) for a in world.agents]
+
+
+def test_hit_matches_miss_and_uncached(tmp_path, monkeypatch):
+    uncached = wd.create_world(20, seed=5)
+    with config_overlay({"WORLD_CACHE.DIR": str(tmp_path)}):
+        missed = wd.create_world(20, seed=5)
+        key = worldcache.config_key(5)
+        assert os.path.exists(tmp_path / (key + ".json"))
+        assert os.path.exists(tmp_path / (key + ".bin"))
+
+        def regenerate(seed):
+            pytest.fail("cache hit regenerated the layout")
+        monkeypatch.setattr(worldcache, "_generate", regenerate)
+        hit = wd.create_world(20, seed=5)
+
+    assert _state(hit) == _state(missed) == _state(uncached)
+    assert _run(hit) == _run(missed) == _run(uncached)
+
+
+def test_flow_fields_added_to_an_entry_stored_without_them(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    with config_overlay({"WORLD_CACHE.DIR": str(tmp_path), "FLOW.ENABLED": False}):
+        wd.create_world(5, seed=2)
+        assert worldcache.load(str(tmp_path), 2)[3] is None
+
+    with config_overlay({"WORLD_CACHE.DIR": str(tmp_path), "FLOW.ENABLED": True}):
+        built = wd.create_world(5, seed=2)
+        assert built.flow is not None
+        assert worldcache.load(str(tmp_path), 2)[3] is not None
+
+        def rebuild(self, grid, resource):
+            pytest.fail("flow fields were rebuilt instead of loaded")
+        monkeypatch.setattr(FlowFields, "_build", rebuild)
+        loaded = wd.create_world(5, seed=2)
+
+    assert [f.window for f in loaded.flow.fields] == [f.window for f in built.flow.fields]
+    # NaN marks cells without a heading: compare the bytes
+    assert ([array("d", f.dx).tobytes() for f in loaded.flow.fields]
+            == [array("d", f.dx).tobytes() for f in built.flow.fields])
+    assert _state(loaded) == _state(built)
@@ -0,0 +1,177 @@
+"""
+Fixed-step scheduling for the render loop.
+Frame times are accumulated and the world is advanced in fixed sub-steps,
+so a long frame (window drag, GC pause, busy host) never turns into one
+huge dt that tunnels agents through ponds or skips DRINK_INTERVAL sips.
+
+TimeControl layers the viewer's speed keys on top: 1x / 10x / 100x / max,
+pause and single-step.
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+import config as cfg
+
+
+@dataclass
+class FramePlan:
+    steps: int          # fixed steps to run this frame
+    render: bool        # False = skip drawing this frame to catch up
+    dropped: float      # seconds of simulation time given up (last resort)
+    alpha: float        # leftover fraction of a step (for interpolation)
+
+
+class FixedStepper:
+    """
+    Accumulator-based sub-stepping with a spiral-of-death guard.
+
+    When the simulation falls behind it first sheds render work: frames are
+    skipped (up to MAX_SKIPPED_RENDERS in a row) and each skipped frame may
+    run up to MAX_CATCHUP_STEPS steps. Only if that is still not enough is
+    simulated time dropped. Every step always uses the same dt.
+    """
+
+    def __init__(self, step_dt: float | None = None,
+                 max_steps: int | None = None,
+                 max_catchup_steps: int | None = None,
+                 max_skipped_renders: int | None = None):
+        sim_cfg = cfg.SIM
+        self.step_dt = step_dt or 1.0 / sim_cfg["HZ"]
+        self.max_steps = max_steps or sim_cfg["MAX_STEPS_PER_FRAME"]
+        self.max_catchup_steps = max(
+            self.max_steps, max_catchup_steps or sim_cfg["MAX_CATCHUP_STEPS"])
+        self.max_skipped_renders = (
+            sim_cfg["MAX_SKIPPED_RENDERS"] if max_skipped_renders is None
+            else max_skipped_renders)
+
+        self.accumulator = 0.0
+        self.skipped_renders = 0
+
+        # running totals (handy for an on-screen / log readout)
+        self.total_steps = 0
+        self.total_skipped = 0
+        self.total_dropped = 0.0
+
+    def advance(self, frame_dt: float) -> FramePlan:
+        self.accumulator += max(0.0, frame_dt)
+        pending = int(self.accumulator / self.step_dt)
+
+        render = True
+        limit = self.max_steps
+        if pending > self.max_steps and self.skipped_renders < self.max_skipped_renders:
+            # behind: skip this frame's drawing and catch up harder
+            render = False
+            limit = self.max_catchup_steps
+
+        steps = min(pending, limit)
+        self.accumulator -= steps * self.step_dt
+
+        dropped = 0.0
+        if render and pending > steps:
+            # still behind after shedding render work: give up the backlog
+            dropped = self.accumulator - (self.accumulator % self.step_dt)
+            self.accumulator -= dropped
+
+        self.skipped_renders = 0 if render else self.skipped_renders + 1
+        self.total_steps += steps
+        self.total_skipped += 0 if render else 1
+        self.total_dropped += dropped
+
+        return FramePlan(steps=steps, render=render, dropped=dropped,
+                         alpha=self.accumulator / self.step_dt)
+
+
+class TimeControl:
+    """
+    Viewer speed control over a FixedStepper.
+
+    At 1x a frame is planned by the stepper as usual. Above 1x a frame runs
+    speed x its real time in fixed steps, drawn once at the end, within a
+    wall-clock budget of FAST_FORWARD_BUDGET of a display frame; "max"
+    (speed None) just fills the budget. Fast-forward never skips drawing:
+    steps the budget cannot cover are dropped, not carried over, so the
+    viewer stays responsive. While paused only single steps are run.
+    """
+
+    def __init__(self, stepper: FixedStepper,
+                 speeds: Optional[Sequence[Optional[float]]] = None,
+                 budget: Optional[float] = None):
+        sim_cfg = cfg.SIM
+        self.stepper = stepper
+        self.speeds = tuple(sim_cfg["SPEEDS"] if speeds is None else speeds)
+        self.budget = sim_cfg["FAST_FORWARD_BUDGET"] if budget is None else budget
+        self.index = 0
+        self.paused = False
+        self._single_steps = 0
+
+    @property
+    def speed(self) -> Optional[float]:
+        """Current multiplier; None = as fast as the budget allows."""
+        return self.speeds[self.index]
+
+    def set_speed(self, index: int) -> None:
+        """Pick speeds[index]; also resumes if paused."""
+        self.index = max(0, min(index, len(self.speeds) - 1))
+        self.paused = False
+        self._single_steps = 0
+        self.stepper.accumulator = 0.0
+
+    def toggle_pause(self) -> None:
+        self.paused = not self.paused
+        self._single_steps = 0
+        self.stepper.accumulator = 0.0  # no burst of backlog on resume
+
+    def single_step(self) -> None:
+        """Pause (if running) and queue one fixed step."""
+        if not self.paused:
+            self.toggle_pause()
+        self._single_steps += 1
+
+    def label(self) -> str:
+        if self.paused:
+            return "paused"
+        return "max" if self.speed is None else f"{self.speed:g}x"
+
+    def run(self, frame_dt: float, step: Callable[[float], None]) -> FramePlan:
+        """Advance the simulation for one display frame; step(dt) runs one step."""
+        stepper = self.stepper
+        step_dt = stepper.step_dt
+
+        if self.paused:
+            steps, self._single_steps = self._single_steps, 0
+            for _ in range(steps):
+                step(step_dt)
+            stepper.total_steps += steps
+            return FramePlan(steps=steps, render=True, dropped=0.0, alpha=0.0)
+
+        speed = self.speed
+        if speed == 1:
+            plan = stepper.advance(frame_dt)
+            for _ in range(plan.steps):
+                step(step_dt)
+            return plan
+
+        wanted = None
+        if speed is not None:
+            stepper.accumulator += max(0.0, frame_dt) * speed
+            wanted = int(stepper.accumulator / step_dt)
+
+        deadline = time.perf_counter() + self.budget / cfg.FPS
+        steps = 0
+        while wanted is None or steps < wanted:
+            step(step_dt)
+            steps += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        dropped = 0.0
+        if wanted is not None:
+            stepper.accumulator -= steps * step_dt
+            if steps < wanted:
+                dropped = (wanted - steps) * step_dt
+                stepper.accumulator -= dropped
+        stepper.total_steps += steps
+        stepper.total_dropped += dropped
+        return FramePlan(steps=steps, render=True, dropped=dropped,
+                         alpha=stepper.accumulator / step_dt)
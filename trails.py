@@ -0,0 +1,198 @@
+"""
+Trajectory trails for the viewer.
+
+A Trail is a fixed-size ring buffer of one agent's recent positions,
+sampled every TRAIL.INTERVAL seconds of sim time. It is allocated once and
+reused for whoever is followed. Drawing writes the samples, oldest first,
+into a preallocated point list and makes a single pygame.draw.lines call,
+so a trail costs no allocation per frame however long it runs.
+
+TrailGrid keeps coarser trails for every agent in one preallocated 2D
+block (one row of ALL_LENGTH samples per agent slot), for an overview of
+where the population has been. Both can be exported as CSV.
+"""
+import csv
+import math
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+import config as cfg
+from camera import Camera
+
+
+_EPS = 1e-9  # sim times are sums of dt: don't lose a sample to rounding
+
+
+def _zeros(n: int) -> array:
+    return array("d", bytes(8 * n))
+
+
+def _draw_ring(screen: pygame.Surface, camera: Camera, colour, width: int,
+               xs: array, ys: array, base: int, size: int, head: int, count: int,
+               points: List[List[int]]) -> Optional[pygame.Rect]:
+    """One draw.lines call over ring samples xs/ys[base:base+size], oldest first."""
+    if count < 2:
+        return None
+    cx, cy, zoom = camera.x, camera.y, camera.zoom
+    start = head - count
+    for k in range(count):
+        i = base + (start + k) % size
+        p = points[k]
+        p[0] = int((xs[i] - cx) * zoom)
+        p[1] = int((ys[i] - cy) * zoom)
+    # pad the unused tail with the newest point: zero-length segments draw nothing
+    lx, ly = points[count - 1]
+    for k in range(count, size):
+        p = points[k]
+        p[0] = lx
+        p[1] = ly
+    return pygame.draw.lines(screen, colour, False, points, width)
+
+
+class Trail:
+    """Ring buffer of one agent's recent positions (time, x, y)."""
+
+    def __init__(self, length: Optional[int] = None, interval: Optional[float] = None):
+        self.length = length or cfg.TRAIL["LENGTH"]
+        self.interval = cfg.TRAIL["INTERVAL"] if interval is None else interval
+        self.t = _zeros(self.length)
+        self.x = _zeros(self.length)
+        self.y = _zeros(self.length)
+        self._points = [[0, 0] for _ in range(self.length)]
+        self.clear()
+
+    def clear(self) -> None:
+        self.agent = None
+        self.agent_id = None
+        self.head = 0           # next slot to write
+        self.count = 0
+        self._last = -math.inf  # sim time of the newest sample
+
+    def follow(self, agent) -> None:
+        """Start a fresh trail for agent (reuses the buffer)."""
+        self.clear()
+        self.agent = agent
+        self.agent_id = agent.id
+
+    def retarget(self, agent) -> None:
+        """
+        Keep the trail but sample agent from now on: a newer snapshot copy
+        of the followed agent, or None once it is gone.
+        """
+        self.agent = agent
+
+    def record(self, time: float) -> None:
+        """Sample the followed agent if INTERVAL has passed since the last sample."""
+        a = self.agent
+        if a is None or not a.alive or time - self._last < self.interval - _EPS:
+            return
+        i = self.head
+        self.t[i] = time
+        self.x[i] = a.x
+        self.y[i] = a.y
+        self.head = (i + 1) % self.length
+        if self.count < self.length:
+            self.count += 1
+        self._last = time
+
+    def samples(self) -> Iterator[Tuple[float, float, float]]:
+        """(time, x, y), oldest first."""
+        start = self.head - self.count
+        for k in range(self.count):
+            i = (start + k) % self.length
+            yield self.t[i], self.x[i], self.y[i]
+
+    def draw(self, screen: pygame.Surface, camera: Camera) -> Optional[pygame.Rect]:
+        """Draw the trail; returns the area drawn (None if too short)."""
+        return _draw_ring(screen, camera, cfg.COLOURS["TRAIL"], cfg.TRAIL["WIDTH"],
+                          self.x, self.y, 0, self.length, self.head, self.count,
+                          self._points)
+
+    def export(self, path: str) -> None:
+        """Write the trail as CSV (agent_id, t, x, y)."""
+        agent_id = self.agent_id if self.agent_id is not None else ""
+        with open(path, "w", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(("agent_id", "t", "x", "y"))
+            for t, x, y in self.samples():
+                out.writerow((agent_id, t, x, y))
+
+
+class TrailGrid:
+    """
+    Low-resolution trails for all agents: slots x ALL_LENGTH samples in one
+    flat block each for x and y (row = slot). Agents get a slot on first
+    sight and give it back when they are no longer in the world; agents
+    beyond `slots` are simply not tracked.
+    """
+
+    def __init__(self, slots: Optional[int] = None, length: Optional[int] = None,
+                 interval: Optional[float] = None):
+        t_cfg = cfg.TRAIL
+        self.slots = slots or t_cfg["ALL_SLOTS"]
+        self.length = length or t_cfg["ALL_LENGTH"]
+        self.interval = t_cfg["ALL_INTERVAL"] if interval is None else interval
+        self.x = _zeros(self.slots * self.length)
+        self.y = _zeros(self.slots * self.length)
+        self.head = 0                       # shared: every row is sampled together
+        self.count = array("i", bytes(4 * self.slots))
+        self._seen = array("i", bytes(4 * self.slots))
+        self._slot: Dict[int, int] = {}     # agent id -> row
+        self._free = list(range(self.slots - 1, -1, -1))
+        self._points = [[0, 0] for _ in range(self.length)]
+        self._stamp = 0
+        self._last = -math.inf
+
+    def record(self, agents, time: float) -> None:
+        """Sample every agent if ALL_INTERVAL has passed; free rows of the gone."""
+        if time - self._last < self.interval - _EPS:
+            return
+        self._last = time
+        self._stamp += 1
+        stamp, slot_of, n = self._stamp, self._slot, self.length
+        i = self.head
+        for a in agents:
+            slot = slot_of.get(a.id)
+            if slot is None:
+                if not self._free:
+                    continue
+                slot = slot_of[a.id] = self._free.pop()
+                self.count[slot] = 0
+            self._seen[slot] = stamp
+            j = slot * n + i
+            self.x[j] = a.x
+            self.y[j] = a.y
+            if self.count[slot] < n:
+                self.count[slot] += 1
+        for agent_id, slot in list(slot_of.items()):
+            if self._seen[slot] != stamp:
+                del slot_of[agent_id]
+                self._free.append(slot)
+        self.head = (i + 1) % n
+
+    def draw(self, screen: pygame.Surface, camera: Camera) -> List[pygame.Rect]:
+        """Draw every tracked trail (one draw.lines each); returns the areas drawn."""
+        colour, width = cfg.COLOURS["TRAIL_ALL"], 1
+        rects = []
+        for slot in self._slot.values():
+            rect = _draw_ring(screen, camera, colour, width, self.x, self.y,
+                              slot * self.length, self.length, self.head,
+                              self.count[slot], self._points)
+            if rect is not None:
+                rects.append(rect)
+        return rects
+
+    def export(self, path: str) -> None:
+        """Write every tracked trail as CSV (agent_id, sample, x, y), oldest first."""
+        n = self.length
+        with open(path, "w", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(("agent_id", "sample", "x", "y"))
+            for agent_id, slot in sorted(self._slot.items()):
+                count = self.count[slot]
+                start = self.head - count
+                for k in range(count):
+                    j = slot * n + (start + k) % n
+                    out.writerow((agent_id, k, self.x[j], self.y[j]))
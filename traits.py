@@ -43,6 +43,27 @@ def clamp_traits(traits: Traits) -> Traits:
     )
 
 
+def inherit_traits(parent_a: Traits, parent_b: Traits,
+                   mutation_sd: float = 0.05, rng=None) -> Traits:
+    """
+    Offspring traits: a random blend of both parents per trait, plus a small
+    gaussian mutation, clamped to bounds.
+    """
+    if rng is None:
+        rng = random
+
+    def mix(va: float, vb: float) -> float:
+        t = rng.random()
+        return va * t + vb * (1.0 - t) + rng.gauss(0.0, mutation_sd)
+
+    return clamp_traits(Traits(
+        vision_mult=mix(parent_a.vision_mult, parent_b.vision_mult),
+        speed_mult=mix(parent_a.speed_mult, parent_b.speed_mult),
+        metabolism_mult=mix(parent_a.metabolism_mult, parent_b.metabolism_mult),
+        memory_mult=mix(parent_a.memory_mult, parent_b.memory_mult)
+    ))
+
+
 # =========================================================
 # Effective Value Helpers
 # =========================================================
@@ -0,0 +1,69 @@
+"""
+Wake-time scheduling for stationary agents.
+Agents frozen in an eat pause or drinking register the time of their next
+event (end of the pause, next DRINK_INTERVAL sip) in a heap and are skipped
+entirely until then. Sleep never spans a stat threshold or death, so the
+linear stat integration done on wake is exact.
+"""
+import heapq
+import itertools
+from typing import List, Tuple
+
+import config as cfg
+import agent as ag
+
+
+def next_event_in(a: ag.Agent, water, dt: float) -> float:
+    """
+    Seconds until a stationary agent next needs a full update,
+    or 0.0 if it is not stationary.
+    Events (end of pause, next sip) are woken in the tick they fall in;
+    threshold crossings one tick early, so the catch-up step ends before
+    the crossing and the crossing tick itself runs at full rate.
+    """
+    if a.eat_pause > 0.0:
+        event = a.eat_pause
+    elif a.action == "DRINK":
+        if (
+            a.thirst <= cfg.THRESHOLDS["THIRST_OK"]
+            or water.touching(a.x, a.y, cfg.AGENT_RADIUS, eps=6.0) is None
+        ):
+            return 0.0  # releases next update
+        event = cfg.RESOURCES["DRINK_INTERVAL"] - a.drink_timer
+    else:
+        return 0.0
+    return max(0.0, min(event, ag.time_to_next_threshold(a) - dt))
+
+
+class WakeQueue:
+    """Min-heap of (wake_time, seq, agent)."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, ag.Agent]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def sleep(self, a: ag.Agent, now: float, wake_time: float) -> None:
+        a.asleep = True
+        a.slept_at = now
+        heapq.heappush(self._heap, (wake_time, next(self._seq), a))
+
+    def wake_due(self, tick_start: float, dt: float) -> None:
+        """
+        Wake every agent whose event falls inside the tick
+        [tick_start, tick_start + dt]. Their time asleep (up to the start of
+        this tick) goes into lod_dt so this tick's update integrates it.
+        """
+        heap = self._heap
+        tick_end = tick_start + dt
+        while heap and heap[0][0] <= tick_end + 1e-9:
+            _wake_time, _seq, a = heapq.heappop(heap)
+            a.asleep = False
+            a.lod_dt += max(0.0, tick_start - a.slept_at)
+
+    def clear(self) -> None:
+        for _t, _s, a in self._heap:
+            a.asleep = False
+        self._heap.clear()
@@ -0,0 +1,246 @@
+"""
+World container and per-tick stepping.
+Holds everything one simulation needs (agents, water, bushes) so the
+same stepping code runs under the pygame viewer and headless.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import config as cfg
+import agent as ag
+import resources as res
+import simulation as sim
+import lod
+import collision
+from randstream import RandomStream
+from metrics import EngineStats
+from flowfield import FlowFields
+from wake import WakeQueue, next_event_in
+from spatial import AgentGrid, StaticGrid
+
+if TYPE_CHECKING:
+    from allocprof import AllocProfiler
+
+
+@dataclass
+class World:
+    agents: List[ag.Agent]
+    water: res.WaterIndex
+    bushes: List[res.FoodBush]
+    food: res.FoodStore = field(default_factory=res.FoodStore)  # all bushes' food
+    next_id: int = 0
+    time: float = 0.0
+    tick: int = 0
+    births: int = 0
+    deaths: Dict[str, int] = field(default_factory=dict)  # by ag.death_cause
+    grid: AgentGrid = field(
+        default_factory=lambda: AgentGrid(cfg.CROWDING["GRID_CELL"]))
+    bush_grid: StaticGrid = field(default_factory=lambda: StaticGrid(1.0))
+    wake_queue: WakeQueue = field(default_factory=WakeQueue)
+    circles: Optional[collision.StaticCircles] = None  # built on first batch tick
+    profiler: Optional["AllocProfiler"] = None  # allocprof, opt-in
+    stats: EngineStats = field(default_factory=EngineStats)
+    flow: Optional[FlowFields] = None
+    rng: RandomStream = field(default_factory=RandomStream)
+    # partitioned worlds (partition.py): one region of a larger world
+    ghosts: list = field(default_factory=list)  # neighbours' border agents
+    regrow: Optional[List[res.FoodBush]] = None  # bushes regrown here (None: all)
+    id_stride: int = 1                           # gap between new agent ids
+    # reserves one birth under a MAX_AGENTS shared with other regions (None: local)
+    claim_birth: Optional[Callable[[], bool]] = None
+
+
+def create_world(num_agents: int = cfg.NUM_AGENTS, seed: Optional[int] = None) -> World:
+    """
+    Build a world. With a seed, both the layout (ponds, bushes, agents) and
+    the per-tick random stream are reproducible. Everything draws from the
+    world's own stream, never the global `random` state, so several worlds
+    can be built and stepped in one process. Flow fields (FLOW.ENABLED) are
+    built here too, never mid-tick.
+    """
+    cached_flow = None
+    if seed is not None and cfg.WORLD_CACHE["DIR"]:
+        import worldcache  # only cached runs pay for it
+        water, food, bushes, cached_flow, rng = worldcache.layout(seed)
+    else:
+        rng = RandomStream(seed)
+        water = res.create_water(rng)
+        food = res.FoodStore()
+        bushes = res.create_bushes(water, food, rng)
+    agents = [
+        ag.create_agent(i, cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT, cfg.AGENT_RADIUS, rng)
+        for i in range(num_agents)
+    ]
+    bush_grid = res.index_bushes(bushes)
+    flow = None
+    if cfg.FLOW["ENABLED"] and collision.available():
+        flow = cached_flow(bush_grid) if cached_flow is not None else None
+        if flow is None:
+            flow = FlowFields(water, bushes, bush_grid)
+    world = World(agents=agents, water=water, bushes=bushes, food=food,
+                  next_id=num_agents,
+                  bush_grid=bush_grid, rng=rng,
+                  flow=flow)
+    world.stats.on_spawn(agents)
+    return world
+
+
+def step_world(world: World, dt: float) -> None:
+    """Advance the whole world by dt seconds."""
+    started = time.perf_counter()
+    sim.set_time(world.time)
+    sim.set_rng(world.rng)
+    sim.set_flow(world.flow if cfg.FLOW["ENABLED"] else None)
+    sim.set_bush_grid(world.bush_grid)
+
+    # allocation profiling: phases are flat, begin() closes the previous one
+    prof = world.profiler
+    if prof is not None:
+        prof.start_tick()
+        prof.begin("resources")
+    res.update_resources(world.bushes if world.regrow is None else world.regrow, dt,
+                         world.rng)
+
+    # one grid rebuild per tick serves every neighbour query this tick
+    # (separation before moving, mating after)
+    if prof is not None:
+        prof.begin("grid")
+    grid = world.grid
+    grid.rebuild(world.agents + world.ghosts if world.ghosts else world.agents)
+
+    use_lod = cfg.LOD["ENABLED"]
+    interval = cfg.LOD["INTERVAL"]
+    use_wake = cfg.WAKE_QUEUE["ENABLED"]
+    min_sleep = cfg.WAKE_QUEUE["MIN_SLEEP_TICKS"] * dt
+    tick_end = world.time + dt
+
+    if use_wake:
+        world.wake_queue.wake_due(world.time, dt)
+
+    batch = cfg.COLLISION["BATCH"] and collision.available() and prof is None
+    update = sim.update_agent if prof is None else prof.update_agent
+    if batch and world.circles is None:
+        world.circles = collision.StaticCircles(world.water, world.bushes)
+    moving = []
+    alive = []
+    for a in world.agents:
+        if a.asleep:
+            alive.append(a)
+            continue
+
+        if use_lod and a.lod_idle and (world.tick + a.id) % interval:
+            # idle agent: skip this tick, catch the time up later
+            a.lod_dt += dt
+            alive.append(a)
+            continue
+
+        step_dt = dt + a.lod_dt
+        a.lod_dt = 0.0
+
+        if prof is not None:
+            prof.begin("separation")
+        sim.apply_separation(a, grid)
+        if not batch:
+            if update(a, step_dt, world.water, world.bushes):
+                alive.append(a)
+                if prof is not None:
+                    prof.begin("schedule")
+                _classify(world, a, dt, use_lod, use_wake, min_sleep, tick_end)
+            else:
+                _record_death(world, a)
+            continue
+
+        status = sim.plan_agent(a, step_dt, world.water, world.bushes)
+        if status is None:
+            # keep list order: resolved below, after the batched query
+            moving.append((len(alive), a, sim.propose_move(a, step_dt)))
+            alive.append(a)
+        elif status:
+            alive.append(a)
+            _classify(world, a, dt, use_lod, use_wake, min_sleep, tick_end)
+        else:
+            _record_death(world, a)
+
+    if moving:
+        contacts = world.circles.query([m[2][0] for m in moving],
+                                       [m[2][1] for m in moving])
+        dead = set()
+        for (slot, a, (nx, ny)), contact in zip(moving, contacts):
+            if sim.resolve_move(a, nx, ny, world.water, world.bushes, contact):
+                _classify(world, a, dt, use_lod, use_wake, min_sleep, tick_end)
+            else:
+                dead.add(slot)
+                _record_death(world, a)
+        if dead:
+            alive = [a for i, a in enumerate(alive) if i not in dead]
+    world.agents = alive
+
+    if prof is not None:
+        prof.begin("mating")
+    _mate_agents(world)
+    if prof is not None:
+        prof.end_tick()
+
+    world.time += dt
+    world.tick += 1
+    world.stats.on_tick(time.perf_counter() - started)
+
+
+def _classify(world: World, a: ag.Agent, dt: float, use_lod: bool,
+              use_wake: bool, min_sleep: float, tick_end: float) -> None:
+    """Post-update scheduling: LOD idle flag and wake-queue parking."""
+    if use_lod:
+        a.lod_idle = lod.is_idle(a, world.water, world.bush_grid)
+    if use_wake:
+        wait = next_event_in(a, world.water, dt)
+        if wait >= min_sleep:
+            world.wake_queue.sleep(a, tick_end, tick_end + wait)
+
+
+def _record_death(world: World, a: ag.Agent) -> None:
+    cause = ag.death_cause(a)
+    world.deaths[cause] = world.deaths.get(cause, 0) + 1
+    world.stats.on_death(a)
+
+
+def _mate_agents(world: World) -> None:
+    """Pair nearby agents whose needs are satisfied and spawn offspring."""
+    rep = cfg.REPRODUCTION
+    radius = rep["MATE_RADIUS"]
+    claim = world.claim_birth
+    if claim is None:
+        room = rep["MAX_AGENTS"] - len(world.agents)
+    else:
+        room = len(world.agents)  # at most a child each; claim() enforces the cap
+    if room <= 0:
+        return
+
+    children = []
+    for a in world.agents:
+        if len(children) >= room:
+            break
+        if not ag.can_mate(a):
+            continue
+
+        for b in world.grid.neighbors(a.x, a.y, radius):
+            if b is a or not ag.can_mate(b):
+                continue
+            if claim is not None and not claim():
+                room = len(children)  # the shared cap is reached
+                break
+
+            child = ag.create_offspring(world.next_id, a, b, world.rng)
+            world.next_id += world.id_stride
+            children.append(child)
+
+            for parent in (a, b):
+                parent.mate_cooldown = rep["COOLDOWN"]
+                parent.energy = max(0.0, parent.energy - rep["ENERGY_COST"])
+                parent.hunger = min(100.0, parent.hunger + rep["HUNGER_COST"])
+            break
+
+    if children:
+        world.agents.extend(children)
+        world.births += len(children)
+        world.stats.on_spawn(children)
@@ -0,0 +1,170 @@
+"""
+On-disk cache of seeded world layouts.
+
+Generating a world runs rejection loops for ponds, bushes and initial food,
+and its flow fields take a distance transform per pond / bush. None of that
+depends on anything but the seed and a handful of config sections, so with
+WORLD_CACHE.DIR set, create_world(seed=...) stores it once per
+(seed, config hash) and later runs load it instead:
+
+    python -m headless --runs 1000 --workers 8 --seed 0 --world-cache /tmp/worlds
+
+An entry is two files named after the key: <key>.bin holds the flat
+arrays (initial food, the flow grid's blocked cells, every field's per-cell
+dx / dy) and is memory-mapped on load (resultchannel layout); <key>.json
+holds the geometry, the food lists, the flow fields' windows and the world's
+random-stream state right after generation, so a loaded world carries on
+exactly as a generated one would. Flow fields are stored when FLOW.ENABLED
+(and numpy) let the generating run build them; an entry written without
+them gets them added by the first run that does build them.
+The json is written last: a half-written entry is simply a miss.
+"""
+import hashlib
+import json
+import os
+from typing import List, Optional, Tuple
+
+import collision
+import config as cfg
+import resources as res
+from flowfield import FlowField, FlowFields
+from randstream import RandomStream
+from resultchannel import ResultChannel, ResultRef, RunResult
+
+FORMAT = 3
+
+
+def config_key(seed: int) -> str:
+    """Cache key: the seed plus a hash of every setting generation reads."""
+    relevant = {
+        "format": FORMAT,
+        "world": [cfg.WORLD_WIDTH, cfg.WORLD_HEIGHT, cfg.AGENT_RADIUS],
+        "resources": cfg.RESOURCES,
+        # fields are the same whether or not this run steers with them
+        "flow": {k: v for k, v in cfg.FLOW.items() if k != "ENABLED"},
+    }
+    text = json.dumps(relevant, sort_keys=True, default=repr)
+    return f"{seed}-{hashlib.sha1(text.encode()).hexdigest()[:16]}"
+
+
+def _generate(seed: int) -> Tuple[res.WaterIndex, res.FoodStore, List[res.FoodBush],
+                                   RandomStream]:
+    rng = RandomStream(seed)
+    water = res.create_water(rng)
+    food = res.FoodStore()
+    bushes = res.create_bushes(water, food, rng)
+    return water, food, bushes, rng
+
+
+def save(directory: str, seed: int, water: res.WaterIndex, food: res.FoodStore,
+         bushes: List[res.FoodBush], flow: Optional[FlowFields], random_state) -> str:
+    """Write one entry (flow fields too, unless flow is None); returns its key."""
+    key = config_key(seed)
+    arrays = {"food_x": food.x, "food_y": food.y, "food_alive": food.alive}
+    windows = []
+    if flow is not None:
+        arrays["flow_blocked"] = flow.blocked
+        for i, field in enumerate(flow.fields):
+            arrays[f"flow{i}_dx"] = field.dx
+            arrays[f"flow{i}_dy"] = field.dy
+            windows.append(field.window)
+
+    snap = food.snapshot()
+    version, internal, gauss = random_state
+    header = {
+        "seed": seed,
+        "ponds": [{"circles": p.circles, "sparkles": p.sparkles, "id": p.id}
+                  for p in water.ponds],
+        "bushes": [{"x": b.x, "y": b.y, "capacity": b.capacity,
+                    "blob_circles": b.blob_circles} for b in bushes],
+        "food": {"free": snap["free"], "live": snap["live"]},
+        "random_state": [version, list(internal), gauss],
+        "flow": {"cell": flow.cell if flow is not None else None, "windows": windows},
+    }
+    channel = ResultChannel(directory, keep=True)
+    header["arrays"] = channel.write(arrays, name=key + ".bin").to_dict()
+
+    tmp = os.path.join(directory, f".{key}.json.{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(header, f)
+    os.replace(tmp, os.path.join(directory, key + ".json"))
+    return key
+
+
+def load(directory: str, seed: int):
+    """
+    (water, food, bushes, flow_data, random_state) of a cached entry, or
+    None on a miss. flow_data: (cell, blocked, fields) with the fields in
+    FlowFields order and their arrays views of the mapped file, or None if
+    the entry has no flow fields.
+    """
+    key = config_key(seed)
+    try:
+        with open(os.path.join(directory, key + ".json")) as f:
+            header = json.load(f)
+    except FileNotFoundError:
+        return None
+    data = RunResult(ResultRef.from_dict(header["arrays"]))
+
+    ponds = [res.Pond(circles=[tuple(c) for c in p["circles"]],
+                      sparkles=[tuple(s) for s in p["sparkles"]], id=p["id"])
+             for p in header["ponds"]]
+    water = res.WaterIndex(ponds)
+    food = res.FoodStore()
+    bushes = []
+    for b in header["bushes"]:
+        bush = res.FoodBush(x=b["x"], y=b["y"], capacity=b["capacity"],
+                            blob_circles=[tuple(c) for c in b["blob_circles"]])
+        food.register(bush)
+        bushes.append(bush)
+    food.restore({"x": data["food_x"].tobytes(), "y": data["food_y"].tobytes(),
+                  "alive": data["food_alive"].tobytes(),
+                  "free": header["food"]["free"], "live": header["food"]["live"]})
+
+    flow_data = None
+    cell = header["flow"]["cell"]
+    if cell is not None:
+        fields = [FlowField(*window, cell, data[f"flow{i}_dx"], data[f"flow{i}_dy"])
+                  for i, window in enumerate(header["flow"]["windows"])]
+        flow_data = (cell, data["flow_blocked"], fields)
+
+    version, internal, gauss = header["random_state"]
+    return water, food, bushes, flow_data, (version, tuple(internal), gauss)
+
+
+def layout(seed: int, directory: Optional[str] = None):
+    """
+    Ponds, food and bushes for seed, a FlowFields factory and the world's
+    random stream, from the cache (generating and storing on a miss). The
+    stream is left where generation would have left it. The factory takes
+    the bush grid and returns None if the entry holds no flow fields.
+    """
+    directory = directory or cfg.WORLD_CACHE["DIR"]
+    want_flow = cfg.WORLD_CACHE["FLOW"] and cfg.FLOW["ENABLED"] and collision.available()
+    entry = load(directory, seed)
+    if entry is None or (want_flow and entry[3] is None):
+        if entry is None:
+            water, food, bushes, rng = _generate(seed)
+            state = rng.getstate()
+        else:
+            # stored without flow fields: rewrite it with them (the food
+            # arrays keep their offsets, so readers of the old header are fine)
+            water, food, bushes, _none, state = entry
+        flow = None
+        if want_flow:
+            flow = FlowFields(water, bushes, res.index_bushes(bushes))
+        os.makedirs(directory, exist_ok=True)
+        save(directory, seed, water, food, bushes, flow, state)
+        entry = load(directory, seed)
+
+    water, food, bushes, flow_data, state = entry
+    rng = RandomStream(seed)
+    rng.setstate(state)
+
+    def make_flow(bush_grid) -> Optional[FlowFields]:
+        if flow_data is None:
+            return None
+        cell, blocked, fields = flow_data
+        return FlowFields(water, bushes, bush_grid, cell, blocked, fields)
+
+    return water, food, bushes, make_flow, rng